@@ -1,7 +1,14 @@
 import logging
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db.db import get_db
+from app.core.exceptions.exceptions import BizError
+from app.deps.rate_limit import get_client_ip
+from app.repositories import explanations as explanations_repo
+from app.services.llm.telemetry import llm_telemetry
 from app.services.old.gpt_call import explain_topic, ask_question
 
 
@@ -21,16 +28,34 @@ class ExplainOut(BaseModel):
     checklist: list[str]
 
 @router.post("/explain", response_model=ExplainOut)
-async def ai_explain(payload: ExplainIn):
+async def ai_explain(
+    payload: ExplainIn, request: Request, db: AsyncSession = Depends(get_db)
+):
+    # 优先返回离线预生成的结果（scripts/pregenerate_explanations.py）
+    key = explanations_repo.explanation_key(
+        payload.module_id, payload.subtopic, payload.level, payload.known_points
+    )
+    try:
+        stored = await explanations_repo.get_explanation(db, key)
+    except Exception as e:  # noqa: B902
+        logger.warning("explanation lookup failed: %s", e)
+        stored = None
+    if stored is not None:
+        llm_telemetry.record("explain", model=stored.model, cache_hit=True)
+        return stored.payload
+    # 释放连接，避免模型调用期间占用连接池
+    await db.rollback()
+
     try:
         res = await explain_topic(
             module_id=payload.module_id,
             subtopic=payload.subtopic,
             known_points=payload.known_points,
             level=payload.level,
+            fairness_key=get_client_ip(request),
         )
         return res
-    except HTTPException:
+    except (HTTPException, BizError):
         raise
     except Exception as e:
         # 不泄露内部错误
@@ -47,12 +72,15 @@ class ChatOut(BaseModel):
 
 
 @router.post("/ask", response_model=ChatOut)
-async def ai_ask(payload: ChatIn):
+async def ai_ask(payload: ChatIn, request: Request):
     """General question answering endpoint."""
     try:
-        resp = await ask_question(payload.question, payload.level)
+        resp = await ask_question(
+            payload.question, payload.level, fairness_key=get_client_ip(request)
+        )
         return ChatOut(answer=resp)
-    except HTTPException:
+    except (HTTPException, BizError):
+        # BizError: 调度器过载时的 503 + Retry-After
         raise
     except Exception as e:  # noqa: B902
         logger.exception(e)
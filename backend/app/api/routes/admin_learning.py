@@ -7,7 +7,7 @@ from typing import Any, Literal
 from uuid import UUID
 
 import sqlalchemy as sa
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -26,6 +26,9 @@ from app.models import (
     QuestionTopic,
     User,
 )
+from app.repositories import item_stats as stats_repo
+from app.repositories.question_pool import question_id_pool
+from app.services.quiz_pool import quiz_pool
 from app.schemas.api_response import ok
 from app.services.topic_rag import TopicRAGService
 
@@ -313,6 +316,9 @@ async def add_topic_question(
     session.add(QuestionTopic(question_id=question.id, topic_id=topic_id))
     await session.commit()
     await session.refresh(question)
+    # 抽题 id 池失效（新题立即可被抽到），该主题的预生成题单重新生成
+    await question_id_pool.invalidate()
+    await quiz_pool.invalidate_topic(topic_id)
 
     return ok(
         data={
@@ -323,3 +329,32 @@ async def add_topic_question(
         request=request,
         status_code=201,
     )
+
+
+@router.get("/topics/{topic_id}/quiz/stats")
+async def get_topic_question_stats(
+    topic_id: UUID,
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    session: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Item statistics for a topic's questions (hardest first), read from the stats tables."""
+    _ensure_admin(user)
+    topic = await session.get(LearningTopic, topic_id)
+    if not topic:
+        raise BizError(404, BizCode.NOT_FOUND, "topic_not_found")
+
+    topic_stat = await stats_repo.get_topic_stat(session, topic_id)
+    questions = await stats_repo.list_topic_question_stats(session, topic_id, limit=limit)
+    return ok(
+        data={
+            "topic_id": str(topic_id),
+            "attempts": topic_stat.attempts if topic_stat else 0,
+            "correct": topic_stat.correct if topic_stat else 0,
+            "correct_rate": topic_stat.correct_rate if topic_stat else None,
+            "mean_score": topic_stat.mean_score if topic_stat else None,
+            "questions": questions,
+        },
+        request=request,
+    )
@@ -2,13 +2,13 @@
 """
 测评模块路由
 - 主题小测（Topic Quiz）：2个端点
-- 整体评测（Global Assessment）：5个端点
+- 整体评测（Global Assessment）：6个端点
 """
 import logging
 from uuid import UUID
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db.db import get_db
@@ -27,7 +27,10 @@ from app.schemas.assessment import (
     AssessmentAvailabilityOut,
     AnswerSaveIn,
     AnswerSaveOut,
+    AnswerBatchSaveIn,
+    AnswerBatchSaveOut,
     AssessmentSubmitOut,
+    AssessmentFeedbackOut,
     AssessmentHistoryOut,
     AssessmentDetailOut,
 )
@@ -394,6 +397,81 @@ async def save_answer(
         )
 
 
+@router.post(
+    "/assessments/{session_id}/answers",
+    response_model=ApiResponse[AnswerBatchSaveOut],
+    summary="Save several answers at once (offline / reconnect sync)",
+)
+async def save_answers(
+    session_id: UUID,
+    payload: AnswerBatchSaveIn,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Save a batch of answers for the session in one write."""
+    request_id = (
+        request.state.request_id if hasattr(request.state, "request_id") else None
+    )
+
+    try:
+        assessment_service = AssessmentService(db)
+
+        result = await assessment_service.save_answers(
+            session_id=session_id,
+            user_id=current_user.id,
+            payload=payload,
+        )
+
+        logger.info(
+            {
+                "action": "answers_saved",
+                "request_id": request_id,
+                "user_id": str(current_user.id),
+                "session_id": str(session_id),
+                "saved": result.saved,
+                "progress": result.progress.model_dump(),
+            }
+        )
+
+        return ok(data=result.model_dump(), request_id=request_id)
+
+    except BizError as e:
+        logger.warning(
+            {
+                "action": "answers_save_failed",
+                "request_id": request_id,
+                "user_id": str(current_user.id),
+                "session_id": str(session_id),
+                "error": e.message,
+                "code": e.code,
+            }
+        )
+        return fail(
+            code=e.code,
+            message=e.message,
+            data=e.data,
+            request_id=request_id,
+        )
+
+    except Exception as e:
+        logger.error(
+            {
+                "action": "answers_save_error",
+                "request_id": request_id,
+                "user_id": str(current_user.id),
+                "session_id": str(session_id),
+                "error": str(e),
+            },
+            exc_info=True,
+        )
+        return fail(
+            code=BizCode.INTERNAL_ERROR,
+            message="internal_error",
+            request_id=request_id,
+        )
+
+
 @router.post(
     "/assessments/{session_id}/submit",
     response_model=ApiResponse[AssessmentSubmitOut],
@@ -428,6 +506,7 @@ async def submit_global_assessment(
                 "session_id": str(session_id),
                 "total_score": result.total_score,
                 "breakdown_count": len(result.breakdown),
+                "ai_status": result.ai_status,
             }
         )
 
@@ -469,6 +548,72 @@ async def submit_global_assessment(
         )
 
 
+@router.get(
+    "/assessments/{session_id}/feedback",
+    response_model=ApiResponse[AssessmentFeedbackOut],
+    summary="Get AI feedback of a submitted assessment (poll / long-poll)",
+)
+async def get_assessment_feedback(
+    session_id: UUID,
+    request: Request,
+    wait: int = Query(
+        0, ge=0, le=25, description="Seconds to wait while ai_status is pending"
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return the AI summary/recommendation once background generation finishes."""
+    request_id = (
+        request.state.request_id if hasattr(request.state, "request_id") else None
+    )
+
+    try:
+        assessment_service = AssessmentService(db)
+
+        result = await assessment_service.get_feedback(
+            session_id=session_id,
+            user_id=current_user.id,
+            wait_seconds=wait,
+        )
+
+        return ok(data=result.model_dump(), request_id=request_id)
+
+    except BizError as e:
+        logger.warning(
+            {
+                "action": "feedback_retrieval_failed",
+                "request_id": request_id,
+                "user_id": str(current_user.id),
+                "session_id": str(session_id),
+                "error": e.message,
+                "code": e.code,
+            }
+        )
+        return fail(
+            code=e.code,
+            message=e.message,
+            data=e.data,
+            request_id=request_id,
+        )
+
+    except Exception as e:
+        logger.error(
+            {
+                "action": "feedback_retrieval_error",
+                "request_id": request_id,
+                "user_id": str(current_user.id),
+                "session_id": str(session_id),
+                "error": str(e),
+            },
+            exc_info=True,
+        )
+        return fail(
+            code=BizCode.INTERNAL_ERROR,
+            message="internal_error",
+            request_id=request_id,
+        )
+
+
 @router.get(
     "/assessments/history",
     response_model=ApiResponse[AssessmentHistoryOut],
@@ -478,6 +623,9 @@ async def get_assessment_history(
     request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(
+        None, description="pagination.next_cursor from the previous page (keyset paging)"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -493,6 +641,7 @@ async def get_assessment_history(
             user_id=current_user.id,
             page=page,
             limit=limit,
+            cursor=cursor,
         )
 
         logger.info(
@@ -553,7 +702,15 @@ async def get_assessment_detail(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Retrieve the detailed per-question review for a submitted assessment."""
+    """
+    Retrieve the detailed per-question review for a submitted assessment.
+
+    The payload is served pre-serialized with a strong ``ETag``; a matching
+    ``If-None-Match`` gets ``304 Not Modified``. The body's ``request_id`` is
+    null so every response with one ETag is byte-identical; the id is in the
+    ``X-Request-Id`` header. Once AI feedback has landed
+    the response is ``immutable``; while it is pending clients revalidate.
+    """
     request_id = (
         request.state.request_id if hasattr(request.state, "request_id") else None
     )
@@ -561,10 +718,11 @@ async def get_assessment_detail(
     try:
         assessment_service = AssessmentService(db)
 
-        result = await assessment_service.get_session_detail(
+        cached = await assessment_service.get_session_detail_cached(
             session_id=session_id,
             user_id=current_user.id,
         )
+        not_modified = cached.matches(request.headers.get("if-none-match"))
 
         logger.info(
             {
@@ -572,11 +730,14 @@ async def get_assessment_detail(
                 "request_id": request_id,
                 "user_id": str(current_user.id),
                 "session_id": str(session_id),
-                "item_count": len(result.items),
+                "etag": cached.etag,
+                "not_modified": not_modified,
             }
         )
 
-        return ok(data=result.model_dump(), request_id=request_id)
+        if not_modified:
+            return Response(status_code=304, headers=cached.headers)
+        return cached.response()
 
     except BizError as e:
         logger.warning(
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Request
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db.db import get_db
+from app.deps.auth import get_current_user
+from app.models import ChatSession
+from app.schemas.api_response import ok
+from app.services.topic_chat import TopicChatService
+
+router = APIRouter(prefix="/api/v1", tags=["topic-chat"])
+
+chat_service = TopicChatService()
+
+
+class TopicChatMessageIn(BaseModel):
+    # 先去掉首尾空白再校验长度：纯空白消息返回 422
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    content: str = Field(..., min_length=1, max_length=4000, description="学员消息")
+
+
+def _session_payload(chat: ChatSession | None) -> dict | None:
+    if chat is None:
+        return None
+    return {
+        "chat_session_id": str(chat.id),
+        "message_count": chat.message_count or 0,
+        "has_summary": bool(chat.summary),
+        "last_active_at": chat.last_active_at.isoformat() if chat.last_active_at else None,
+    }
+
+
+@router.get("/topics/{topic_id}/chat")
+async def get_topic_chat(
+    topic_id: UUID,
+    request: Request,
+    limit: int = Query(50, ge=1, le=100),
+    before: datetime | None = Query(None, description="Only messages created before this time"),
+    session: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    chat, messages = await chat_service.get_history(
+        session, user=user, topic_id=topic_id, limit=limit, before=before
+    )
+    data = {
+        "topic_id": str(topic_id),
+        "session": _session_payload(chat),
+        "messages": [message.as_payload() for message in messages],
+    }
+    return ok(data=data, request=request)
+
+
+@router.post("/topics/{topic_id}/chat/messages")
+async def send_topic_chat_message(
+    topic_id: UUID,
+    payload: TopicChatMessageIn,
+    request: Request,
+    session: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    chat, user_message, reply = await chat_service.send_message(
+        session,
+        user=user,
+        topic_id=topic_id,
+        content=payload.content,
+        fairness_key=str(user.id),
+    )
+    data = {
+        "topic_id": str(topic_id),
+        "session": _session_payload(chat),
+        "message": user_message.as_payload(),
+        "reply": reply.as_payload(),
+    }
+    return ok(data=data, request=request)
+
+
+@router.delete("/topics/{topic_id}/chat")
+async def reset_topic_chat(
+    topic_id: UUID,
+    request: Request,
+    session: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    await chat_service.reset(session, user=user, topic_id=topic_id)
+    await session.commit()
+    return ok(data={"topic_id": str(topic_id), "reset": True}, request=request)
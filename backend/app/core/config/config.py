@@ -39,6 +39,8 @@ def _ensure_env(name: str, value: str) -> str:
 # 2. 读取各项配置
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")   # 默认为gpt-4o
+EXPLAIN_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # /ai/explain 历史默认值
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # 兼容 OpenAI 协议的网关/本地假服务
 DATABASE_URL_ASYNC = os.getenv("DATABASE_URL_ASYNC")
 DATABASE_URL_SYNC = os.getenv("DATABASE_URL_SYNC")
 DATABASE_URL_ASYNC = _ensure_env(
@@ -50,6 +52,76 @@ DATABASE_URL_SYNC = _ensure_env(
     _normalise_db_url(os.getenv("DATABASE_URL_SYNC"), async_mode=False),
 )
 ENV = os.getenv("ENV", "dev")  # 默认为dev
+
+# 整体评测 AI 反馈：提交后由后台任务生成（见 app/services/assessment_feedback.py）
+AI_FEEDBACK_CONCURRENCY = int(os.getenv("AI_FEEDBACK_CONCURRENCY", "2"))
+AI_FEEDBACK_MAX_ATTEMPTS = int(os.getenv("AI_FEEDBACK_MAX_ATTEMPTS", "3"))
+AI_FEEDBACK_SWEEP_SECONDS = float(os.getenv("AI_FEEDBACK_SWEEP_SECONDS", "30"))
+AI_FEEDBACK_LEASE_SECONDS = float(os.getenv("AI_FEEDBACK_LEASE_SECONDS", "120"))
+# 长轮询期间回查数据库的间隔（任务可能由其他进程完成）
+AI_FEEDBACK_POLL_SECONDS = float(os.getenv("AI_FEEDBACK_POLL_SECONDS", "1"))
+
+# 整体评测答题草稿：先写 Redis，提交时 / 定时批量落库（app/services/answer_drafts.py）
+ANSWER_DRAFTS_ENABLED = os.getenv("ANSWER_DRAFTS_ENABLED", "true").lower() in ("1", "true", "yes")
+ANSWER_DRAFT_TTL_SECONDS = int(os.getenv("ANSWER_DRAFT_TTL_SECONDS", "86400"))
+ANSWER_DRAFT_FLUSH_SECONDS = float(os.getenv("ANSWER_DRAFT_FLUSH_SECONDS", "15"))
+
+# 未提交会话后台清理（app/services/session_sweeper.py）；TTL <= 0 表示关闭
+ABANDONED_SESSION_TTL_SECONDS = int(os.getenv("ABANDONED_SESSION_TTL_SECONDS", "604800"))
+ABANDONED_SESSION_SWEEP_SECONDS = float(os.getenv("ABANDONED_SESSION_SWEEP_SECONDS", "600"))
+ABANDONED_SESSION_SWEEP_BATCH = int(os.getenv("ABANDONED_SESSION_SWEEP_BATCH", "500"))
+ABANDONED_SESSION_SWEEP_MAX_BATCHES = int(os.getenv("ABANDONED_SESSION_SWEEP_MAX_BATCHES", "20"))
+
+# 已提交评测归档：提交超过保留期的会话移入 assessment_archive（scripts/archive_assessments.py）
+# 历史列表据此判断某页是否可能含归档行；调大前已归档的行可能晚于新的截止时间
+ASSESSMENT_ARCHIVE_RETENTION_DAYS = int(os.getenv("ASSESSMENT_ARCHIVE_RETENTION_DAYS", "180"))
+ASSESSMENT_ARCHIVE_BATCH = int(os.getenv("ASSESSMENT_ARCHIVE_BATCH", "200"))
+
+# 已提交评测详情缓存（序列化一次，ETag/304；app/services/assessment_detail_cache.py）
+ASSESSMENT_DETAIL_CACHE_TTL_SECONDS = int(os.getenv("ASSESSMENT_DETAIL_CACHE_TTL_SECONDS", "604800"))
+
+# LLM 调度：全局并发上限 + 排队预算（超出预算直接 503，<=0 表示不丢弃）
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_INTERACTIVE_WAIT_BUDGET_SECONDS = float(os.getenv("LLM_INTERACTIVE_WAIT_BUDGET_SECONDS", "10"))
+LLM_BACKGROUND_WAIT_BUDGET_SECONDS = float(os.getenv("LLM_BACKGROUND_WAIT_BUDGET_SECONDS", "0"))
+LLM_SERVICE_TIME_SECONDS = float(os.getenv("LLM_SERVICE_TIME_SECONDS", "3"))
+
+# LLM 上游超时与熔断：连续失败 N 次后熔断，冷却后放行探测请求
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# /ai/ask 模型路由：按问题长度/level 选档位，主档 p95 超阈值时降级到快档（见 app/services/llm/routing.py）
+LLM_ROUTING_POLICY = os.getenv("LLM_ROUTING_POLICY")  # JSON 字符串或 JSON 文件路径；为空用默认策略
+LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", "gpt-4o-mini")
+LLM_ROUTING_SHORT_QUESTION_CHARS = int(os.getenv("LLM_ROUTING_SHORT_QUESTION_CHARS", "200"))
+LLM_ROUTING_P95_THRESHOLD_MS = float(os.getenv("LLM_ROUTING_P95_THRESHOLD_MS", "8000"))
+
+# 主题对话：提示词 = 滚动摘要 + 最近 K 条消息；未摘要 token 超过阈值时后台压缩
+CHAT_RECENT_MESSAGES = int(os.getenv("CHAT_RECENT_MESSAGES", "8"))
+CHAT_SUMMARY_TRIGGER_TOKENS = int(os.getenv("CHAT_SUMMARY_TRIGGER_TOKENS", "2000"))
+
+# 随机抽题 id 池缓存（app/repositories/question_pool.py）；跨进程失效靠 Redis 版本号，TTL 兜底
+QUESTION_POOL_TTL_SECONDS = float(os.getenv("QUESTION_POOL_TTL_SECONDS", "300"))
+
+# 主题小测预生成题单池（app/services/quiz_pool.py）：每个 (主题, 题数) 备好 N 套随机题单
+QUIZ_POOL_ENABLED = os.getenv("QUIZ_POOL_ENABLED", "true").lower() in ("1", "true", "yes")
+QUIZ_POOL_SIZE = int(os.getenv("QUIZ_POOL_SIZE", "3"))
+QUIZ_POOL_TTL_SECONDS = int(os.getenv("QUIZ_POOL_TTL_SECONDS", "3600"))
+
+# 简答题自动判分（app/services/grading.py）：词级相似度（Dice）达到该比例即判对，
+# 作答与参考答案的词数之比超出 MAX_LENGTH_RATIO 时直接判错
+SHORT_ANSWER_MATCH_RATIO = float(os.getenv("SHORT_ANSWER_MATCH_RATIO", "0.75"))
+SHORT_ANSWER_MAX_LENGTH_RATIO = float(os.getenv("SHORT_ANSWER_MAX_LENGTH_RATIO", "2"))
+# 全局评测 / 旧版小测的简答题是否自动判分；关闭时与之前一样留空（is_correct 为 NULL）
+SHORT_ANSWER_AUTO_GRADE = os.getenv("SHORT_ANSWER_AUTO_GRADE", "false").lower() in ("1", "true", "yes")
+
+# LLM 调用遥测：内存缓冲后批量写入 llm_calls
+LLM_TELEMETRY_ENABLED = os.getenv("LLM_TELEMETRY_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_TELEMETRY_FLUSH_SECONDS = float(os.getenv("LLM_TELEMETRY_FLUSH_SECONDS", "5"))
+LLM_TELEMETRY_BATCH_SIZE = int(os.getenv("LLM_TELEMETRY_BATCH_SIZE", "500"))
+LLM_TELEMETRY_BUFFER_MAX = int(os.getenv("LLM_TELEMETRY_BUFFER_MAX", "10000"))
         # prompts 目录：可以从环境变量读，如果没有的话就是backend/prompts
 PROMPT_PATH = Path(os.getenv("PROMPTS_DIR") or (BACKEND_DIR / "static" / "prompts" / "default.json")).resolve()
 QUESTION_PATH = Path(os.getenv("QUESTION_DIR") or (BACKEND_DIR / "static" / "questionnaires" / "questionnaires.json")).resolve()
@@ -100,7 +100,8 @@ async def handle_biz_error(request: Request, exc: BizError) -> JSONResponse:
     # 输出异常日志
     _log_error("warning", request, exc.http_status, exc.code, exc.message)
     # 构造失败响应
-    return fail(http_status=exc.http_status, code=exc.code, message=exc.message, data=exc.data, request=request)
+    return fail(http_status=exc.http_status, code=exc.code, message=exc.message, data=exc.data,
+                request=request, headers=exc.headers)
 
 
 # 2) 协议层 HTTP 异常处理（HTTPException）
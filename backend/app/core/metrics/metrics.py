@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+# 进程内指标注册表（Prometheus 文本格式导出，见 GET /metrics）
+# 只实现 Counter / Gauge / Histogram 三种最常用类型，避免引入额外依赖。
+# 用法：
+#   QUEUE_DEPTH = gauge("llm_queue_depth", "Queued LLM calls", ["priority"])
+#   QUEUE_DEPTH.labels(priority="interactive").set(3)
+from __future__ import annotations
+
+import math
+import threading
+from typing import Iterable, Sequence
+
+_DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, **labels: str):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def _default(self):
+        return self.labels()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _Value:
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = float(value)
+
+    def render(self, name, labelnames, key) -> list[str]:
+        return [f"{name}{_label_str(labelnames, key)} {_fmt(self.value)}"]
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[idx] += 1
+
+    def render(self, name, labelnames, key) -> list[str]:
+        lines = []
+        for bound, count in zip(self.buckets, self.counts):
+            le = f'le="{_fmt(bound)}"'
+            lines.append(f"{name}_bucket{_label_str(labelnames, key, le)} {count}")
+        labels = _label_str(labelnames, key)
+        lines.append(f"{name}_sum{labels} {_fmt(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labelnames=(), buckets: Sequence[float] = _DEFAULT_BUCKETS):
+        buckets = tuple(sorted(buckets))
+        if buckets[-1] != math.inf:
+            buckets = buckets + (math.inf,)
+        self.buckets = buckets
+        super().__init__(name, doc, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+
+# ---------------------------- 注册表 -----------------------------------
+_REGISTRY: dict[str, _Metric] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _REGISTRY_LOCK:
+        existing = _REGISTRY.get(metric.name)
+        if existing is not None:
+            # 模块重复导入（如测试 reload）时复用已有指标
+            return existing
+        _REGISTRY[metric.name] = metric
+        return metric
+
+
+def counter(name: str, doc: str, labelnames: Iterable[str] = ()) -> Counter:
+    return _register(Counter(name, doc, labelnames))  # type: ignore[return-value]
+
+
+def gauge(name: str, doc: str, labelnames: Iterable[str] = ()) -> Gauge:
+    return _register(Gauge(name, doc, labelnames))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str,
+    doc: str,
+    labelnames: Iterable[str] = (),
+    buckets: Sequence[float] = _DEFAULT_BUCKETS,
+) -> Histogram:
+    return _register(Histogram(name, doc, labelnames, buckets))  # type: ignore[return-value]
+
+
+def render_latest() -> str:
+    """Render all registered metrics in Prometheus text exposition format."""
+    with _REGISTRY_LOCK:
+        metrics = list(_REGISTRY.values())
+    lines: list[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
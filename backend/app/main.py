@@ -3,6 +3,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.api.routes.assessment import router as assessment_router
 from app.api.old_routes.chat import router as chat_router
@@ -10,12 +11,21 @@ from app.api.routes.auth import router as auth_router
 from app.api.routes.admin_learning import router as admin_learning_router
 from app.api.routes.learning import router as learning_router
 from app.api.routes.onboarding import router as onboarding_router
+from app.api.routes.topic_chat import router as topic_chat_router
 from app.core.config.config import CORS_ORIGINS
 from app.core.exceptions.exceptions import setup_exception_handlers
 from app.core.logging.logging_config import setup_logging
+from app.core.metrics.metrics import render_latest
 from app.middleware.access_log import AccessLogMiddleware
 from app.middleware.request_id import RequestIDMiddleware
 from app.core.redis.redis_client import create_redis
+from app.repositories.question_pool import question_id_pool
+from app.services.answer_drafts import answer_drafts, draft_flusher
+from app.services.assessment_detail_cache import detail_cache
+from app.services.assessment_feedback import feedback_worker
+from app.services.llm.telemetry import llm_telemetry
+from app.services.quiz_pool import quiz_pool
+from app.services.session_sweeper import session_sweeper
 
 
 # @asynccontextmanager
@@ -43,11 +53,27 @@ async def lifespan(app: FastAPI):
         logging.getLogger(__name__).info("redis connected")
     except Exception as e:
         logging.getLogger(__name__).warning(f"redis ping failed: {e}")
+    question_id_pool.bind_redis(app.state.redis)
+    answer_drafts.bind_redis(app.state.redis)
+    quiz_pool.bind_redis(app.state.redis)
+    detail_cache.bind_redis(app.state.redis)
+
+    await feedback_worker.start()
+    await llm_telemetry.start()
+    await draft_flusher.start()
+    await quiz_pool.start()
+    await session_sweeper.start()
 
     try:
         yield
     finally:
         # ---------- shutdown ----------
+        await feedback_worker.stop()
+        await llm_telemetry.stop()
+        await draft_flusher.stop()
+        await quiz_pool.stop()
+        await session_sweeper.stop()
+
         try:
             await app.state.redis.close()
             logging.getLogger(__name__).info("redis closed")
@@ -98,10 +124,16 @@ def healthz():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_latest(), media_type="text/plain; version=0.0.4")
+
+
 # routers
 app.include_router(chat_router, prefix="/ai")
 app.include_router(assessment_router)
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(onboarding_router)
 app.include_router(learning_router)
+app.include_router(topic_chat_router)
 app.include_router(admin_learning_router)
\ No newline at end of file
@@ -1,4 +1,6 @@
 # backend/app/core/middleware/request_id.py
+from contextvars import ContextVar
+from typing import Optional
 from uuid import uuid4
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
@@ -6,11 +8,19 @@ from starlette.requests import Request
 
 HEADER_NAME = "X-Request-Id"
 
+# 当前请求的 request_id；拿不到 Request 对象的地方（如 LLM 遥测）从这里读
+request_id_ctx: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    return request_id_ctx.get()
+
 class RequestIDMiddleware(BaseHTTPMiddleware):
     """
     统一生成/透传 request_id：
     - 读取请求头 X-Request-Id（有则透传，无则生成）
     - 写入 request.state.request_id 供业务/日志使用
+    - 同时写入 contextvar request_id_ctx（下游任务/线程可读）
     - 写回响应头 X-Request-Id
     """
     def __init__(self, app: ASGIApp):
@@ -19,6 +29,10 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         rid = request.headers.get(HEADER_NAME) or str(uuid4())
         request.state.request_id = rid
-        response = await call_next(request)
+        token = request_id_ctx.set(rid)
+        try:
+            response = await call_next(request)
+        finally:
+            request_id_ctx.reset(token)
         response.headers[HEADER_NAME] = rid
         return response
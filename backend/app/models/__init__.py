@@ -4,8 +4,14 @@ from .user_auth import User, OAuthAccount, EmailVerifyToken, PasswordResetToken
 from .content import Board, Module, LearningTopic, LearningTopicContent
 from .progress import UserTopicProgress
 from .chat import ChatSession, ChatMessage
-from .assessment import Question, QuestionTopic, AssessmentSession, AssessmentItem
+from .assessment import (
+    Question, QuestionTopic, QuestionSnapshotRecord, AssessmentSession, AssessmentItem,
+)
 from .documents import Document, DocumentChunk
+from .explanations import TopicExplanation
+from .telemetry import LLMCall
+from .stats import QuestionStat, QuestionChoiceStat, TopicStat
+from .archive import AssessmentArchive
 from .survey import OnboardingSurvey, OnboardingSurveyAnswer, OnboardingSurveyOption
 from .user_sessions import UserSession
 
@@ -15,8 +21,12 @@ __all__ = [
     "Board", "Module", "LearningTopic", "LearningTopicContent",
     "UserTopicProgress",
     "ChatSession", "ChatMessage",
-    "Question", "QuestionTopic", "AssessmentSession", "AssessmentItem",
+    "Question", "QuestionTopic", "QuestionSnapshotRecord", "AssessmentSession", "AssessmentItem",
     "Document", "DocumentChunk",
+    "TopicExplanation",
+    "LLMCall",
+    "QuestionStat", "QuestionChoiceStat", "TopicStat",
+    "AssessmentArchive",
     "OnboardingSurvey", "OnboardingSurveyAnswer", "OnboardingSurveyOption",
 ]
 
@@ -0,0 +1,56 @@
+# backend/app/models/archive.py
+"""
+已归档评测（冷数据，见 app/repositories/assessment_archive.py）
+
+超过保留期的已提交会话从 assessment_sessions / items / responses 移到这里：
+每个会话一行，列表需要的字段单独成列，逐题回放内容（AssessmentDetailOut）
+gzip 压缩后存入 payload。只插入、不修改。
+"""
+from __future__ import annotations
+import uuid
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary, Numeric, SmallInteger, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class AssessmentArchive(Base):
+    """归档的已提交评测会话"""
+
+    __tablename__ = "assessment_archive"
+    __table_args__ = (
+        # 历史列表与热表同样按 (started_at, id) 倒序 keyset 翻页
+        sa.Index(
+            "ix_assessment_archive_user_history",
+            "user_id", "kind", "started_at", "session_id",
+        ),
+    )
+
+    session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    topic_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True))
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    submitted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    total_score: Mapped[Optional[float]] = mapped_column(Numeric)
+    question_count: Mapped[int] = mapped_column(
+        Integer, server_default=sa.text("0"), nullable=False
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False
+    )
+    # payload 编码版本，解码见 assessment_archive.unpack
+    format: Mapped[int] = mapped_column(SmallInteger, server_default=sa.text("1"), nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    @property
+    def id(self) -> uuid.UUID:
+        """与 AssessmentSession.id 同名，历史列表可混排两种行"""
+        return self.session_id
@@ -4,7 +4,8 @@
 - Question: 题库
 - QuestionTopic: 题目-主题关联
 - AssessmentSession: 评测会话
-- AssessmentItem: 题目快照
+- QuestionSnapshotRecord: 题目快照内容（按内容哈希去重）
+- AssessmentItem: 题目实例（引用快照）
 - AssessmentResponse: 答题记录（新增）
 """
 from __future__ import annotations
@@ -28,6 +29,7 @@ from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, uuid_pk_db
+from .documents import JSON_VARIANT
 
 QuestionType = Enum("single", "multi", "short", name="question_type")
 AssessmentKind = Enum("global", "topic_quiz", name="assessment_kind")
@@ -72,9 +74,19 @@ class AssessmentSession(Base):
     """评测会话"""
 
     __tablename__ = "assessment_sessions"
+    __table_args__ = (
+        # 历史列表 keyset 分页：按 (started_at, id) 倒序翻页
+        sa.Index(
+            "ix_assessment_sessions_user_history",
+            "user_id", "kind", "started_at", "id",
+        ),
+        # 后台清理未提交会话：submitted_at IS NULL AND started_at < :cutoff
+        sa.Index("ix_assessment_sessions_abandoned", "submitted_at", "started_at"),
+    )
 
+    # id 在客户端生成：会话与题目快照可在同一次 flush 中批量写入
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, server_default=uuid_pk_db()
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=uuid_pk_db()
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False
@@ -92,8 +104,19 @@ class AssessmentSession(Base):
     submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     total_score: Mapped[Optional[float]] = mapped_column(Numeric)
     ai_summary: Mapped[Optional[str]] = mapped_column(Text)
-    ai_recommendation: Mapped[Optional[dict]] = mapped_column(JSONB)
+    # PostgreSQL 上仍是 JSONB；SQLite（测试）下按 JSON 建表
+    ai_recommendation: Mapped[Optional[dict]] = mapped_column(JSON_VARIANT)
+    # AI 反馈生成状态：pending（后台生成中）/ ready / failed（保留兜底文案）
+    ai_status: Mapped[Optional[str]] = mapped_column(String(16), index=True)
+    ai_attempts: Mapped[int] = mapped_column(
+        Integer, server_default=sa.text("0"), nullable=False
+    )
+    ai_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     last_question_index: Mapped[Optional[int]] = mapped_column(Integer)
+    # 题目数量（创建会话时写入，历史列表无需再按会话 COUNT items）
+    question_count: Mapped[int] = mapped_column(
+        Integer, server_default=sa.text("0"), nullable=False
+    )
 
     # 关系
     items: Mapped[List["AssessmentItem"]] = relationship(
@@ -104,13 +127,29 @@ class AssessmentSession(Base):
     )
 
 
+class QuestionSnapshotRecord(Base):
+    """
+    题目快照内容：同一份内容只存一行，主键为规范化 JSON 的 sha256
+    （见 app/repositories/question_snapshots.py）。只插入、不修改，供审计回放。
+    """
+
+    __tablename__ = "question_snapshots"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSON_VARIANT, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False
+    )
+
+
 class AssessmentItem(Base):
-    """题目快照（评测中的题目实例）"""
+    """题目实例（评测中的一道题，内容引用 question_snapshots）"""
 
     __tablename__ = "assessment_items"
 
+    # 客户端生成 id：批量 flush 时无需逐行 RETURNING，多行合并成一条 INSERT
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, server_default=uuid_pk_db()
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=uuid_pk_db()
     )
     session_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("assessment_sessions.id", ondelete="CASCADE"),
@@ -118,13 +157,24 @@ class AssessmentItem(Base):
         nullable=False,
     )
     order_no: Mapped[int] = mapped_column(Integer, nullable=False)
-    question_snapshot: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    snapshot_hash: Mapped[str] = mapped_column(
+        ForeignKey("question_snapshots.hash"), index=True, nullable=False
+    )
 
     # 关系
     session: Mapped["AssessmentSession"] = relationship(back_populates="items")
     response: Mapped[Optional["AssessmentResponse"]] = relationship(
         back_populates="item", uselist=False
     )
+    # 查询 item 时总是 JOIN 出快照内容（只读）
+    snapshot: Mapped["QuestionSnapshotRecord"] = relationship(
+        lazy="joined", innerjoin=True, viewonly=True
+    )
+
+    @property
+    def question_snapshot(self) -> dict:
+        """快照内容（只读；写入见 question_snapshots.intern_snapshots）"""
+        return self.snapshot.payload
 
 
 # ========================================
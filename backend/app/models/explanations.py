@@ -0,0 +1,37 @@
+# backend/app/models/explanations.py
+from __future__ import annotations
+import uuid
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy import String, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, TimestampMixin, uuid_pk_db
+from .documents import JSON_VARIANT
+
+
+class TopicExplanation(TimestampMixin, Base):
+    """预生成的 /ai/explain 结果（离线批量生成，接口优先直接返回）"""
+    __tablename__ = "topic_explanations"
+    __table_args__ = (
+        UniqueConstraint(
+            "module_key", "subtopic_key", "level", "known_points_hash",
+            name="ux_topic_explanations_input",
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=uuid_pk_db())
+    topic_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("learning_topics.id", ondelete="CASCADE"), index=True
+    )
+
+    # 归一化后的请求参数（见 app/repositories/explanations.py: explanation_key）
+    module_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    subtopic_key: Mapped[str] = mapped_column(String(512), nullable=False)
+    level: Mapped[str] = mapped_column(String(32), nullable=False)
+    known_points_hash: Mapped[str] = mapped_column(String(64), nullable=False, server_default=sa.text("''"))
+
+    payload: Mapped[dict] = mapped_column(JSON_VARIANT, nullable=False)   # ExplainOut
+    model: Mapped[Optional[str]] = mapped_column(String(128))
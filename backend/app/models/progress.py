@@ -44,7 +44,12 @@ class UserTopicProgress(TimestampMixin, Base):
     last_quiz_session_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         UUID(as_uuid=True), ForeignKey("assessment_sessions.id", ondelete="SET NULL")
     )
+    # 进行中的小测只存引用：{"session_id": ..., "item_ids": [...]}（题目内容在 assessment_items）
     pending_quiz: Mapped[Optional[dict]] = mapped_column(JSONB)
+    # 小测状态版本号：开始 / 提交都以 CAS（WHERE quiz_version = 读到的值）更新
+    quiz_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default=sa.text("0"), nullable=False
+    )
     quiz_state: Mapped[str] = mapped_column(
         QuizStateEnum, server_default=sa.text("'none'"), nullable=False
     )
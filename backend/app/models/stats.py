@@ -0,0 +1,71 @@
+# backend/app/models/stats.py
+"""
+题目表现统计（增量维护，见 app/repositories/item_stats.py）
+- QuestionStat: 每题作答次数 / 答对次数 / 得分合计
+- QuestionChoiceStat: 每题每个选项被选次数
+- TopicStat: 每个主题的同类汇总
+
+判分事务内按增量 UPSERT，报表与抽题决策只读这几张小表，不扫 assessment_responses。
+"""
+from __future__ import annotations
+import uuid
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, PrimaryKeyConstraint, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class _Counters:
+    attempts: Mapped[int] = mapped_column(Integer, server_default=sa.text("0"), nullable=False)
+    correct: Mapped[int] = mapped_column(Integer, server_default=sa.text("0"), nullable=False)
+    score_sum: Mapped[float] = mapped_column(Numeric, server_default=sa.text("0"), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False
+    )
+
+    @property
+    def mean_score(self) -> Optional[float]:
+        return float(self.score_sum) / self.attempts if self.attempts else None
+
+    @property
+    def correct_rate(self) -> Optional[float]:
+        return self.correct / self.attempts if self.attempts else None
+
+
+class QuestionStat(_Counters, Base):
+    """每题作答统计"""
+
+    __tablename__ = "question_stats"
+
+    question_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class QuestionChoiceStat(Base):
+    """每题每个选项的被选次数（单选/多选）"""
+
+    __tablename__ = "question_choice_stats"
+    __table_args__ = (
+        PrimaryKeyConstraint("question_id", "choice", name="pk_question_choice_stats"),
+    )
+
+    question_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("questions.id", ondelete="CASCADE"), nullable=False
+    )
+    choice: Mapped[str] = mapped_column(String(16), nullable=False)
+    selections: Mapped[int] = mapped_column(Integer, server_default=sa.text("0"), nullable=False)
+
+
+class TopicStat(_Counters, Base):
+    """每个主题的作答统计（一题多主题时计入每个主题）"""
+
+    __tablename__ = "topic_stats"
+
+    topic_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("learning_topics.id", ondelete="CASCADE"), primary_key=True
+    )
@@ -0,0 +1,32 @@
+# backend/app/models/telemetry.py
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class LLMCall(Base):
+    """每次 LLM 调用一行（只追加），汇总见视图 llm_call_stats_hourly"""
+    __tablename__ = "llm_calls"
+
+    # 自增主键，行尽量小；SQLite 下只有 INTEGER PRIMARY KEY 才会自增
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer(), "sqlite"), primary_key=True, autoincrement=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False, index=True
+    )
+    request_id: Mapped[Optional[str]] = mapped_column(String(64), index=True)   # X-Request-Id
+    operation: Mapped[str] = mapped_column(String(32), nullable=False)          # explain / ask / chat_reply ...
+    model: Mapped[Optional[str]] = mapped_column(String(128))
+    prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, server_default=sa.text("0"))
+    completion_tokens: Mapped[int] = mapped_column(Integer, nullable=False, server_default=sa.text("0"))
+    latency_ms: Mapped[int] = mapped_column(Integer, nullable=False, server_default=sa.text("0"))
+    retries: Mapped[int] = mapped_column(SmallInteger, nullable=False, server_default=sa.text("0"))
+    cache_hit: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=sa.text("false"))
+    status: Mapped[str] = mapped_column(String(16), nullable=False)             # ok / error / timeout / circuit_open
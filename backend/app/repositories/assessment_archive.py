@@ -0,0 +1,235 @@
+# backend/app/repositories/assessment_archive.py
+"""
+评测归档（AssessmentArchive）数据访问层
+
+热表只保留保留期内的会话；更早的已提交会话由归档任务
+（app/services/assessment_archive.py）整行搬到 assessment_archive：
+- 选取：submitted_at 早于截止时间、AI 反馈已结束、且不是某个主题进度
+  仍指向的最近一次小测（走 ix_assessment_sessions_abandoned）
+- 写入：INSERT ... ON CONFLICT DO NOTHING，重复执行幂等
+- 读取：详情在热表未命中时回落到这里（解压 payload）；历史列表翻到
+  保留期之前时与热表 UNION ALL 混排
+"""
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import datetime
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, desc, exists, func, or_, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive import AssessmentArchive
+from app.models.assessment import AssessmentSession
+from app.models.progress import UserTopicProgress
+
+PAYLOAD_FORMAT = 1  # gzip(JSON of AssessmentDetailOut)
+
+
+# ========================================
+# 一、payload 编解码
+# ========================================
+
+
+def pack(detail: dict) -> bytes:
+    """
+    详情 dict → 压缩字节
+
+    Example:
+        >>> pack(detail.model_dump(mode="json"))
+    """
+    raw = json.dumps(detail, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(raw, compresslevel=6)
+
+
+def unpack(payload: bytes, fmt: int = PAYLOAD_FORMAT) -> dict:
+    """压缩字节 → 详情 dict"""
+    if fmt != PAYLOAD_FORMAT:
+        raise ValueError(f"unsupported archive payload format: {fmt}")
+    return json.loads(gzip.decompress(payload).decode("utf-8"))
+
+
+# ========================================
+# 二、归档（热表 → 冷表）
+# ========================================
+
+
+async def list_archivable_sessions(
+    db: AsyncSession, *, submitted_before: datetime, limit: int = 200
+) -> List[AssessmentSession]:
+    """
+    取一批可归档的会话（按提交时间从旧到新）
+
+    AI 反馈仍在生成（pending）的会话、以及 user_topic_progress.last_quiz_session_id
+    仍引用的会话留在热表。
+    """
+    still_referenced = exists().where(
+        UserTopicProgress.last_quiz_session_id == AssessmentSession.id
+    )
+    result = await db.execute(
+        select(AssessmentSession)
+        .where(
+            and_(
+                AssessmentSession.submitted_at.is_not(None),
+                AssessmentSession.submitted_at < submitted_before,
+                or_(
+                    AssessmentSession.ai_status.is_(None),
+                    AssessmentSession.ai_status != "pending",
+                ),
+                ~still_referenced,
+            )
+        )
+        .order_by(AssessmentSession.submitted_at)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+def _insert(db: AsyncSession):
+    return sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+
+
+async def insert_archived(db: AsyncSession, rows: List[dict]) -> None:
+    """
+    批量写入归档行（不提交事务；已存在的 session_id 跳过）
+
+    Args:
+        rows: AssessmentArchive 列 → 值，payload 为 pack() 结果
+    """
+    if not rows:
+        return
+    stmt = _insert(db)(AssessmentArchive).values(rows)
+    await db.execute(stmt.on_conflict_do_nothing(index_elements=["session_id"]))
+
+
+def archive_row(session: AssessmentSession, detail: dict) -> dict:
+    """热表会话 + 已渲染详情 → 归档行"""
+    return {
+        "session_id": session.id,
+        "user_id": session.user_id,
+        "kind": session.kind,
+        "topic_id": session.topic_id,
+        "started_at": session.started_at,
+        "submitted_at": session.submitted_at,
+        "total_score": session.total_score,
+        "question_count": session.question_count or 0,
+        "format": PAYLOAD_FORMAT,
+        "payload": pack(detail),
+    }
+
+
+async def delete_hot_sessions(db: AsyncSession, session_ids: Iterable[UUID]) -> int:
+    """删除已归档的热表会话（items / responses 由外键级联删除）"""
+    from sqlalchemy import delete as sql_delete
+
+    ids = list(session_ids)
+    if not ids:
+        return 0
+    result = await db.execute(
+        sql_delete(AssessmentSession)
+        .where(AssessmentSession.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+# ========================================
+# 三、读取（慢路径）
+# ========================================
+
+
+async def get_archived(db: AsyncSession, session_id: UUID) -> Optional[AssessmentArchive]:
+    return await db.get(AssessmentArchive, session_id)
+
+
+async def count_user_history(
+    db: AsyncSession, user_id: UUID, kind: str = "global"
+) -> tuple[int, int]:
+    """
+    历史总数：一条语句同时数热表（已提交）与归档
+
+    Returns:
+        (热表条数, 归档条数)
+    """
+    hot = (
+        select(func.count())
+        .select_from(AssessmentSession)
+        .where(
+            and_(
+                AssessmentSession.user_id == user_id,
+                AssessmentSession.kind == kind,
+                AssessmentSession.submitted_at.is_not(None),
+            )
+        )
+        .scalar_subquery()
+    )
+    cold = (
+        select(func.count())
+        .select_from(AssessmentArchive)
+        .where(and_(AssessmentArchive.user_id == user_id, AssessmentArchive.kind == kind))
+        .scalar_subquery()
+    )
+    row = (await db.execute(select(hot, cold))).one()
+    return int(row[0] or 0), int(row[1] or 0)
+
+
+async def get_merged_history(
+    db: AsyncSession,
+    user_id: UUID,
+    kind: str = "global",
+    limit: int = 10,
+    offset: int = 0,
+    after: Optional[tuple[datetime, UUID]] = None,
+) -> list:
+    """
+    热表 + 归档混排的一页历史（UNION ALL，排序与翻页都在数据库里完成）
+
+    after 给出时按 (started_at, id) keyset 翻页，否则走 OFFSET。
+
+    Returns:
+        行列表（id / kind / started_at / submitted_at / total_score / question_count）
+    """
+    hot = select(
+        AssessmentSession.id.label("id"),
+        AssessmentSession.kind.label("kind"),
+        AssessmentSession.started_at.label("started_at"),
+        AssessmentSession.submitted_at.label("submitted_at"),
+        AssessmentSession.total_score.label("total_score"),
+        AssessmentSession.question_count.label("question_count"),
+    ).where(
+        and_(
+            AssessmentSession.user_id == user_id,
+            AssessmentSession.kind == kind,
+            AssessmentSession.submitted_at.is_not(None),
+        )
+    )
+    cold = select(
+        AssessmentArchive.session_id.label("id"),
+        AssessmentArchive.kind.label("kind"),
+        AssessmentArchive.started_at.label("started_at"),
+        AssessmentArchive.submitted_at.label("submitted_at"),
+        AssessmentArchive.total_score.label("total_score"),
+        AssessmentArchive.question_count.label("question_count"),
+    ).where(and_(AssessmentArchive.user_id == user_id, AssessmentArchive.kind == kind))
+    if after is not None:
+        hot = hot.where(
+            tuple_(AssessmentSession.started_at, AssessmentSession.id) < tuple_(*after)
+        )
+        cold = cold.where(
+            tuple_(AssessmentArchive.started_at, AssessmentArchive.session_id) < tuple_(*after)
+        )
+
+    merged = union_all(hot, cold).subquery()
+    query = (
+        select(merged)
+        .order_by(desc(merged.c.started_at), desc(merged.c.id))
+        .limit(limit)
+    )
+    if after is None and offset:
+        query = query.offset(offset)
+    result = await db.execute(query)
+    return list(result.all())
@@ -4,13 +4,14 @@
 负责 assessment_items 表的 CRUD 操作
 """
 from __future__ import annotations
-from typing import Optional, List
-from uuid import UUID
+from typing import Dict, Optional, List
+from uuid import UUID, uuid4
 
 from sqlalchemy import select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.assessment import AssessmentItem
+from app.models.assessment import AssessmentItem, QuestionSnapshotRecord
+from app.repositories import question_snapshots as snapshots_repo
 from app.schemas.assessment import QuestionDTO, QuestionSnapshot
 
 
@@ -29,7 +30,7 @@ async def create_item(
         db: 数据库会话
         session_id: 评测会话ID
         order_no: 题号
-        question_snapshot: 题目快照（JSONB格式）
+        question_snapshot: 题目快照内容（存入 question_snapshots，item 只引用哈希）
 
     Returns:
         创建的题目对象
@@ -44,8 +45,9 @@ async def create_item(
         ...     db, session_id=session_id, order_no=1, question_snapshot=snapshot
         ... )
     """
-    item = AssessmentItem(
-        session_id=session_id, order_no=order_no, question_snapshot=question_snapshot
+    [record] = await snapshots_repo.intern_snapshots(db, [question_snapshot])
+    item = snapshots_repo.attach_snapshot(
+        AssessmentItem(session_id=session_id, order_no=order_no), record
     )
     db.add(item)
     await db.flush()  # 获取 item.id，但不提交事务
@@ -53,7 +55,11 @@ async def create_item(
 
 
 async def create_items_batch(
-    db: AsyncSession, *, session_id: UUID, questions: List[QuestionDTO]
+    db: AsyncSession,
+    *,
+    session_id: UUID,
+    questions: List[QuestionDTO],
+    grading_keys: Optional[Dict[UUID, dict]] = None,
 ) -> List[AssessmentItem]:
     """
     批量创建题目快照（用于开始评测时）
@@ -62,13 +68,17 @@ async def create_items_batch(
         db: 数据库会话
         session_id: 评测会话ID
         questions: 题目列表（从 questions 表查询得到）
+        grading_keys: {question_id: 预编译判分键}（见 app/services/grading.py），
+            写入快照的 grading 字段，提交时直接判分
 
     Returns:
         创建的题目对象列表
 
     Note:
-        - question_snapshot 不包含答案（answer_key），防止泄露
+        - question_snapshot 不包含原始 answer_key；grading 字段只在服务端使用，
+          返回前端时统一经 QuestionSnapshot 过滤
         - 按 order_no 自动编号（1, 2, 3...）
+        - id 在客户端生成，所有题目在一次 flush 中以单条多行 INSERT 写入
 
     Example:
         >>> questions = await get_random_questions(db, count=20)
@@ -78,9 +88,8 @@ async def create_items_batch(
         >>> len(items)
         20
     """
-    items = []
-
-    for idx, question in enumerate(questions, start=1):
+    snapshots = []
+    for question in questions:
         # 构建快照：仅包含前端需要的字段，不含答案
         snapshot = {
             "question_id": str(question.id),
@@ -89,13 +98,20 @@ async def create_items_batch(
             "choices": question.choices,  # JSONB 格式
             # 注意：不包含 answer_key 和 explanation
         }
-
-        item = AssessmentItem(
-            session_id=session_id, order_no=idx, question_snapshot=snapshot
+        if grading_keys and question.id in grading_keys:
+            snapshot["grading"] = grading_keys[question.id]
+        snapshots.append(snapshot)
+
+    # 快照内容按哈希去重写入 question_snapshots，item 只存哈希
+    records = await snapshots_repo.intern_snapshots(db, snapshots)
+    items = [
+        snapshots_repo.attach_snapshot(
+            AssessmentItem(id=uuid4(), session_id=session_id, order_no=idx), record
         )
-        db.add(item)
-        items.append(item)
+        for idx, record in enumerate(records, start=1)
+    ]
 
+    db.add_all(items)
     await db.flush()
     return items
 
@@ -109,7 +125,8 @@ async def create_items_from_snapshots(
     Args:
         db: 数据库会话
         session_id: 评测会话ID
-        snapshots: 快照列表（来自 user_topic_progress.pending_quiz）
+        snapshots: [{order_no, snapshot}]，snapshot 为快照内容
+            （pending_quiz 中只存哈希，调用方先用 question_snapshots.get_snapshots 取回）
 
     Returns:
         创建的题目对象列表
@@ -120,23 +137,29 @@ async def create_items_from_snapshots(
         2. submit 阶段：创建 session，从 pending_quiz 复制到 assessment_items
 
     Example:
-        >>> # 从 pending_quiz 读取
-        >>> pending_quiz = progress.pending_quiz  # [{order_no, snapshot}, ...]
         >>> items = await create_items_from_snapshots(
-        ...     db, session_id=session_id, snapshots=pending_quiz
+        ...     db,
+        ...     session_id=session_id,
+        ...     snapshots=[{"order_no": 1, "snapshot": payload}],
         ... )
     """
-    items = []
-
-    for snapshot_data in snapshots:
-        item = AssessmentItem(
-            session_id=session_id,
-            order_no=snapshot_data.get("order_no", 0),
-            question_snapshot=snapshot_data.get("snapshot", {}),
+    records = await snapshots_repo.intern_snapshots(
+        db, [snapshot_data.get("snapshot") or {} for snapshot_data in snapshots]
+    )
+    items = [
+        snapshots_repo.attach_snapshot(
+            AssessmentItem(
+                id=uuid4(),
+                session_id=session_id,
+                order_no=snapshot_data.get("order_no", 0),
+            ),
+            record,
         )
-        db.add(item)
-        items.append(item)
+        for snapshot_data, record in zip(snapshots, records)
+    ]
 
+    # 客户端 id + 单次 flush：一条多行 INSERT
+    db.add_all(items)
     await db.flush()
     return items
 
@@ -163,6 +186,34 @@ async def get_item_by_id(db: AsyncSession, item_id: UUID) -> Optional[Assessment
     return result.scalar_one_or_none()
 
 
+async def get_session_item_qtypes(
+    db: AsyncSession, session_id: UUID, item_ids: List[UUID]
+) -> Dict[UUID, Optional[str]]:
+    """
+    一次查询校验多道题是否属于该会话，并取出题型（批量保存答案用）
+
+    Args:
+        db: 数据库会话
+        session_id: 会话ID
+        item_ids: 待校验的题目实例ID
+
+    Returns:
+        {item_id: qtype}；不属于该会话的 item_id 不出现在结果中
+
+    Example:
+        >>> qtypes = await get_session_item_qtypes(db, session_id, [item_a, item_b])
+        >>> missing = set([item_a, item_b]) - qtypes.keys()
+    """
+    if not item_ids:
+        return {}
+    result = await db.execute(
+        select(AssessmentItem.id, QuestionSnapshotRecord.payload)
+        .join(QuestionSnapshotRecord, QuestionSnapshotRecord.hash == AssessmentItem.snapshot_hash)
+        .where(and_(AssessmentItem.session_id == session_id, AssessmentItem.id.in_(item_ids)))
+    )
+    return {row.id: (row.payload or {}).get("qtype") for row in result.all()}
+
+
 async def get_session_items(
     db: AsyncSession, session_id: UUID, order_by_no: bool = True
 ) -> List[AssessmentItem]:
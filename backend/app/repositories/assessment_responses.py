@@ -4,15 +4,26 @@
 负责 assessment_responses 表的 CRUD 操作
 """
 from __future__ import annotations
-from typing import Optional, List
-from uuid import UUID
-
-from sqlalchemy import select, update, and_, func
+from typing import NamedTuple, Optional, List
+from uuid import UUID, uuid4
+
+import sqlalchemy as sa
+from sqlalchemy import select, update, and_, func, case, union_all
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.assessment import AssessmentResponse
 
 
+class SessionScoreTotals(NamedTuple):
+    """批量判分写回后的会话汇总（与 UPDATE 同一次往返返回）"""
+    updated: int
+    total_score: float
+    correct_count: int
+
+
 # ========================================
 # 一、创建（Create）
 # ========================================
@@ -284,66 +295,95 @@ async def upsert_response(
     session_id: UUID,
     item_id: UUID,
     answer: str,
-    is_correct: Optional[bool] = None,
-    score: Optional[float] = None,
 ) -> AssessmentResponse:
     """
-    创建或更新答题记录（自动保存场景）
+    创建或更新单题答案（自动保存场景）
+
+    与批量保存共用 upsert_answers_bulk，单题即一条 INSERT ... ON CONFLICT
 
     Args:
         db: 数据库会话
         session_id: 会话ID
         item_id: 题目实例ID
-        answer: 答案
-        is_correct: 是否正确（可选）
-        score: 得分（可选）
+        answer: 答案（已标准化）
 
     Returns:
         答题记录对象
 
-    Note:
-        如果已存在，则更新；否则创建
-
     Example:
         >>> # 自动保存：不用判断是否存在，直接upsert
         >>> response = await upsert_response(
         ...     db, session_id=session_id, item_id=item_id, answer="B"
         ... )
     """
-    existing = await get_response_by_item(db, item_id)
-
-    if existing:
-        # 更新
-        existing.answer = answer
-        if is_correct is not None:
-            existing.is_correct = is_correct
-        if score is not None:
-            existing.score = score
-        await db.flush()
-        return existing
-    else:
-        # 创建
-        return await create_response(
-            db,
-            session_id=session_id,
-            item_id=item_id,
-            answer=answer,
-            is_correct=is_correct,
-            score=score,
-        )
+    await upsert_answers_bulk(db, session_id=session_id, answers={item_id: answer})
+    result = await db.execute(
+        select(AssessmentResponse)
+        .where(AssessmentResponse.item_id == item_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
 
 
-async def batch_update_scores(db: AsyncSession, item_scores: dict[UUID, dict]) -> int:
+async def upsert_answers_bulk(
+    db: AsyncSession, *, session_id: UUID, answers: dict[UUID, str]
+) -> int:
+    """
+    批量写入答案：一条多行 INSERT ... ON CONFLICT (item_id) DO UPDATE
+
+    Args:
+        db: 数据库会话
+        session_id: 会话ID
+        answers: {item_id: 已标准化的答案}
+
+    Returns:
+        写入的行数
+
+    Note:
+        只覆盖 answer / updated_at，已有的判分结果保持不变；
+        单题保存（upsert_response）与批量保存都走这一条语句
+
+    Example:
+        >>> await upsert_answers_bulk(
+        ...     db, session_id=session_id, answers={item_a: "B", item_b: "A,C"}
+        ... )
+    """
+    if not answers:
+        return 0
+    insert = sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+    stmt = insert(AssessmentResponse).values(
+        [
+            # id 在客户端生成：SQLite 没有 gen_random_uuid()
+            {"id": uuid4(), "session_id": session_id, "item_id": item_id, "answer": answer}
+            for item_id, answer in answers.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AssessmentResponse.item_id],
+        set_={"answer": stmt.excluded.answer, "updated_at": func.now()},
+        where=AssessmentResponse.session_id == session_id,
+    )
+    await db.execute(stmt.execution_options(synchronize_session=False))
+    return len(answers)
+
+
+async def batch_update_scores(
+    db: AsyncSession, item_scores: dict[UUID, dict], *, session_id: Optional[UUID] = None
+) -> int:
     """
     批量更新答题记录的判分结果（用于提交后统一判分）
 
     Args:
         db: 数据库会话
         item_scores: {item_id: {"is_correct": bool, "score": float}}
+        session_id: 限定会话（可选，防止误改其他会话）
 
     Returns:
         受影响的行数
 
+    Note:
+        所有题目在一条 UPDATE 中写回（见 apply_scores_and_totals）
+
     Example:
         >>> # 批量判分后更新
         >>> scores = {
@@ -354,22 +394,104 @@ async def batch_update_scores(db: AsyncSession, item_scores: dict[UUID, dict]) -
     """
     if not item_scores:
         return 0
+    result = await db.execute(_case_update(item_scores, session_id))
+    return result.rowcount or 0
 
-    count = 0
-    for item_id, score_data in item_scores.items():
-        stmt = (
-            update(AssessmentResponse)
-            .where(AssessmentResponse.item_id == item_id)
-            .values(
-                is_correct=score_data.get("is_correct"),
-                score=score_data.get("score"),
-            )
-            .execution_options(synchronize_session=False)
+
+async def apply_scores_and_totals(
+    db: AsyncSession, *, session_id: UUID, item_scores: dict[UUID, dict]
+) -> SessionScoreTotals:
+    """
+    写回判分结果并返回会话总分 / 答对题数
+
+    Args:
+        db: 数据库会话
+        session_id: 会话ID
+        item_scores: {item_id: {"is_correct": bool, "score": float}}
+
+    Returns:
+        SessionScoreTotals(updated, total_score, correct_count)
+
+    Note:
+        - PostgreSQL: UPDATE ... FROM (VALUES ...) 放在 CTE 中，同一条语句里
+          汇总「本次更新的行 + 会话中其余已判分的行」，一次往返
+        - SQLite（本地/测试）：不支持带 UPDATE 的 CTE，用 CASE 单条 UPDATE + 一次汇总查询
+
+    Example:
+        >>> totals = await apply_scores_and_totals(
+        ...     db, session_id=session_id, item_scores=scores
+        ... )
+        >>> totals.total_score, totals.correct_count
+    """
+    if db.bind.dialect.name != "postgresql":
+        updated = await batch_update_scores(db, item_scores, session_id=session_id)
+        total, correct = (await db.execute(_totals_query(session_id))).one()
+        return SessionScoreTotals(updated, round(float(total or 0), 2), int(correct or 0))
+
+    if not item_scores:
+        total, correct = (await db.execute(_totals_query(session_id))).one()
+        return SessionScoreTotals(0, round(float(total or 0), 2), int(correct or 0))
+
+    ar = AssessmentResponse
+    values = sa.values(
+        sa.column("item_id", PG_UUID(as_uuid=True)),
+        sa.column("is_correct", sa.Boolean()),
+        sa.column("score", sa.Numeric()),
+        name="v",
+    ).data([
+        (item_id, data.get("is_correct"), data.get("score"))
+        for item_id, data in item_scores.items()
+    ])
+    upd = (
+        update(ar)
+        .where(ar.item_id == values.c.item_id, ar.session_id == session_id)
+        .values(is_correct=values.c.is_correct, score=values.c.score)
+        .returning(ar.item_id, ar.is_correct, ar.score)
+        .cte("upd")
+    )
+    # CTE 中的 UPDATE 对同一语句的其他部分不可见：已更新的行取 RETURNING，其余行取原表
+    untouched = select(ar.is_correct, ar.score).where(
+        ar.session_id == session_id, ar.item_id.not_in(select(upd.c.item_id))
+    )
+    rows = union_all(select(upd.c.is_correct, upd.c.score), untouched).subquery("rows")
+    stmt = select(
+        select(func.count()).select_from(upd).scalar_subquery().label("updated"),
+        func.coalesce(func.sum(rows.c.score), 0).label("total_score"),
+        func.count().filter(rows.c.is_correct.is_(True)).label("correct_count"),
+    ).select_from(rows)
+    updated, total, correct = (await db.execute(stmt)).one()
+    return SessionScoreTotals(int(updated or 0), round(float(total or 0), 2), int(correct or 0))
+
+
+def _case_update(item_scores: dict[UUID, dict], session_id: Optional[UUID]):
+    """单条 UPDATE ... SET col = CASE item_id WHEN ... END（任意方言可用）"""
+    ar = AssessmentResponse
+    stmt = (
+        update(ar)
+        .where(ar.item_id.in_(list(item_scores)))
+        .values(
+            is_correct=case(
+                {item_id: data.get("is_correct") for item_id, data in item_scores.items()},
+                value=ar.item_id,
+            ),
+            score=case(
+                {item_id: data.get("score") for item_id, data in item_scores.items()},
+                value=ar.item_id,
+            ),
         )
-        result = await db.execute(stmt)
-        count += result.rowcount or 0
+        .execution_options(synchronize_session=False)
+    )
+    if session_id is not None:
+        stmt = stmt.where(ar.session_id == session_id)
+    return stmt
+
 
-    return count
+def _totals_query(session_id: UUID):
+    ar = AssessmentResponse
+    return select(
+        func.coalesce(func.sum(ar.score), 0),
+        func.count().filter(ar.is_correct.is_(True)),
+    ).where(ar.session_id == session_id)
 
 
 # ========================================
@@ -5,10 +5,10 @@
 """
 from __future__ import annotations
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 
-from sqlalchemy import select, update, func, and_, desc
+from sqlalchemy import select, update, func, and_, desc, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.assessment import AssessmentSession
@@ -81,6 +81,14 @@ async def get_session_by_id(
     return result.scalar_one_or_none()
 
 
+async def get_ai_status(db: AsyncSession, session_id: UUID) -> Optional[str]:
+    """只查询 ai_status（长轮询期间的短查询，不加载整行）"""
+    result = await db.execute(
+        select(AssessmentSession.ai_status).where(AssessmentSession.id == session_id)
+    )
+    return result.scalar_one_or_none()
+
+
 async def get_user_session(
     db: AsyncSession, session_id: UUID, user_id: UUID
 ) -> Optional[AssessmentSession]:
@@ -146,16 +154,25 @@ async def get_user_history(
     kind: str = "global",
     page: int = 1,
     limit: int = 10,
-) -> tuple[List[AssessmentSession], int]:
+    after: Optional[tuple[datetime, UUID]] = None,
+    with_total: bool = True,
+) -> tuple[List[AssessmentSession], Optional[int]]:
     """
-    查询用户的评测历史（已提交的会话）
+    查询用户的评测历史（已提交的会话），按 (started_at, id) 倒序
+
+    两种翻页方式：
+    - after 给出时走 keyset 分页：只取排在游标 (started_at, id) 之后的行，
+      深页也不需要 OFFSET 扫描（走 ix_assessment_sessions_user_history）
+    - 否则按 page/limit 走 OFFSET（兼容老客户端）
 
     Args:
         db: 数据库会话
         user_id: 用户ID
         kind: 评测类型（默认 'global'）
-        page: 页码（从1开始）
+        page: 页码（从1开始，after 给出时忽略）
         limit: 每页条数
+        after: 上一页最后一条的 (started_at, id)
+        with_total: False 时不查总数（返回 None；调用方另行计数）
 
     Returns:
         (会话列表, 总条数) 元组
@@ -164,38 +181,41 @@ async def get_user_history(
         >>> sessions, total = await get_user_history(
         ...     db, user_id=user_id, page=1, limit=10
         ... )
-        >>> print(f"Found {total} sessions, showing {len(sessions)}")
+        >>> last = sessions[-1]
+        >>> next_page, _ = await get_user_history(
+        ...     db, user_id=user_id, limit=10, after=(last.started_at, last.id)
+        ... )
     """
+    conditions = [
+        AssessmentSession.user_id == user_id,
+        AssessmentSession.kind == kind,
+        AssessmentSession.submitted_at.is_not(None),
+    ]
+
     # 查询总数
-    count_query = (
-        select(func.count())
-        .select_from(AssessmentSession)
-        .where(
-            and_(
-                AssessmentSession.user_id == user_id,
-                AssessmentSession.kind == kind,
-                AssessmentSession.submitted_at.is_not(None),
-            )
+    total = None
+    if with_total:
+        count_query = (
+            select(func.count())
+            .select_from(AssessmentSession)
+            .where(and_(*conditions))
         )
-    )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+        total_result = await db.execute(count_query)
+        total = total_result.scalar() or 0
 
     # 查询分页数据
-    offset = (page - 1) * limit
     data_query = (
         select(AssessmentSession)
-        .where(
-            and_(
-                AssessmentSession.user_id == user_id,
-                AssessmentSession.kind == kind,
-                AssessmentSession.submitted_at.is_not(None),
-            )
-        )
-        .order_by(desc(AssessmentSession.submitted_at))
-        .offset(offset)
+        .where(and_(*conditions))
+        .order_by(desc(AssessmentSession.started_at), desc(AssessmentSession.id))
         .limit(limit)
     )
+    if after is not None:
+        data_query = data_query.where(
+            tuple_(AssessmentSession.started_at, AssessmentSession.id) < tuple_(*after)
+        )
+    else:
+        data_query = data_query.offset((page - 1) * limit)
     result = await db.execute(data_query)
     sessions = list(result.scalars().all())
 
@@ -237,7 +257,7 @@ async def get_topic_quiz_session(
 
 
 async def update_last_question_index(
-    db: AsyncSession, session_id: UUID, last_question_index: int
+    db: AsyncSession, session_id: UUID, last_question_index: int, *, open_only: bool = False
 ) -> int:
     """
     更新会话的最后答题位置（用于进度追踪）
@@ -246,13 +266,17 @@ async def update_last_question_index(
         db: 数据库会话
         session_id: 会话ID
         last_question_index: 最后答题的题号
+        open_only: 只更新未提交的会话（草稿落库用它先锁住会话行）
 
     Returns:
-        受影响的行数（应为1）
+        受影响的行数（应为1；open_only 且会话已提交时为0）
     """
+    conditions = [AssessmentSession.id == session_id]
+    if open_only:
+        conditions.append(AssessmentSession.submitted_at.is_(None))
     stmt = (
         update(AssessmentSession)
-        .where(AssessmentSession.id == session_id)
+        .where(and_(*conditions))
         .values(last_question_index=last_question_index)
         .execution_options(synchronize_session=False)
     )
@@ -266,6 +290,7 @@ async def mark_as_submitted(
     total_score: float,
     ai_summary: Optional[str] = None,
     ai_recommendation: Optional[dict] = None,
+    ai_status: Optional[str] = None,
 ) -> int:
     """
     标记会话为已提交并更新评分/总结
@@ -276,6 +301,7 @@ async def mark_as_submitted(
         total_score: 总分
         ai_summary: AI生成的总结（可选）
         ai_recommendation: AI生成的建议（可选）
+        ai_status: AI反馈状态（'pending' 表示交由后台任务生成）
 
     Returns:
         受影响的行数（应为1）
@@ -300,6 +326,8 @@ async def mark_as_submitted(
             total_score=total_score,
             ai_summary=ai_summary,
             ai_recommendation=ai_recommendation,
+            ai_status=ai_status,
+            ai_updated_at=datetime.now(timezone.utc) if ai_status else None,
         )
         .execution_options(synchronize_session=False)
     )
@@ -312,6 +340,7 @@ async def update_ai_content(
     session_id: UUID,
     ai_summary: Optional[str] = None,
     ai_recommendation: Optional[dict] = None,
+    ai_status: Optional[str] = None,
 ) -> int:
     """
     单独更新AI生成的内容（用于异步生成场景）
@@ -321,6 +350,7 @@ async def update_ai_content(
         session_id: 会话ID
         ai_summary: AI总结
         ai_recommendation: AI建议
+        ai_status: AI反馈状态（'ready' / 'failed'）
 
     Returns:
         受影响的行数
@@ -340,10 +370,14 @@ async def update_ai_content(
         values["ai_summary"] = ai_summary
     if ai_recommendation is not None:
         values["ai_recommendation"] = ai_recommendation
+    if ai_status is not None:
+        values["ai_status"] = ai_status
 
     if not values:
         return 0
 
+    values["ai_updated_at"] = datetime.now(timezone.utc)
+
     stmt = (
         update(AssessmentSession)
         .where(AssessmentSession.id == session_id)
@@ -354,6 +388,71 @@ async def update_ai_content(
     return result.rowcount or 0
 
 
+async def claim_ai_feedback_job(
+    db: AsyncSession, session_id: UUID, seen_attempts: int
+) -> bool:
+    """
+    认领一次 AI 反馈生成任务（乐观 CAS，防止多个 worker 重复生成）
+
+    Args:
+        db: 数据库会话
+        session_id: 会话ID
+        seen_attempts: 读取到的 ai_attempts 值
+
+    Returns:
+        True 表示认领成功（ai_attempts 已 +1）
+
+    Example:
+        >>> if await claim_ai_feedback_job(db, session_id, seen_attempts=0):
+        ...     await db.commit()  # 之后再调用模型
+    """
+    stmt = (
+        update(AssessmentSession)
+        .where(
+            and_(
+                AssessmentSession.id == session_id,
+                AssessmentSession.ai_status == "pending",
+                AssessmentSession.ai_attempts == seen_attempts,
+            )
+        )
+        .values(
+            ai_attempts=AssessmentSession.ai_attempts + 1,
+            ai_updated_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    return (result.rowcount or 0) == 1
+
+
+async def list_pending_ai_feedback(
+    db: AsyncSession, *, stale_before: datetime, limit: int = 50
+) -> List[tuple[UUID, int]]:
+    """
+    查询待生成 AI 反馈的会话（用于后台补偿扫描）
+
+    Args:
+        db: 数据库会话
+        stale_before: 只返回在此时间之前更新过的任务（避开正在执行的任务）
+        limit: 最多返回条数
+
+    Returns:
+        [(session_id, ai_attempts)] 列表
+    """
+    result = await db.execute(
+        select(AssessmentSession.id, AssessmentSession.ai_attempts)
+        .where(
+            and_(
+                AssessmentSession.ai_status == "pending",
+                AssessmentSession.ai_updated_at < stale_before,
+            )
+        )
+        .order_by(AssessmentSession.ai_updated_at)
+        .limit(limit)
+    )
+    return [(row[0], int(row[1] or 0)) for row in result.all()]
+
+
 # ========================================
 # 四、删除（Delete）
 # ========================================
@@ -390,6 +489,52 @@ async def delete_session(db: AsyncSession, session_id: UUID, user_id: UUID) -> i
     return result.rowcount or 0
 
 
+async def delete_abandoned_sessions(
+    db: AsyncSession, *, started_before: datetime, limit: int = 500
+) -> Dict[UUID, str]:
+    """
+    删除一批开始于 started_before 之前且从未提交的会话（不提交事务）
+
+    走 (submitted_at, started_at) 索引按开始时间从旧到新取一批；
+    items / responses 由外键 ON DELETE CASCADE 在库内级联删除。
+    PostgreSQL 上用 SKIP LOCKED，多个进程同时清理时互不阻塞。
+
+    Args:
+        db: 数据库会话
+        started_before: 截止时间
+        limit: 本批最多删除的会话数
+
+    Returns:
+        {session_id: kind}，本批实际删除的会话
+
+    Example:
+        >>> deleted = await delete_abandoned_sessions(db, started_before=cutoff, limit=500)
+        >>> await db.commit()
+    """
+    from sqlalchemy import delete as sql_delete
+
+    batch = (
+        select(AssessmentSession.id)
+        .where(
+            and_(
+                AssessmentSession.submitted_at.is_(None),
+                AssessmentSession.started_at < started_before,
+            )
+        )
+        .order_by(AssessmentSession.started_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        sql_delete(AssessmentSession)
+        .where(AssessmentSession.id.in_(batch.scalar_subquery()))
+        .returning(AssessmentSession.id, AssessmentSession.kind)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    return {row[0]: row[1] for row in result.all()}
+
+
 # ========================================
 # 五、统计查询（Statistics）
 # ========================================
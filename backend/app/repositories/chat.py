@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.chat import ChatMessage, ChatSession
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def get_topic_session(
+    db: AsyncSession, *, user_id: UUID, topic_id: UUID
+) -> Optional[ChatSession]:
+    result = await db.execute(
+        select(ChatSession).where(
+            ChatSession.user_id == user_id,
+            ChatSession.topic_id == topic_id,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_or_create_topic_session(
+    db: AsyncSession, *, user_id: UUID, topic_id: UUID, title: Optional[str] = None
+) -> ChatSession:
+    session = await get_topic_session(db, user_id=user_id, topic_id=topic_id)
+    if session:
+        return session
+
+    try:
+        async with db.begin_nested():
+            session = ChatSession(
+                user_id=user_id,
+                scope="topic",
+                topic_id=topic_id,
+                title=title,
+                token_count=0,
+                message_count=0,
+            )
+            db.add(session)
+    except IntegrityError:
+        # Concurrent first message for the same (user, topic): ux_topic_chat_once
+        session = await get_topic_session(db, user_id=user_id, topic_id=topic_id)
+        if session is None:
+            raise
+    return session
+
+
+async def add_message(
+    db: AsyncSession,
+    *,
+    session: ChatSession,
+    role: str,
+    content: str,
+    token_count: int,
+    meta: Optional[dict] = None,
+    created_at: Optional[datetime] = None,
+) -> ChatMessage:
+    """Append a message and bump the session's unsummarized token counter."""
+    now = created_at or _now()
+    message = ChatMessage(
+        session_id=session.id,
+        role=role,
+        content=content,
+        token_count=token_count,
+        meta=meta,
+        # Explicit timestamps: CURRENT_TIMESTAMP is per transaction in Postgres.
+        created_at=now,
+    )
+    db.add(message)
+    await db.flush()
+
+    result = await db.execute(
+        update(ChatSession)
+        .where(ChatSession.id == session.id)
+        .values(
+            token_count=sa.func.coalesce(ChatSession.token_count, 0) + token_count,
+            message_count=sa.func.coalesce(ChatSession.message_count, 0) + 1,
+            last_active_at=now,
+        )
+        .returning(ChatSession.token_count, ChatSession.message_count)
+        .execution_options(synchronize_session=False)
+    )
+    counters = result.one()
+    # Reflect the atomic increments without marking the session dirty.
+    set_committed_value(session, "token_count", counters[0])
+    set_committed_value(session, "message_count", counters[1])
+    set_committed_value(session, "last_active_at", now)
+    return message
+
+
+def _after_cutoff(session: ChatSession):
+    """Filter for messages newer than ``summarized_upto_message_id``."""
+    clause = ChatMessage.session_id == session.id
+    if session.summarized_upto_message_id is None:
+        return clause
+    marker = aliased(ChatMessage)
+    cutoff = (
+        select(marker.created_at)
+        .where(marker.id == session.summarized_upto_message_id)
+        .scalar_subquery()
+    )
+    return sa.and_(clause, ChatMessage.created_at > cutoff)
+
+
+async def get_recent_unsummarized(
+    db: AsyncSession, *, session: ChatSession, limit: int
+) -> list[ChatMessage]:
+    """Last ``limit`` messages not yet folded into the summary (oldest first)."""
+    result = await db.execute(
+        select(ChatMessage)
+        .where(_after_cutoff(session))
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(limit)
+    )
+    return list(reversed(result.scalars().all()))
+
+
+async def get_unsummarized(
+    db: AsyncSession, *, session: ChatSession
+) -> list[ChatMessage]:
+    result = await db.execute(
+        select(ChatMessage)
+        .where(_after_cutoff(session))
+        .order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
+    )
+    return list(result.scalars().all())
+
+
+async def list_messages(
+    db: AsyncSession,
+    *,
+    session_id: UUID,
+    limit: int = 50,
+    before: Optional[datetime] = None,
+) -> list[ChatMessage]:
+    """Page backwards through the full history (oldest first within the page)."""
+    stmt = select(ChatMessage).where(ChatMessage.session_id == session_id)
+    if before is not None:
+        stmt = stmt.where(ChatMessage.created_at < before)
+    result = await db.execute(
+        stmt.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit)
+    )
+    return list(reversed(result.scalars().all()))
+
+
+async def apply_summary(
+    db: AsyncSession,
+    *,
+    session_id: UUID,
+    expected_cutoff: Optional[UUID],
+    summary: str,
+    new_cutoff: UUID,
+    summarized_tokens: int,
+) -> bool:
+    """
+    Store a new rolling summary.
+
+    Compare-and-set on ``summarized_upto_message_id`` so two compactions of
+    the same session can't both apply.
+    """
+    cutoff_col = ChatSession.summarized_upto_message_id
+    remaining = sa.func.coalesce(ChatSession.token_count, 0) - summarized_tokens
+    guard = cutoff_col.is_(None) if expected_cutoff is None else cutoff_col == expected_cutoff
+    result = await db.execute(
+        update(ChatSession)
+        .where(ChatSession.id == session_id, guard)
+        .values(
+            summary=summary,
+            summarized_upto_message_id=new_cutoff,
+            summary_updated_at=_now(),
+            token_count=sa.case((remaining < 0, 0), else_=remaining),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return (result.rowcount or 0) == 1
+
+
+async def reset_session(db: AsyncSession, *, session: ChatSession) -> None:
+    await db.execute(sa.delete(ChatMessage).where(ChatMessage.session_id == session.id))
+    session.summary = None
+    session.summary_updated_at = None
+    session.summarized_upto_message_id = None
+    session.token_count = 0
+    session.message_count = 0
+    await db.flush()
+
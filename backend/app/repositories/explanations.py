@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.explanations import TopicExplanation
+
+
+class ExplanationKey(NamedTuple):
+    module_key: str
+    subtopic_key: str
+    level: str
+    known_points_hash: str
+
+    def as_str(self) -> str:
+        return "|".join(self)
+
+
+def _norm(value: str) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def explanation_key(
+    module_id: str, subtopic: str, level: str, known_points: list[str] | None = None
+) -> ExplanationKey:
+    """Normalise explain inputs so equivalent requests share one stored row."""
+    points = sorted({_norm(p) for p in (known_points or []) if _norm(p)})
+    points_hash = hashlib.sha256("\n".join(points).encode("utf-8")).hexdigest() if points else ""
+    return ExplanationKey(_norm(module_id), _norm(subtopic), _norm(level), points_hash)
+
+
+async def get_explanation(db: AsyncSession, key: ExplanationKey) -> Optional[TopicExplanation]:
+    result = await db.execute(
+        select(TopicExplanation).where(
+            TopicExplanation.module_key == key.module_key,
+            TopicExplanation.subtopic_key == key.subtopic_key,
+            TopicExplanation.level == key.level,
+            TopicExplanation.known_points_hash == key.known_points_hash,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def list_existing_keys(db: AsyncSession) -> set[str]:
+    result = await db.execute(
+        select(
+            TopicExplanation.module_key,
+            TopicExplanation.subtopic_key,
+            TopicExplanation.level,
+            TopicExplanation.known_points_hash,
+        )
+    )
+    return {ExplanationKey(*row).as_str() for row in result.all()}
+
+
+async def upsert_explanation(
+    db: AsyncSession,
+    *,
+    key: ExplanationKey,
+    payload: dict,
+    topic_id: Optional[UUID] = None,
+    model: Optional[str] = None,
+) -> None:
+    values = {
+        "module_key": key.module_key,
+        "subtopic_key": key.subtopic_key,
+        "level": key.level,
+        "known_points_hash": key.known_points_hash,
+        "payload": payload,
+        "topic_id": topic_id,
+        "model": model,
+    }
+    insert = sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+    stmt = insert(TopicExplanation).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["module_key", "subtopic_key", "level", "known_points_hash"],
+        set_={
+            "payload": stmt.excluded.payload,
+            "topic_id": stmt.excluded.topic_id,
+            "model": stmt.excluded.model,
+            "updated_at": datetime.now(timezone.utc),
+        },
+    )
+    await db.execute(stmt)
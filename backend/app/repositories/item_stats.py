@@ -0,0 +1,239 @@
+# backend/app/repositories/item_stats.py
+"""
+题目表现统计（QuestionStat / QuestionChoiceStat / TopicStat）数据访问层
+
+判分时在同一事务内调用 record_graded：先在内存里把本次提交按题目、选项、
+主题汇总成增量，再各用一条多行 INSERT ... ON CONFLICT DO UPDATE 累加。
+各表的行按主键排序后写入，并发提交按相同顺序加行锁，避免互相死锁。
+报表只读这三张小表，无需扫描 assessment_responses。
+"""
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.assessment import QuestionTopic
+from app.models.stats import QuestionChoiceStat, QuestionStat, TopicStat
+
+
+@dataclass(frozen=True, slots=True)
+class GradedAnswer:
+    """一次已判分的作答（统计输入）"""
+
+    question_id: UUID
+    qtype: Optional[str]
+    answer: str
+    is_correct: bool
+    score: float
+
+
+# ========================================
+# 一、构造统计输入
+# ========================================
+
+
+def graded_answer(
+    snapshot: Optional[dict], answer: Optional[str], is_correct: Optional[bool], score: Optional[float]
+) -> Optional[GradedAnswer]:
+    """
+    由题目快照 + 判分结果构造 GradedAnswer
+
+    未判分（is_correct 为 None）或快照缺 question_id 时返回 None，不计入统计
+    """
+    snapshot = snapshot or {}
+    if is_correct is None or not snapshot.get("question_id"):
+        return None
+    try:
+        question_id = UUID(str(snapshot["question_id"]))
+    except ValueError:
+        return None
+    return GradedAnswer(
+        question_id=question_id,
+        qtype=snapshot.get("qtype"),
+        answer=answer or "",
+        is_correct=bool(is_correct),
+        score=float(score or 0.0),
+    )
+
+
+def selected_choices(qtype: Optional[str], answer: str) -> List[str]:
+    """
+    客观题答案拆成选项字母
+
+    Example:
+        >>> selected_choices("multi", "a, C")
+        ['A', 'C']
+    """
+    if qtype not in ("single", "multi") or not answer:
+        return []
+    letters = [part.strip().upper() for part in answer.split(",")]
+    return sorted({letter for letter in letters if letter and len(letter) <= 16})
+
+
+# ========================================
+# 二、增量写入
+# ========================================
+
+
+async def get_question_topics(
+    db: AsyncSession, question_ids: Iterable[UUID]
+) -> Dict[UUID, List[UUID]]:
+    """题目 → 主题列表（一次查询）"""
+    unique = list(dict.fromkeys(question_ids))
+    if not unique:
+        return {}
+    result = await db.execute(
+        select(QuestionTopic.question_id, QuestionTopic.topic_id).where(
+            QuestionTopic.question_id.in_(unique)
+        )
+    )
+    mapping: Dict[UUID, List[UUID]] = defaultdict(list)
+    for question_id, topic_id in result.all():
+        mapping[question_id].append(topic_id)
+    return dict(mapping)
+
+
+def _insert(db: AsyncSession):
+    return sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+
+
+async def _upsert_counters(db: AsyncSession, model, key: str, deltas: Dict[UUID, list]) -> None:
+    if not deltas:
+        return
+    stmt = _insert(db)(model).values(
+        [
+            {key: ident, "attempts": attempts, "correct": correct, "score_sum": score_sum}
+            for ident, (attempts, correct, score_sum) in sorted(deltas.items())
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={
+            "attempts": model.attempts + stmt.excluded.attempts,
+            "correct": model.correct + stmt.excluded.correct,
+            "score_sum": model.score_sum + stmt.excluded.score_sum,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def record_graded(
+    db: AsyncSession,
+    graded: Iterable[Optional[GradedAnswer]],
+    *,
+    question_topics: Optional[Dict[UUID, List[UUID]]] = None,
+) -> int:
+    """
+    把一次提交的判分结果累加进统计表（不提交事务，随判分一起 commit）
+
+    Args:
+        db: 数据库会话
+        graded: GradedAnswer 列表（None 会被跳过）
+        question_topics: {question_id: [topic_id]}；不传则查 question_topics
+
+    Returns:
+        计入统计的作答数
+
+    Example:
+        >>> await record_graded(db, [
+        ...     graded_answer(item.question_snapshot, resp.answer, resp.is_correct, resp.score)
+        ...     for item, resp in pairs
+        ... ])
+    """
+    entries = [entry for entry in graded if entry is not None]
+    if not entries:
+        return 0
+    if question_topics is None:
+        question_topics = await get_question_topics(db, (e.question_id for e in entries))
+
+    per_question: Dict[UUID, list] = defaultdict(lambda: [0, 0, 0.0])
+    per_topic: Dict[UUID, list] = defaultdict(lambda: [0, 0, 0.0])
+    choices: Counter = Counter()
+    for entry in entries:
+        targets = [per_question[entry.question_id]] + [
+            per_topic[topic_id] for topic_id in question_topics.get(entry.question_id, ())
+        ]
+        for counters in targets:
+            counters[0] += 1
+            counters[1] += int(entry.is_correct)
+            counters[2] += entry.score
+        for choice in selected_choices(entry.qtype, entry.answer):
+            choices[(entry.question_id, choice)] += 1
+
+    await _upsert_counters(db, QuestionStat, "question_id", per_question)
+    await _upsert_counters(db, TopicStat, "topic_id", per_topic)
+    if choices:
+        stmt = _insert(db)(QuestionChoiceStat).values(
+            [
+                {"question_id": question_id, "choice": choice, "selections": count}
+                for (question_id, choice), count in sorted(choices.items())
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["question_id", "choice"],
+            set_={"selections": QuestionChoiceStat.selections + stmt.excluded.selections},
+        )
+        await db.execute(stmt)
+    return len(entries)
+
+
+# ========================================
+# 三、查询
+# ========================================
+
+
+async def get_topic_stat(db: AsyncSession, topic_id: UUID) -> Optional[TopicStat]:
+    return await db.get(TopicStat, topic_id)
+
+
+async def list_topic_question_stats(
+    db: AsyncSession, topic_id: UUID, *, limit: int = 100
+) -> List[dict]:
+    """
+    主题下各题的统计（答对率从低到高，即最难的在前），附选项分布
+
+    Returns:
+        [{"question_id", "attempts", "correct", "correct_rate", "mean_score", "choices": {"A": n}}]
+    """
+    result = await db.execute(
+        select(QuestionStat)
+        .join(QuestionTopic, QuestionTopic.question_id == QuestionStat.question_id)
+        .where(QuestionTopic.topic_id == topic_id, QuestionStat.attempts > 0)
+        .order_by(
+            (QuestionStat.correct * 1.0 / QuestionStat.attempts).asc(),
+            QuestionStat.attempts.desc(),
+        )
+        .limit(limit)
+    )
+    stats = list(result.scalars().all())
+    if not stats:
+        return []
+
+    choice_rows = await db.execute(
+        select(QuestionChoiceStat).where(
+            QuestionChoiceStat.question_id.in_([s.question_id for s in stats])
+        )
+    )
+    choices: Dict[UUID, Dict[str, int]] = defaultdict(dict)
+    for row in choice_rows.scalars().all():
+        choices[row.question_id][row.choice] = row.selections
+
+    return [
+        {
+            "question_id": str(stat.question_id),
+            "attempts": stat.attempts,
+            "correct": stat.correct,
+            "correct_rate": stat.correct_rate,
+            "mean_score": stat.mean_score,
+            "choices": dict(sorted(choices.get(stat.question_id, {}).items())),
+        }
+        for stat in stats
+    ]
@@ -0,0 +1,292 @@
+# backend/app/repositories/question_pool.py
+"""
+题目 ID 池（随机抽题用）
+
+按 (主题, 题型) / (全库, 题型) 缓存激活题目的 id 数组，抽题时在数组上
+random.sample（O(k)），再按主键取题，避免 ORDER BY random() 对整张过滤表排序。
+
+另有题目 → 主题映射缓存（question_topic_map），评测提交时按主题汇总得分用；
+以及题库计数快照（question_bank_stats：按题型 / 主题×题型的激活题数），
+可用题数检查与题型分布直接查字典。三者共用同一版本号。
+
+失效：
+- 题目新增/停用后调用 question_id_pool.invalidate()
+- 多进程之间通过 Redis 计数器 qpool:version 同步版本；版本变化即丢弃本地数组
+- 拿不到 Redis 时退化为进程内版本号 + TTL（QUESTION_POOL_TTL_SECONDS）兜底
+"""
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.config import QUESTION_POOL_TTL_SECONDS
+from app.models.assessment import Question, QuestionTopic
+from app.models.content import LearningTopic
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "qpool:version"
+
+PoolKey = tuple[Optional[UUID], Optional[str]]  # (topic_id | None=全库, qtype | None=不限)
+
+
+class QuestionIdPool:
+    """进程内 id 数组缓存 + Redis 版本号（跨 worker 失效）"""
+
+    def __init__(self, ttl_seconds: float = 300.0, clock=time.monotonic) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._redis = None
+        self._local_version = 0
+        self._pools: dict[PoolKey, tuple[str, float, tuple[UUID, ...]]] = {}
+
+    def bind_redis(self, redis) -> None:
+        """lifespan 中注入 app.state.redis；None 表示只用进程内版本"""
+        self._redis = redis
+
+    @property
+    def redis(self):
+        return self._redis
+
+    async def shared_version(self) -> Optional[str]:
+        """Redis 版本号（各进程一致）；拿不到 Redis 时为 None"""
+        if self._redis is None:
+            return None
+        try:
+            value = await self._redis.get(VERSION_KEY)
+        except Exception as exc:  # Redis 不可用时不影响抽题
+            logger.debug("question pool version lookup failed: %s", exc)
+            return None
+        if isinstance(value, bytes):
+            value = value.decode()
+        return str(value or 0)
+
+    async def version(self) -> str:
+        """当前缓存版本（Redis 版本号 + 本进程失效次数）"""
+        shared = await self.shared_version()
+        if shared is not None:
+            return f"r{shared}:{self._local_version}"
+        return f"l{self._local_version}"
+
+    async def invalidate(self) -> None:
+        """题目新增/停用后调用（本进程立即生效，其他进程下次抽题时生效）"""
+        self._local_version += 1
+        self._pools.clear()
+        if self._redis is not None:
+            try:
+                await self._redis.incr(VERSION_KEY)
+            except Exception as exc:
+                logger.warning("question pool invalidation not propagated: %s", exc)
+
+    async def _load(self, db: AsyncSession, topic_id: Optional[UUID], qtype: Optional[str]) -> tuple[UUID, ...]:
+        query = select(Question.id).where(Question.is_active == True)  # noqa: E712
+        if topic_id is not None:
+            query = query.join(QuestionTopic, Question.id == QuestionTopic.question_id).where(
+                QuestionTopic.topic_id == topic_id
+            )
+        if qtype:
+            query = query.where(Question.qtype == qtype)
+        result = await db.execute(query.order_by(Question.id))
+        return tuple(result.scalars().all())
+
+    async def ids(
+        self, db: AsyncSession, *, topic_id: Optional[UUID] = None, qtype: Optional[str] = None
+    ) -> tuple[UUID, ...]:
+        """某个范围内全部激活题目的 id（带缓存）"""
+        key: PoolKey = (topic_id, qtype or None)
+        version = await self.version()
+        cached = self._pools.get(key)
+        now = self._clock()
+        if cached and cached[0] == version and now - cached[1] < self.ttl_seconds:
+            return cached[2]
+        ids = await self._load(db, topic_id, qtype)
+        self._pools[key] = (version, now, ids)
+        return ids
+
+    async def sample(
+        self,
+        db: AsyncSession,
+        *,
+        count: int,
+        topic_id: Optional[UUID] = None,
+        topic_ids: Optional[Sequence[UUID]] = None,
+        qtype: Optional[str] = None,
+        exclude: Optional[set[UUID]] = None,
+    ) -> list[UUID]:
+        """
+        随机抽 count 个不重复的题目 id（不足时返回全部）
+
+        topic_ids 给出时在这些主题的并集中抽（一题多主题只算一次）
+        """
+        if count <= 0:
+            return []
+        if topic_ids:
+            merged: dict[UUID, None] = {}
+            for tid in topic_ids:
+                merged.update(dict.fromkeys(await self.ids(db, topic_id=tid, qtype=qtype)))
+            population: Sequence[UUID] = tuple(merged)
+        else:
+            population = await self.ids(db, topic_id=topic_id, qtype=qtype)
+        if exclude:
+            population = [qid for qid in population if qid not in exclude]
+        if len(population) <= count:
+            picked = list(population)
+            random.shuffle(picked)
+            return picked
+        return random.sample(population, count)
+
+
+TopicRef = tuple[UUID, str]  # (topic_id, topic_name)
+
+
+class QuestionTopicMap:
+    """
+    题目 → [(主题id, 主题名)] 的进程内缓存
+
+    只缓存被查过的题目；未命中的题目一次查询补齐。版本跟随 question_id_pool，
+    题库变化（invalidate）或超过 TTL 后整体丢弃。
+    """
+
+    def __init__(self, pool: QuestionIdPool, ttl_seconds: float = 300.0, clock=time.monotonic) -> None:
+        self.pool = pool
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._version: Optional[str] = None
+        self._loaded_at = 0.0
+        self._topics: dict[UUID, tuple[TopicRef, ...]] = {}
+
+    async def _load(self, db: AsyncSession, question_ids: list[UUID]) -> dict[UUID, tuple[TopicRef, ...]]:
+        result = await db.execute(
+            select(QuestionTopic.question_id, LearningTopic.id, LearningTopic.name)
+            .join(LearningTopic, LearningTopic.id == QuestionTopic.topic_id)
+            .where(QuestionTopic.question_id.in_(question_ids))
+            .order_by(LearningTopic.id)
+        )
+        loaded: dict[UUID, list[TopicRef]] = {qid: [] for qid in question_ids}
+        for question_id, topic_id, name in result.all():
+            loaded[question_id].append((topic_id, name))
+        return {qid: tuple(refs) for qid, refs in loaded.items()}
+
+    async def get(self, db: AsyncSession, question_ids: Iterable[UUID]) -> dict[UUID, tuple[TopicRef, ...]]:
+        """{question_id: ((topic_id, topic_name), ...)}；没有主题的题目对应空元组"""
+        version = await self.pool.version()
+        now = self._clock()
+        if version != self._version or now - self._loaded_at >= self.ttl_seconds:
+            self._topics.clear()
+            self._version, self._loaded_at = version, now
+        wanted = list(dict.fromkeys(question_ids))
+        missing = [qid for qid in wanted if qid not in self._topics]
+        if missing:
+            self._topics.update(await self._load(db, missing))
+        return {qid: self._topics.get(qid, ()) for qid in wanted}
+
+
+@dataclass(frozen=True, slots=True)
+class BankCounts:
+    """激活题目计数快照"""
+
+    by_qtype: dict[str, int] = field(default_factory=dict)  # 全库：题型 → 题数
+    by_topic: dict[UUID, dict[str, int]] = field(default_factory=dict)  # 主题 → 题型 → 题数
+
+    def total(self, qtype: Optional[str] = None) -> int:
+        return self.by_qtype.get(qtype, 0) if qtype else sum(self.by_qtype.values())
+
+    def topic_total(self, topic_id: UUID, qtype: Optional[str] = None) -> int:
+        counts = self.by_topic.get(topic_id, {})
+        return counts.get(qtype, 0) if qtype else sum(counts.values())
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "by_qtype": self.by_qtype,
+                "by_topic": {str(tid): counts for tid, counts in self.by_topic.items()},
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw) -> "BankCounts":
+        data = json.loads(raw)
+        return cls(
+            by_qtype=data["by_qtype"],
+            by_topic={UUID(tid): counts for tid, counts in data["by_topic"].items()},
+        )
+
+
+class QuestionBankStats:
+    """
+    题库计数缓存：进程内一份快照，Redis 里按版本号共享一份
+
+    版本跟随 question_id_pool；新版本下第一个进程查库（两条 GROUP BY），
+    写入 qbank:stats:{版本}，其他进程直接读 Redis。
+    """
+
+    KEY_PREFIX = "qbank:stats:"
+
+    def __init__(self, pool: QuestionIdPool, ttl_seconds: float = 300.0, clock=time.monotonic) -> None:
+        self.pool = pool
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._cached: Optional[tuple[str, float, BankCounts]] = None
+
+    async def _load(self, db: AsyncSession) -> BankCounts:
+        active = Question.is_active == True  # noqa: E712
+        by_qtype = await db.execute(
+            select(Question.qtype, func.count()).where(active).group_by(Question.qtype)
+        )
+        by_topic_rows = await db.execute(
+            select(QuestionTopic.topic_id, Question.qtype, func.count())
+            .join(Question, Question.id == QuestionTopic.question_id)
+            .where(active)
+            .group_by(QuestionTopic.topic_id, Question.qtype)
+        )
+        by_topic: dict[UUID, dict[str, int]] = defaultdict(dict)
+        for topic_id, qtype, count in by_topic_rows.all():
+            by_topic[topic_id][qtype] = count
+        return BankCounts(
+            by_qtype={qtype: count for qtype, count in by_qtype.all()},
+            by_topic=dict(by_topic),
+        )
+
+    async def _read_shared(self, key: str) -> Optional[BankCounts]:
+        try:
+            raw = await self.pool.redis.get(key)
+            return BankCounts.from_json(raw) if raw else None
+        except Exception as exc:
+            logger.debug("question bank stats read failed: %s", exc)
+            return None
+
+    async def _write_shared(self, key: str, counts: BankCounts) -> None:
+        try:
+            await self.pool.redis.set(key, counts.to_json(), ex=max(1, int(self.ttl_seconds)))
+        except Exception as exc:
+            logger.debug("question bank stats write failed: %s", exc)
+
+    async def get(self, db: AsyncSession) -> BankCounts:
+        version = await self.pool.version()
+        now = self._clock()
+        if self._cached and self._cached[0] == version and now - self._cached[1] < self.ttl_seconds:
+            return self._cached[2]
+
+        shared = await self.pool.shared_version() if self.pool.redis is not None else None
+        key = f"{self.KEY_PREFIX}{shared}" if shared is not None else None
+        counts = await self._read_shared(key) if key else None
+        if counts is None:
+            counts = await self._load(db)
+            if key:
+                await self._write_shared(key, counts)
+        self._cached = (version, now, counts)
+        return counts
+
+
+question_id_pool = QuestionIdPool(ttl_seconds=QUESTION_POOL_TTL_SECONDS)
+question_topic_map = QuestionTopicMap(question_id_pool, ttl_seconds=QUESTION_POOL_TTL_SECONDS)
+question_bank_stats = QuestionBankStats(question_id_pool, ttl_seconds=QUESTION_POOL_TTL_SECONDS)
@@ -0,0 +1,118 @@
+# backend/app/repositories/question_snapshots.py
+"""
+题目快照（QuestionSnapshotRecord）数据访问层
+
+快照按内容寻址：主键 = 规范化 JSON（键排序、紧凑分隔符）的 sha256。
+成千上万次评测抽到同一道题时只存一份内容，assessment_items 与
+user_topic_progress.pending_quiz 只保存 64 字符的哈希。
+
+快照只插入不修改（审计回放依赖其不可变）；题目修订后内容不同，自然得到新哈希。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.assessment import AssessmentItem, QuestionSnapshotRecord
+
+
+# ========================================
+# 一、哈希
+# ========================================
+
+
+def canonical_json(payload: dict) -> str:
+    """规范化序列化：同样的内容总是得到同样的字符串"""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def snapshot_hash(payload: dict) -> str:
+    """
+    计算快照内容哈希
+
+    Example:
+        >>> snapshot_hash({"stem": "Q", "qtype": "single"}) == snapshot_hash({"qtype": "single", "stem": "Q"})
+        True
+    """
+    return hashlib.sha256(canonical_json(payload).encode("utf-8")).hexdigest()
+
+
+# ========================================
+# 二、写入（只插入）
+# ========================================
+
+
+async def intern_snapshots(
+    db: AsyncSession, payloads: List[dict]
+) -> List[QuestionSnapshotRecord]:
+    """
+    保存快照内容（已存在则跳过），返回与 payloads 一一对应的记录
+
+    一条多行 INSERT ... ON CONFLICT DO NOTHING；返回的记录不挂在 session 上，
+    只用于 attach_snapshot 预填 item.snapshot，避免再查一次。
+
+    Args:
+        db: 数据库会话
+        payloads: 快照内容列表
+
+    Returns:
+        快照记录列表（顺序与 payloads 相同）
+
+    Example:
+        >>> records = await intern_snapshots(db, [snapshot_a, snapshot_b])
+        >>> records[0].hash
+        '3f1c...'
+    """
+    records = [
+        QuestionSnapshotRecord(hash=snapshot_hash(payload), payload=payload)
+        for payload in payloads
+    ]
+    unique = {record.hash: record.payload for record in records}
+    if unique:
+        insert = sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+        await db.execute(
+            insert(QuestionSnapshotRecord)
+            .values([{"hash": h, "payload": p} for h, p in unique.items()])
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+    return records
+
+
+def attach_snapshot(item: AssessmentItem, record: QuestionSnapshotRecord) -> AssessmentItem:
+    """
+    为新建的 item 绑定快照：写 snapshot_hash，并预填只读关系 item.snapshot
+    （不会触发额外的 INSERT / SELECT）
+    """
+    item.snapshot_hash = record.hash
+    set_committed_value(item, "snapshot", record)
+    return item
+
+
+# ========================================
+# 三、查询
+# ========================================
+
+
+async def get_snapshots(db: AsyncSession, hashes: Iterable[str]) -> Dict[str, dict]:
+    """
+    按哈希批量取快照内容
+
+    Returns:
+        {hash: payload}；不存在的哈希不出现在结果中
+    """
+    unique = list(dict.fromkeys(h for h in hashes if h))
+    if not unique:
+        return {}
+    result = await db.execute(
+        select(QuestionSnapshotRecord.hash, QuestionSnapshotRecord.payload).where(
+            QuestionSnapshotRecord.hash.in_(unique)
+        )
+    )
+    return {row.hash: row.payload for row in result.all()}
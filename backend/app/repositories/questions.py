@@ -12,7 +12,12 @@ from sqlalchemy import select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.assessment import Question, QuestionTopic
-from app.schemas.assessment import QuestionDTO
+from app.repositories.question_pool import (
+    question_bank_stats,
+    question_id_pool,
+    question_topic_map,
+)
+from app.schemas.assessment import QuestionDTO, parse_correct_answer
 
 
 # ========================================
@@ -160,22 +165,8 @@ async def get_random_questions_by_topic(
         ...     db, topic_id=topic_id, count=5, qtype='single'
         ... )
     """
-    query = (
-        select(Question)
-        .join(QuestionTopic, Question.id == QuestionTopic.question_id)
-        .where(and_(QuestionTopic.topic_id == topic_id, Question.is_active == True))
-    )
-
-    if qtype:
-        query = query.where(Question.qtype == qtype)
-
-    # PostgreSQL 随机排序
-    query = query.order_by(func.random()).limit(count)
-
-    result = await db.execute(query)
-    questions = result.scalars().all()
-
-    return [QuestionDTO.model_validate(q) for q in questions]
+    # 从缓存的 id 池抽样，再按主键取题（不再 ORDER BY random()）
+    return await _sample_questions(db, count=count, topic_id=topic_id, qtype=qtype)
 
 
 async def count_questions_by_topic(
@@ -202,6 +193,10 @@ async def count_questions_by_topic(
         ... )
         >>> print(f"该主题有 {count} 道单选题")
     """
+    if not include_inactive:
+        counts = await question_bank_stats.get(db)
+        return counts.topic_total(topic_id, qtype)
+
     query = (
         select(func.count())
         .select_from(Question)
@@ -289,28 +284,39 @@ async def _get_random_questions_by_type(
     Returns:
         题目列表
     """
-    conditions = [Question.is_active == True]
+    return await _sample_questions(db, count=count, qtype=qtype, topic_ids=topic_ids)
 
-    if qtype:
-        conditions.append(Question.qtype == qtype)
 
-    query = select(Question).where(and_(*conditions))
+async def _sample_questions(
+    db: AsyncSession,
+    *,
+    count: int,
+    topic_id: Optional[UUID] = None,
+    topic_ids: Optional[List[UUID]] = None,
+    qtype: Optional[str] = None,
+) -> List[QuestionDTO]:
+    """
+    随机抽题：在 id 池中抽样（O(k)）后按主键批量取题，保持抽样顺序
 
-    # 如果限定主题范围，需要 JOIN question_topics
-    if topic_ids:
-        query = (
-            query.join(QuestionTopic, Question.id == QuestionTopic.question_id)
-            .where(QuestionTopic.topic_id.in_(topic_ids))
-            .distinct()  # 去重（一题可能属于多个主题）
+    缓存的 id 可能刚被停用：取到的题不足时排除已抽过的 id 再补抽一次
+    """
+    picked = await question_id_pool.sample(
+        db, count=count, topic_id=topic_id, topic_ids=topic_ids, qtype=qtype
+    )
+    questions_map = await get_questions_by_ids(db, picked)
+    if len(questions_map) < len(picked):
+        extra = await question_id_pool.sample(
+            db,
+            count=len(picked) - len(questions_map),
+            topic_id=topic_id,
+            topic_ids=topic_ids,
+            qtype=qtype,
+            exclude=set(picked),
         )
-
-    # 随机排序并限制数量
-    query = query.order_by(func.random()).limit(count)
-
-    result = await db.execute(query)
-    questions = result.scalars().all()
-
-    return [QuestionDTO.model_validate(q) for q in questions]
+        if extra:
+            questions_map.update(await get_questions_by_ids(db, extra))
+            picked = picked + extra
+    return [questions_map[qid] for qid in picked if qid in questions_map]
 
 
 async def get_balanced_random_questions(
@@ -382,7 +388,7 @@ async def count_total_questions(
     db: AsyncSession, include_inactive: bool = False
 ) -> int:
     """
-    统计题库总题数
+    统计题库总题数（激活题目读 question_bank_stats 缓存）
 
     Args:
         db: 数据库会话
@@ -391,6 +397,9 @@ async def count_total_questions(
     Returns:
         题目总数
     """
+    if not include_inactive:
+        return (await question_bank_stats.get(db)).total()
+
     conditions = []
     if not include_inactive:
         conditions.append(Question.is_active == True)
@@ -425,6 +434,10 @@ async def get_question_types_distribution(
         >>> # 统计某主题题型分布
         >>> dist = await get_question_types_distribution(db, topic_id=topic_id)
     """
+    if not include_inactive:
+        counts = await question_bank_stats.get(db)
+        return dict(counts.by_topic.get(topic_id, {}) if topic_id else counts.by_qtype)
+
     query = select(Question.qtype, func.count()).group_by(Question.qtype)
 
     if topic_id:
@@ -464,16 +477,13 @@ async def get_topics_coverage(
     if not question_ids:
         return {}
 
-    query = (
-        select(QuestionTopic.topic_id, func.count())
-        .where(QuestionTopic.question_id.in_(question_ids))
-        .group_by(QuestionTopic.topic_id)
-    )
-
-    result = await db.execute(query)
-    rows = result.all()
-
-    return {topic_id: count for topic_id, count in rows}
+    # 题目 → 主题映射走 question_topic_map 缓存，计数在内存里做
+    coverage: dict[UUID, int] = {}
+    topic_map = await question_topic_map.get(db, question_ids)
+    for question_id in dict.fromkeys(question_ids):
+        for topic_id, _ in topic_map.get(question_id, ()):
+            coverage[topic_id] = coverage.get(topic_id, 0) + 1
+    return coverage
 
 
 # ========================================
@@ -505,7 +515,7 @@ async def check_topic_has_enough_questions(
     db: AsyncSession, topic_id: UUID, required_count: int, qtype: Optional[str] = None
 ) -> tuple[bool, int]:
     """
-    检查主题是否有足够的题目（用于生成小测前验证）
+    检查主题是否有足够的题目（用于生成小测前验证；读题库计数缓存）
 
     Args:
         db: 数据库会话
@@ -552,58 +562,7 @@ def extract_correct_answer(question: QuestionDTO) -> Optional[str]:
         >>> # 单选: 'B'
         >>> # 多选: 'A,C,D'
     """
-    if not question.answer_key:
-        return None
-
-    answer_key = question.answer_key
-
-    def _pull_value(*keys):
-        for key in keys:
-            if isinstance(answer_key, dict) and key in answer_key:
-                return answer_key[key]
-        return None
-
-    if question.qtype == "single":
-        # 常见格式: {"correct": "B"} 或 {"correct_options": ["B"]} 等
-        value = _pull_value(
-            "correct",
-            "correct_option",
-            "correctOption",
-            "correct_options",
-            "correctOptions",
-        )
-        if isinstance(value, list):
-            for candidate in value:
-                if isinstance(candidate, str) and candidate.strip():
-                    return candidate.strip().upper()
-            return None
-        if isinstance(value, str):
-            return value.strip().upper()
-        return None
-
-    elif question.qtype == "multi":
-        # 常见格式: {"correct": ["A", "C"]} 或 {"correct_options": ["A","C"]}
-        value = _pull_value(
-            "correct",
-            "correct_options",
-            "correctOptions",
-        )
-        if isinstance(value, str):
-            # 允许以逗号分隔的字符串
-            items = [part.strip().upper() for part in value.split(",") if part.strip()]
-        elif isinstance(value, list):
-            items = [str(part).strip().upper() for part in value if str(part).strip()]
-        else:
-            items = []
-
-        if items:
-            sorted_answers = sorted(set(items))
-            return ",".join(sorted_answers)
-        return None
-
-    else:  # short
-        # 简答题需要人工判分或AI判分，这里返回 None
-        return None
+    return parse_correct_answer(question.qtype, question.answer_key)
 
 
 def get_explanation(question: QuestionDTO) -> Optional[str]:
@@ -4,8 +4,11 @@ from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.progress import UserTopicProgress
 
@@ -39,6 +42,54 @@ async def get_or_create_progress(
     return progress
 
 
+async def ensure_progress(
+    db: AsyncSession, *, user_id: UUID, topic_id: UUID, **defaults
+) -> UserTopicProgress:
+    """
+    取进度行，不存在则插入（INSERT ... ON CONFLICT DO NOTHING，并发首次访问不会撞主键）
+
+    Args:
+        defaults: 新建时的列值，如 progress_status="in_progress"
+    """
+    progress = await db.get(UserTopicProgress, (user_id, topic_id))
+    if progress:
+        return progress
+    insert = sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+    await db.execute(
+        insert(UserTopicProgress)
+        .values(user_id=user_id, topic_id=topic_id, **defaults)
+        .on_conflict_do_nothing(index_elements=["user_id", "topic_id"])
+    )
+    return await db.get(UserTopicProgress, (user_id, topic_id))
+
+
+async def compare_and_set_quiz(
+    db: AsyncSession, *, progress: UserTopicProgress, expected_version: int, **values
+) -> bool:
+    """
+    小测状态 CAS：仅当 quiz_version 仍为 expected_version 时写入 values 并把版本 +1
+
+    单条 UPDATE，不先 SELECT ... FOR UPDATE；返回 False 表示被并发的开始 / 提交抢先，
+    调用方重新读取进度后重试或放弃。成功时同步内存中的 progress（不标脏）。
+    """
+    values["quiz_version"] = expected_version + 1
+    result = await db.execute(
+        update(UserTopicProgress)
+        .where(
+            UserTopicProgress.user_id == progress.user_id,
+            UserTopicProgress.topic_id == progress.topic_id,
+            UserTopicProgress.quiz_version == expected_version,
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if (result.rowcount or 0) != 1:
+        return False
+    for key, value in values.items():
+        set_committed_value(progress, key, value)
+    return True
+
+
 async def set_pending_quiz(
     db: AsyncSession,
     *,
@@ -47,6 +98,7 @@ async def set_pending_quiz(
 ) -> UserTopicProgress:
     progress.pending_quiz = pending_quiz
     progress.quiz_state = "pending"
+    progress.quiz_version = (progress.quiz_version or 0) + 1
     progress.last_visited_at = _now()
     await db.flush()
     return progress
@@ -57,6 +109,7 @@ async def clear_pending_quiz(
 ) -> UserTopicProgress:
     progress.pending_quiz = None
     progress.quiz_state = "none"
+    progress.quiz_version = (progress.quiz_version or 0) + 1
     progress.last_visited_at = _now()
     await db.flush()
     return progress
@@ -82,6 +135,7 @@ async def update_after_quiz(
 
     progress.quiz_state = "completed"
     progress.pending_quiz = None
+    progress.quiz_version = (progress.quiz_version or 0) + 1
     progress.last_quiz_session_id = session_id
     progress.last_visited_at = _now()
 
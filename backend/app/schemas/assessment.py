@@ -3,8 +3,10 @@
 测评模块 Pydantic Schemas
 包含主题小测和整体评测的所有请求/响应模型
 """
+import base64
+import binascii
 from datetime import datetime
-from typing import Optional, List, Literal, Any, Union
+from typing import Optional, List, Literal, Any, Union, Dict
 from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
@@ -203,6 +205,32 @@ class AnswerSaveOut(BaseModel):
     progress: AssessmentProgress
 
 
+class AnswerBatchSaveIn(BaseModel):
+    """
+    POST /assessments/{session_id}/answers 请求体（离线/重连后一次补传多题）
+
+    同一 item_id 出现多次时以最后一条为准；进度题号取各条中最后一个非空值
+    """
+
+    answers: List[AnswerSaveIn] = Field(..., min_length=1, max_length=200)
+
+    def answer_map(self) -> Dict[UUID, str]:
+        return {entry.item_id: entry.answer for entry in self.answers}
+
+    def last_question_index(self) -> Optional[int]:
+        indexes = [e.last_question_index for e in self.answers if e.last_question_index is not None]
+        return indexes[-1] if indexes else None
+
+
+class AnswerBatchSaveOut(BaseModel):
+    """
+    POST /assessments/{session_id}/answers 响应
+    """
+
+    saved: int = Field(..., ge=0, description="本次写入的题目数")
+    progress: AssessmentProgress
+
+
 # ========================================
 # 五、整体评测 - 提交
 # ========================================
@@ -236,6 +264,9 @@ class AIRecommendation(BaseModel):
     )
 
 
+AIStatus = Literal["pending", "ready", "failed"]
+
+
 class AssessmentSubmitOut(BaseModel):
     """
     POST /assessments/{session_id}/submit 响应
@@ -248,9 +279,23 @@ class AssessmentSubmitOut(BaseModel):
     )
     ai_summary: Optional[str] = Field(None, description="AI生成的总结")
     ai_recommendation: Optional[AIRecommendation] = Field(None, description="AI建议")
+    ai_status: Optional[AIStatus] = Field(
+        None, description="AI反馈状态（pending 时为兜底文案，后台生成中）"
+    )
     submitted_at: datetime
 
 
+class AssessmentFeedbackOut(BaseModel):
+    """
+    GET /assessments/{session_id}/feedback 响应
+    """
+
+    session_id: UUID
+    ai_status: AIStatus
+    ai_summary: Optional[str] = None
+    ai_recommendation: Optional[AIRecommendation] = None
+
+
 # ========================================
 # 六、整体评测 - 历史记录
 # ========================================
@@ -280,6 +325,9 @@ class PaginationMeta(BaseModel):
     limit: int = Field(..., ge=1, le=50)
     total: int = Field(..., ge=0, description="总条数")
     total_pages: int = Field(..., ge=0, description="总页数")
+    next_cursor: Optional[str] = Field(
+        None, description="下一页游标（传给 cursor 参数；None 表示没有更多）"
+    )
 
 
 class AssessmentHistoryOut(BaseModel):
@@ -309,6 +357,7 @@ class AssessmentSessionDetail(BaseModel):
     total_score: Optional[float] = Field(None, ge=0, le=100)
     ai_summary: Optional[str] = None
     ai_recommendation: Optional[AIRecommendation] = None
+    ai_status: Optional[AIStatus] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -393,6 +442,36 @@ def calculate_total_pages(total: int, limit: int) -> int:
     return (total + limit - 1) // limit
 
 
+def encode_history_cursor(started_at: datetime, session_id: UUID) -> str:
+    """
+    历史列表游标：上一页最后一条的 (started_at, id)，urlsafe base64 编码
+
+    Example:
+        >>> cursor = encode_history_cursor(session.started_at, session.id)
+        >>> decode_history_cursor(cursor) == (session.started_at, session.id)
+        True
+    """
+    raw = f"{started_at.isoformat()}|{session_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    解析 encode_history_cursor 生成的游标
+
+    Raises:
+        ValueError: 游标格式不合法
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        started_at, session_id = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        )
+        return datetime.fromisoformat(started_at), UUID(session_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
 def build_pagination_meta(page: int, limit: int, total: int) -> PaginationMeta:
     """
     构建分页元数据
@@ -438,6 +517,71 @@ def normalize_multi_choice_answer(answer: str) -> str:
     return ",".join(sorted(set(choices)))
 
 
+def parse_correct_answer(qtype: Optional[str], answer_key: Optional[dict]) -> Optional[str]:
+    """
+    从 answer_key 解析标准化的正确答案
+
+    Args:
+        qtype: 题型
+        answer_key: 题目的 answer_key（兼容 correct / correct_option(s) / 驼峰写法）
+
+    Returns:
+        单选: 'B'；多选: 'A,C'；简答或无法解析: None
+
+    Example:
+        >>> parse_correct_answer("multi", {"correct_options": ["c", "A"]})
+        'A,C'
+    """
+    if not answer_key or not isinstance(answer_key, dict):
+        return None
+
+    def _pull_value(*keys):
+        for key in keys:
+            if key in answer_key:
+                return answer_key[key]
+        return None
+
+    if qtype == "single":
+        # 常见格式: {"correct": "B"} 或 {"correct_options": ["B"]} 等
+        value = _pull_value(
+            "correct",
+            "correct_option",
+            "correctOption",
+            "correct_options",
+            "correctOptions",
+        )
+        if isinstance(value, list):
+            for candidate in value:
+                if isinstance(candidate, str) and candidate.strip():
+                    return candidate.strip().upper()
+            return None
+        if isinstance(value, str):
+            return value.strip().upper()
+        return None
+
+    if qtype == "multi":
+        # 常见格式: {"correct": ["A", "C"]} 或 {"correct_options": ["A","C"]}
+        value = _pull_value(
+            "correct",
+            "correct_options",
+            "correctOptions",
+        )
+        if isinstance(value, str):
+            # 允许以逗号分隔的字符串
+            items = [part.strip().upper() for part in value.split(",") if part.strip()]
+        elif isinstance(value, list):
+            items = [str(part).strip().upper() for part in value if str(part).strip()]
+        else:
+            items = []
+
+        if items:
+            return ",".join(sorted(set(items)))
+        return None
+
+    # 简答题需要人工判分或AI判分，这里返回 None
+    return None
+
+
 def format_answer_for_storage(answer: str, qtype: str) -> str:
     """
     根据题型格式化答案
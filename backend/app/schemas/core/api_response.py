@@ -1,8 +1,9 @@
+import json
 from typing import Any, Optional, Generic, TypeVar
 
 from fastapi import Request
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
 from app.core.exceptions.codes import BizCode
@@ -41,6 +42,25 @@ def ok(
     return JSONResponse(status_code=status_code, content=payload, headers=headers)
 
 
+def ok_raw(
+    data_json: str,
+    message: str = "ok",
+    request: Request | None = None,
+    request_id: str | None = None,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Successful response whose ``data`` is already serialized JSON (cached payloads)."""
+    rid = request_id if request_id is not None else _get_rid(request)
+    body = (
+        f'{{"code":{int(BizCode.OK)},"message":{json.dumps(message)},'
+        f'"data":{data_json},"request_id":{json.dumps(rid)}}}'
+    )
+    return Response(
+        content=body, status_code=status_code, headers=headers, media_type="application/json"
+    )
+
+
 def fail(
     *,
     http_status: int = 400,
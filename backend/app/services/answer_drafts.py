@@ -0,0 +1,344 @@
+"""
+评测答案草稿（Redis 写后落库）
+
+每次点击只跑一个 Lua 脚本，写 assess:{sid}:meta / :answers / :dirty 三个键，
+并把会话记入 assess:dirty_sessions。后台 flusher 批量写入变更过的题目，
+提交时整份写入；Redis 不可用时直接写库。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.config import (
+    ANSWER_DRAFT_FLUSH_SECONDS,
+    ANSWER_DRAFT_TTL_SECONDS,
+    ANSWER_DRAFTS_ENABLED,
+)
+from app.core.db import db as db_module
+from app.repositories import assessment_responses as responses_repo
+from app.repositories import assessment_sessions as sessions_repo
+from app.schemas.assessment import format_answer_for_storage
+
+logger = logging.getLogger(__name__)
+
+DIRTY_SESSIONS_KEY = "assess:dirty_sessions"
+
+# KEYS: meta, answers, dirty, dirty_sessions
+# ARGV: user_id, last_index ('' = unchanged), ttl, session_id, item_id, answer[, item_id, answer ...]
+# All items are checked before anything is written (a batch is all-or-nothing).
+SAVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return {'miss'} end
+local meta = redis.call('HMGET', KEYS[1], 'user', 'submitted', 'total')
+if meta[1] ~= ARGV[1] then return {'forbidden'} end
+if meta[2] ~= '0' then return {'submitted'} end
+for i = 5, #ARGV, 2 do
+  if redis.call('HEXISTS', KEYS[1], 'item:' .. ARGV[i]) == 0 then return {'item_not_found'} end
+end
+for i = 5, #ARGV, 2 do
+  redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+  redis.call('SADD', KEYS[3], ARGV[i])
+end
+redis.call('SADD', KEYS[4], ARGV[4])
+if ARGV[2] ~= '' then redis.call('HSET', KEYS[1], 'last', ARGV[2]) end
+for i = 1, 3 do redis.call('EXPIRE', KEYS[i], ARGV[3]) end
+return {'ok', tostring(redis.call('HLEN', KEYS[2])), meta[3], redis.call('HGET', KEYS[1], 'last') or '0'}
+"""
+
+# KEYS: dirty, answers -> flat [item_id, answer, ...]; the dirty set is cleared atomically
+TAKE_SCRIPT = """
+local ids = redis.call('SMEMBERS', KEYS[1])
+if #ids == 0 then return {} end
+redis.call('DEL', KEYS[1])
+local values = redis.call('HMGET', KEYS[2], unpack(ids))
+local out = {}
+for i, id in ipairs(ids) do
+  out[#out + 1] = id
+  out[#out + 1] = values[i] or ''
+end
+return out
+"""
+
+
+def _keys(session_id: UUID) -> tuple[str, str, str]:
+    base = f"assess:{session_id}"
+    return f"{base}:meta", f"{base}:answers", f"{base}:dirty"
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class DraftProgress:
+    answered: int
+    total: int
+    last_question_index: int
+
+
+class DraftSaveRejected(Exception):
+    """Session not owned / already submitted / unknown item (``reason``)."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AnswerDraftStore:
+    """Redis-backed answer drafts plus the flush into ``assessment_responses``."""
+
+    def __init__(self, *, ttl_seconds: int = 86400, enabled: bool = True) -> None:
+        self.ttl_seconds = int(ttl_seconds)
+        self.enabled = enabled
+        self._redis = None
+        self._save = None
+        self._take = None
+
+    def bind_redis(self, redis) -> None:
+        """lifespan 中注入 app.state.redis；None 表示直接写库"""
+        self._redis = redis
+        self._save = redis.register_script(SAVE_SCRIPT) if redis is not None else None
+        self._take = redis.register_script(TAKE_SCRIPT) if redis is not None else None
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and self._redis is not None
+
+    # ------------------------------ click path -----------------------------
+
+    async def prime(
+        self,
+        session_id: UUID,
+        *,
+        user_id: UUID,
+        items: Iterable[tuple[UUID, str]],
+        answers: Optional[dict[UUID, str]] = None,
+        last_question_index: int = 0,
+    ) -> None:
+        """Load a session's ownership, item list and saved answers into Redis."""
+        meta_key, answers_key, _ = _keys(session_id)
+        items = list(items)
+        meta = {
+            "user": str(user_id),
+            "submitted": "0",
+            "total": str(len(items)),
+            "last": str(last_question_index or 0),
+        }
+        meta.update({f"item:{item_id}": qtype or "" for item_id, qtype in items})
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(meta_key, answers_key)
+        pipe.hset(meta_key, mapping=meta)
+        if answers:
+            pipe.hset(answers_key, mapping={str(k): v for k, v in answers.items()})
+            pipe.expire(answers_key, self.ttl_seconds)
+        pipe.expire(meta_key, self.ttl_seconds)
+        await pipe.execute()
+
+    async def save(
+        self,
+        session_id: UUID,
+        *,
+        user_id: UUID,
+        answers: dict[UUID, str],
+        last_question_index: Optional[int] = None,
+    ) -> Optional[DraftProgress]:
+        """
+        Store one or more draft answers (single round trip).
+
+        Returns ``None`` when the session is not primed. Raises
+        ``DraftSaveRejected`` for ownership / state / item errors, in which
+        case nothing is written.
+        """
+        meta_key, answers_key, dirty_key = _keys(session_id)
+        args = [
+            str(user_id),
+            "" if last_question_index is None else str(last_question_index),
+            self.ttl_seconds,
+            str(session_id),
+        ]
+        for item_id, answer in answers.items():
+            args += [str(item_id), answer]
+        result = await self._save(
+            keys=[meta_key, answers_key, dirty_key, DIRTY_SESSIONS_KEY], args=args
+        )
+        status = _text(result[0])
+        if status == "miss":
+            return None
+        if status != "ok":
+            raise DraftSaveRejected(status)
+        return DraftProgress(
+            answered=int(_text(result[1])),
+            total=int(_text(result[2] or 0)),
+            last_question_index=int(_text(result[3])),
+        )
+
+    async def progress(self, session_id: UUID) -> Optional[DraftProgress]:
+        """Answered / total / last index as seen by the drafts, if primed."""
+        meta_key, answers_key, _ = _keys(session_id)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hmget(meta_key, "total", "last")
+        pipe.hlen(answers_key)
+        (total, last), answered = await pipe.execute()
+        if total is None:
+            return None
+        return DraftProgress(
+            answered=int(answered), total=int(_text(total)), last_question_index=int(_text(last or 0))
+        )
+
+    # ------------------------------ submit ---------------------------------
+
+    async def set_submitted(self, session_id: UUID, submitted: bool) -> None:
+        """Block (or re-open) draft saves while a submit is in flight."""
+        meta_key, _, _ = _keys(session_id)
+        if await self._redis.exists(meta_key):
+            await self._redis.hset(meta_key, "submitted", "1" if submitted else "0")
+
+    async def reopen(self, session_id: UUID) -> None:
+        """Submit failed: mark every draft dirty again and accept saves."""
+        meta_key, _, _ = _keys(session_id)
+        if not await self._redis.exists(meta_key):
+            return
+        await self._redis.hset(meta_key, "submitted", "0")
+        await self._mark_dirty(session_id)
+
+    async def discard(self, session_id: UUID) -> None:
+        await self._redis.delete(*_keys(session_id))
+        await self._redis.srem(DIRTY_SESSIONS_KEY, str(session_id))
+
+    # ------------------------------ flushing -------------------------------
+
+    async def _mark_dirty(self, session_id: UUID, item_ids: Optional[Iterable[str]] = None) -> None:
+        """Queue items (default: every draft of the session) for the next flush."""
+        _, answers_key, dirty_key = _keys(session_id)
+        ids = list(item_ids) if item_ids is not None else await self._redis.hkeys(answers_key)
+        if not ids:
+            return
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.sadd(dirty_key, *ids)
+        pipe.sadd(DIRTY_SESSIONS_KEY, str(session_id))
+        await pipe.execute()
+
+    async def _take_all(self, session_id: UUID) -> list:
+        """Every draft of the session, clearing its dirty set (same shape as TAKE_SCRIPT)."""
+        _, answers_key, dirty_key = _keys(session_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hgetall(answers_key)
+        pipe.delete(dirty_key)
+        values, _ = await pipe.execute()
+        return [part for pair in values.items() for part in pair]
+
+    async def flush(self, db: AsyncSession, session_id: UUID, *, full: bool = False) -> int:
+        """
+        Write the session's drafts with one bulk upsert (no commit).
+
+        The flusher writes the items changed since its last run; submit passes
+        ``full=True`` and writes the whole answers hash, so items taken by a
+        flush that has not committed yet still reach the graded rows. The
+        session row is updated first and only while unsubmitted, so a flush
+        and a submit serialise on that row lock and a flush that loses the
+        race drops its (already written) drafts instead of overwriting them.
+
+        On a database error the taken items are marked dirty again.
+        """
+        if not self.available:
+            return 0
+        meta_key, answers_key, dirty_key = _keys(session_id)
+        if full:
+            flat = await self._take_all(session_id)
+        else:
+            flat = await self._take(keys=[dirty_key, answers_key])
+        if not flat:
+            return 0
+        raw = {_text(flat[i]): _text(flat[i + 1]) for i in range(0, len(flat), 2)}
+        meta = {_text(k): _text(v) for k, v in (await self._redis.hgetall(meta_key)).items()}
+
+        answers: dict[UUID, str] = {}
+        for item_id, answer in raw.items():
+            qtype = meta.get(f"item:{item_id}")
+            answers[UUID(item_id)] = format_answer_for_storage(answer, qtype) if qtype else answer
+        try:
+            if meta.get("last"):
+                locked = await sessions_repo.update_last_question_index(
+                    db, session_id=session_id, last_question_index=int(meta["last"]), open_only=True
+                )
+                if not locked:
+                    # 会话已提交（提交时已整体写入），这批草稿不再落库
+                    return 0
+            await responses_repo.upsert_answers_bulk(db, session_id=session_id, answers=answers)
+        except Exception:
+            await self._mark_dirty(session_id, raw)
+            raise
+        return len(answers)
+
+    async def flush_pending(self, batch: int = 100) -> int:
+        """Flush sessions with unsaved drafts (periodic flusher)."""
+        if not self.available:
+            return 0
+        flushed = 0
+        members = await self._redis.spop(DIRTY_SESSIONS_KEY, batch) or []
+        for member in members:
+            session_id = UUID(_text(member))
+            try:
+                async with db_module.AsyncSessionLocal() as db:
+                    count = await self.flush(db, session_id)
+                    try:
+                        await db.commit()
+                    except Exception:
+                        # 已从 dirty 集合取出，提交失败时整份草稿重新排队
+                        await self._mark_dirty(session_id)
+                        raise
+                flushed += count
+            except Exception as exc:
+                logger.warning("answer draft flush failed for session %s: %s", session_id, exc)
+        return flushed
+
+
+class AnswerDraftFlusher:
+    """Background loop calling ``AnswerDraftStore.flush_pending``."""
+
+    def __init__(self, store: AnswerDraftStore, *, interval: float = 15.0) -> None:
+        self.store = store
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None and self.store.available:
+            self._task = asyncio.create_task(self._run(), name="answer-draft-flusher")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        # 退出前把剩余草稿落库
+        try:
+            await self.store.flush_pending(batch=10_000)
+        except Exception as exc:
+            logger.warning("final answer draft flush failed: %s", exc)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.store.flush_pending()
+            except Exception as exc:
+                logger.warning("answer draft flush loop failed: %s", exc)
+
+
+answer_drafts = AnswerDraftStore(ttl_seconds=ANSWER_DRAFT_TTL_SECONDS, enabled=ANSWER_DRAFTS_ENABLED)
+draft_flusher = AnswerDraftFlusher(answer_drafts, interval=ANSWER_DRAFT_FLUSH_SECONDS)
+
+
+__all__ = [
+    "AnswerDraftFlusher",
+    "AnswerDraftStore",
+    "DraftProgress",
+    "DraftSaveRejected",
+    "answer_drafts",
+    "draft_flusher",
+]
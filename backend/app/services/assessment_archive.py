@@ -0,0 +1,111 @@
+"""
+已提交评测归档任务
+
+提交超过保留期的会话渲染成最终详情 JSON，gzip 后写入 assessment_archive，
+并在同一事务中删除热表行；由 scripts/archive_assessments.py 定时执行。
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from app.core.config.config import ASSESSMENT_ARCHIVE_BATCH, ASSESSMENT_ARCHIVE_RETENTION_DAYS
+from app.core.db import db as db_module
+from app.repositories import assessment_archive as archive_repo
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ArchiveReport:
+    cutoff: datetime
+    archived: int = 0
+    batches: int = 0
+    payload_bytes: int = 0
+    dry_run: bool = False
+
+    def as_dict(self) -> dict:
+        return {
+            "cutoff": self.cutoff.isoformat(),
+            "archived": self.archived,
+            "batches": self.batches,
+            "payload_bytes": self.payload_bytes,
+            "dry_run": self.dry_run,
+        }
+
+
+class AssessmentArchiver:
+    """Batch job: one transaction per batch (insert archive rows + delete hot rows)."""
+
+    def __init__(self, *, retention_days: int = 180, batch_size: int = 200) -> None:
+        self.retention_days = retention_days
+        self.batch_size = max(1, batch_size)
+
+    async def run(
+        self,
+        *,
+        max_batches: int | None = None,
+        dry_run: bool = False,
+        now: datetime | None = None,
+    ) -> ArchiveReport:
+        now = now or datetime.now(timezone.utc)
+        report = ArchiveReport(
+            cutoff=now - timedelta(days=self.retention_days), dry_run=dry_run
+        )
+        while max_batches is None or report.batches < max_batches:
+            async with db_module.AsyncSessionLocal() as db:
+                archived, payload_bytes = await self.archive_batch(
+                    db, cutoff=report.cutoff, dry_run=dry_run
+                )
+            if not archived:
+                break
+            report.batches += 1
+            report.archived += archived
+            report.payload_bytes += payload_bytes
+            logger.info({"action": "assessments_archived", **report.as_dict()})
+            if dry_run or archived < self.batch_size:
+                break
+        return report
+
+    async def archive_batch(
+        self, db, *, cutoff: datetime, dry_run: bool = False
+    ) -> tuple[int, int]:
+        """
+        Archive one batch in ``db`` and commit it.
+
+        Returns ``(sessions archived, compressed payload bytes)``; with
+        ``dry_run`` the payloads are built but nothing is written.
+        """
+        # Imported lazily: the assessment service imports the repositories this job feeds.
+        from app.services.old.assessment_service import AssessmentService
+
+        sessions = await archive_repo.list_archivable_sessions(
+            db, submitted_before=cutoff, limit=self.batch_size
+        )
+        if not sessions:
+            return 0, 0
+
+        service = AssessmentService(db)
+        rows = []
+        for session in sessions:
+            detail = await service.build_session_detail(session)
+            rows.append(archive_repo.archive_row(session, detail.model_dump(mode="json")))
+        payload_bytes = sum(len(row["payload"]) for row in rows)
+
+        if dry_run:
+            await db.rollback()
+            return len(rows), payload_bytes
+
+        await archive_repo.insert_archived(db, rows)
+        await archive_repo.delete_hot_sessions(db, (row["session_id"] for row in rows))
+        await db.commit()
+        return len(rows), payload_bytes
+
+
+assessment_archiver = AssessmentArchiver(
+    retention_days=ASSESSMENT_ARCHIVE_RETENTION_DAYS, batch_size=ASSESSMENT_ARCHIVE_BATCH
+)
+
+
+__all__ = ["ArchiveReport", "AssessmentArchiver", "assessment_archiver"]
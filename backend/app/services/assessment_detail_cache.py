@@ -0,0 +1,144 @@
+"""
+已提交评测详情缓存（Redis）
+
+详情 JSON 只序列化一次，存入 assess:detail:{sid}，按 body 计算强 ETag：
+AI 反馈结束后为 immutable，pending 时 no-cache 让客户端用 304 重新验证。
+响应体里不带 request_id（只在 X-Request-Id 头里），同一 ETag 字节一致。
+反馈写入时 worker 删除缓存；pending 条目另有较短 TTL。
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.core.config.config import ASSESSMENT_DETAIL_CACHE_TTL_SECONDS
+from app.schemas.core.api_response import ok_raw
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "private, max-age=31536000, immutable"
+REVALIDATE = "private, no-cache"
+
+
+def _key(session_id: UUID) -> str:
+    return f"assess:detail:{session_id}"
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedDetail:
+    user_id: str
+    etag: str
+    body: str
+    final: bool
+
+    @property
+    def cache_control(self) -> str:
+        return IMMUTABLE if self.final else REVALIDATE
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"ETag": self.etag, "Cache-Control": self.cache_control}
+
+    def response(self) -> Response:
+        """200 envelope around ``body``; request_id is left out so the bytes match the strong ETag."""
+        return ok_raw(self.body, headers=self.headers)
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """``If-None-Match`` check (comma-separated list or ``*``)."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+
+    @classmethod
+    def build(cls, *, user_id: UUID, detail: BaseModel) -> "CachedDetail":
+        body = detail.model_dump_json()
+        ai_status = getattr(getattr(detail, "session", None), "ai_status", None)
+        return cls(
+            user_id=str(user_id),
+            etag='"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"',
+            body=body,
+            final=ai_status != "pending",
+        )
+
+
+class AssessmentDetailCache:
+    """Redis hash per submitted session; every call is best-effort."""
+
+    def __init__(self, ttl_seconds: int = 604800, pending_ttl_seconds: int = 60) -> None:
+        self.ttl_seconds = int(ttl_seconds)
+        self.pending_ttl_seconds = int(pending_ttl_seconds)
+        self._redis = None
+
+    def bind_redis(self, redis) -> None:
+        """lifespan 中注入 app.state.redis；None 表示每次现算（仍带 ETag）"""
+        self._redis = redis
+
+    @property
+    def available(self) -> bool:
+        return self._redis is not None
+
+    async def get(self, session_id: UUID) -> Optional[CachedDetail]:
+        if self._redis is None:
+            return None
+        try:
+            raw = await self._redis.hgetall(_key(session_id))
+        except Exception as exc:
+            logger.warning("detail cache read failed for session %s: %s", session_id, exc)
+            return None
+        if not raw:
+            return None
+        fields = {_text(k): _text(v) for k, v in raw.items()}
+        try:
+            return CachedDetail(
+                user_id=fields["user"],
+                etag=fields["etag"],
+                body=fields["body"],
+                final=fields.get("final") == "1",
+            )
+        except KeyError:
+            return None
+
+    async def put(self, session_id: UUID, cached: CachedDetail) -> None:
+        if self._redis is None:
+            return
+        key = _key(session_id)
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.hset(
+                key,
+                mapping={
+                    "user": cached.user_id,
+                    "etag": cached.etag,
+                    "body": cached.body,
+                    "final": "1" if cached.final else "0",
+                },
+            )
+            pipe.expire(key, self.ttl_seconds if cached.final else self.pending_ttl_seconds)
+            await pipe.execute()
+        except Exception as exc:
+            logger.warning("detail cache write failed for session %s: %s", session_id, exc)
+
+    async def invalidate(self, session_id: UUID) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.delete(_key(session_id))
+        except Exception as exc:
+            logger.warning("detail cache invalidation failed for session %s: %s", session_id, exc)
+
+
+detail_cache = AssessmentDetailCache(ttl_seconds=ASSESSMENT_DETAIL_CACHE_TTL_SECONDS)
+
+
+__all__ = ["AssessmentDetailCache", "CachedDetail", "detail_cache"]
@@ -0,0 +1,243 @@
+"""
+全局评测 AI 反馈的后台生成
+
+提交时先写兜底反馈并标记 ai_status='pending'，由本 worker 在请求之外调用模型
+补写 ai_summary / ai_recommendation。失败保持 pending，按租约重试到上限后置为
+failed；进程退出时未完成的任务由定时扫描重新认领。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from app.core.config.config import (
+    AI_FEEDBACK_CONCURRENCY,
+    AI_FEEDBACK_LEASE_SECONDS,
+    AI_FEEDBACK_MAX_ATTEMPTS,
+    AI_FEEDBACK_POLL_SECONDS,
+    AI_FEEDBACK_SWEEP_SECONDS,
+)
+from app.core.db import db as db_module
+from app.services.assessment_detail_cache import detail_cache
+from app.repositories import assessment_sessions as sessions_repo
+
+logger = logging.getLogger(__name__)
+
+
+class AssessmentFeedbackWorker:
+    """Queue + consumers that fill AI feedback for submitted sessions."""
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = 2,
+        max_attempts: int = 3,
+        sweep_interval: float = 30.0,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.sweep_interval = sweep_interval
+        self.lease_seconds = lease_seconds
+        self.poll_interval = max(0.05, poll_interval)
+        self._queue: asyncio.Queue[UUID] | None = None
+        self._queued: set[UUID] = set()
+        self._waiters: dict[UUID, set[asyncio.Event]] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._consume(), name=f"ai-feedback-{idx}")
+            for idx in range(self.concurrency)
+        ]
+        self._tasks.append(
+            asyncio.create_task(self._sweep_loop(), name="ai-feedback-sweep")
+        )
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+        self._queued.clear()
+
+    def enqueue(self, session_id: UUID) -> None:
+        """Schedule generation for a session already marked ``pending``."""
+        if self._queue is None:
+            # Not running in this process (tests, scripts): the row stays
+            # pending and is claimed by the sweep of a running worker.
+            return
+        if session_id in self._queued:
+            return
+        self._queued.add(session_id)
+        self._queue.put_nowait(session_id)
+
+    def watch(self, session_id: UUID) -> asyncio.Event:
+        """
+        Register a long-poll waiter.
+
+        Call this before reading ``ai_status`` so a job that finishes between
+        the read and the wait still sets the event.
+        """
+        event = asyncio.Event()
+        self._waiters.setdefault(session_id, set()).add(event)
+        return event
+
+    def unwatch(self, session_id: UUID, event: asyncio.Event) -> None:
+        events = self._waiters.get(session_id)
+        if events is None:
+            return
+        events.discard(event)
+        if not events:
+            self._waiters.pop(session_id, None)
+
+    async def wait_for(
+        self,
+        session_id: UUID,
+        timeout: float,
+        *,
+        event: Optional[asyncio.Event] = None,
+        poll: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> bool:
+        """
+        Wait until the session's job settles (long-poll).
+
+        The event only fires for jobs run by this process, so with ``poll``
+        (returns True once ``ai_status`` left pending) the database is also
+        checked every ``poll_interval`` seconds for jobs finished elsewhere.
+        """
+        event = event or self.watch(session_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                step = min(remaining, self.poll_interval) if poll else remaining
+                try:
+                    await asyncio.wait_for(event.wait(), step)
+                    return True
+                except asyncio.TimeoutError:
+                    pass
+                if poll is not None and await poll():
+                    return True
+        finally:
+            self.unwatch(session_id, event)
+
+    def _notify(self, session_id: UUID) -> None:
+        for event in self._waiters.pop(session_id, ()):
+            event.set()
+
+    async def _settled(self, session_id: UUID) -> None:
+        """The session left ``pending``: drop its cached detail, wake waiters."""
+        await detail_cache.invalidate(session_id)
+        self._notify(session_id)
+
+    async def _consume(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            session_id = await queue.get()
+            self._queued.discard(session_id)
+            try:
+                await self.process(session_id)
+            except Exception:
+                logger.exception("AI feedback job crashed for session %s", session_id)
+            finally:
+                queue.task_done()
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as exc:
+                logger.warning("AI feedback sweep failed: %s", exc)
+            await asyncio.sleep(self.sweep_interval)
+
+    async def sweep(self) -> int:
+        """Re-enqueue pending jobs whose last claim is older than the lease."""
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+        async with db_module.AsyncSessionLocal() as db:
+            rows = await sessions_repo.list_pending_ai_feedback(
+                db, stale_before=stale_before
+            )
+        for session_id, _ in rows:
+            self.enqueue(session_id)
+        return len(rows)
+
+    async def process(self, session_id: UUID) -> str | None:
+        """
+        Run one generation attempt.
+
+        Returns the resulting ``ai_status`` or ``None`` when another worker
+        owns the job.
+        """
+        # Imported lazily: the assessment service enqueues into this module.
+        from app.services.old.assessment_service import AssessmentService
+
+        async with db_module.AsyncSessionLocal() as db:
+            session = await sessions_repo.get_session_by_id(db, session_id)
+            if not session or session.ai_status != "pending":
+                await self._settled(session_id)
+                return session.ai_status if session else None
+
+            attempts = int(session.ai_attempts or 0)
+            if attempts >= self.max_attempts:
+                await sessions_repo.update_ai_content(db, session_id, ai_status="failed")
+                await db.commit()
+                await self._settled(session_id)
+                return "failed"
+
+            if not await sessions_repo.claim_ai_feedback_job(db, session_id, attempts):
+                await db.rollback()
+                return None
+            await db.commit()
+
+            try:
+                await AssessmentService(db).generate_session_feedback(
+                    session_id=session_id
+                )
+                await db.commit()
+            except Exception as exc:
+                await db.rollback()
+                logger.warning(
+                    "AI feedback attempt %s failed for session %s: %s",
+                    attempts + 1,
+                    session_id,
+                    exc,
+                )
+                if attempts + 1 < self.max_attempts:
+                    # Left pending; the sweep retries once the lease expires.
+                    return "pending"
+                await sessions_repo.update_ai_content(db, session_id, ai_status="failed")
+                await db.commit()
+                await self._settled(session_id)
+                return "failed"
+
+        await self._settled(session_id)
+        return "ready"
+
+
+feedback_worker = AssessmentFeedbackWorker(
+    concurrency=AI_FEEDBACK_CONCURRENCY,
+    max_attempts=AI_FEEDBACK_MAX_ATTEMPTS,
+    sweep_interval=AI_FEEDBACK_SWEEP_SECONDS,
+    lease_seconds=AI_FEEDBACK_LEASE_SECONDS,
+    poll_interval=AI_FEEDBACK_POLL_SECONDS,
+)
+
+
+__all__ = ["AssessmentFeedbackWorker", "feedback_worker"]
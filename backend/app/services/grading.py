@@ -0,0 +1,219 @@
+"""
+判分引擎（全局评测与两种主题小测共用）
+
+生成快照时把 answer_key 预编译进 snapshot["grading"]（如 {"q": "multi", "a": "A,C"}、
+{"q": "short", "r": [...]}），提交时按快照一次遍历判分；没有该字段的旧快照回退到
+answer_key 或题目行。grading 字段不会返回给前端。全局评测与旧版小测的简答题是否
+自动判分由 SHORT_ANSWER_AUTO_GRADE 控制（默认不判）。
+"""
+from __future__ import annotations
+
+import difflib
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Hashable, Iterable, Optional
+
+from app.core.config.config import SHORT_ANSWER_MATCH_RATIO, SHORT_ANSWER_MAX_LENGTH_RATIO
+from app.schemas.assessment import (
+    normalize_multi_choice_answer,
+    normalize_single_choice_answer,
+    parse_correct_answer,
+)
+
+GRADING_KEY = "grading"
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledKey:
+    qtype: str
+    answer: Optional[str] = None            # objective: normalized "B" / "A,C"
+    references: tuple[str, ...] = ()        # short: normalized accepted answers
+
+    @property
+    def gradable(self) -> bool:
+        return bool(self.answer) if self.qtype != "short" else bool(self.references)
+
+    def to_snapshot(self) -> dict:
+        if self.qtype == "short":
+            return {"q": self.qtype, "r": list(self.references)}
+        return {"q": self.qtype, "a": self.answer}
+
+    @classmethod
+    def from_snapshot(cls, raw: dict) -> "CompiledKey":
+        return cls(
+            qtype=raw.get("q") or "",
+            answer=raw.get("a"),
+            references=tuple(raw.get("r") or ()),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class GradeResult:
+    is_correct: Optional[bool]   # None: not auto-gradable / unanswered
+    score: float
+
+
+@dataclass(slots=True)
+class SessionGrade:
+    results: dict[Hashable, GradeResult] = field(default_factory=dict)
+    correct_count: int = 0
+    total_score: float = 0.0
+
+
+# ------------------------------ compiling ------------------------------
+
+
+@lru_cache(maxsize=8192)
+def normalize_text(text: str) -> str:
+    """casefold, drop punctuation, collapse whitespace"""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text.casefold())).strip()
+
+
+def _short_references(answer_key: dict) -> tuple[str, ...]:
+    raw: list[Any] = []
+    for key in ("reference", "references", "accepted", "correct_options", "correct"):
+        value = answer_key.get(key)
+        if isinstance(value, (list, tuple)):
+            raw.extend(value)
+        elif value:
+            raw.append(value)
+    refs = (normalize_text(str(value)) for value in raw)
+    return tuple(dict.fromkeys(ref for ref in refs if ref))
+
+
+def compile_answer_key(qtype: Optional[str], answer_key: Optional[dict]) -> CompiledKey:
+    """Normalize an ``answer_key`` dict into the form graded at submit time."""
+    qtype = qtype or ""
+    if qtype == "short":
+        return CompiledKey(
+            qtype=qtype,
+            references=_short_references(answer_key) if isinstance(answer_key, dict) else (),
+        )
+    return CompiledKey(qtype=qtype, answer=parse_correct_answer(qtype, answer_key))
+
+
+def compile_question(question: Any) -> CompiledKey:
+    """``question``: ORM ``Question`` or ``QuestionDTO`` (needs qtype / answer_key)."""
+    return compile_answer_key(question.qtype, question.answer_key)
+
+
+def key_from_snapshot(snapshot: Optional[dict], question: Any = None) -> Optional[CompiledKey]:
+    """Compiled key of an item; falls back to ``answer_key`` / the question row for old snapshots."""
+    snapshot = snapshot or {}
+    raw = snapshot.get(GRADING_KEY)
+    if isinstance(raw, dict):
+        return CompiledKey.from_snapshot(raw)
+    if isinstance(snapshot.get("answer_key"), dict):
+        return compile_answer_key(snapshot.get("qtype"), snapshot["answer_key"])
+    if question is not None:
+        return compile_question(question)
+    return None
+
+
+# ------------------------------ matching -------------------------------
+
+
+# 词内拼写容错：两个词都不短于 _MIN_FUZZY_WORD 个字符时按字符相似度比较
+_WORD_RATIO = 0.8
+_MIN_FUZZY_WORD = 4
+
+
+def _same_word(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if min(len(a), len(b)) < _MIN_FUZZY_WORD:
+        return False
+    return difflib.SequenceMatcher(None, a, b).ratio() >= _WORD_RATIO
+
+
+@lru_cache(maxsize=16384)
+def fuzzy_match(answer: str, reference: str) -> bool:
+    """
+    Short-answer match on normalized text.
+
+    Words are paired greedily (exact, or a close spelling for words of 4+
+    letters) and the Dice score ``2 * matched / (answer words + reference
+    words)`` must reach ``SHORT_ANSWER_MATCH_RATIO``. Answers whose word count
+    is more than ``SHORT_ANSWER_MAX_LENGTH_RATIO`` times off the reference
+    fail outright, so listing every candidate term doesn't pass.
+
+    Cached: the same short answers recur across learners and re-submits.
+    """
+    if not answer or not reference:
+        return False
+    if answer == reference:
+        return True
+    words, ref_words = answer.split(), reference.split()
+    ratio = len(words) / len(ref_words)
+    if not 1 / SHORT_ANSWER_MAX_LENGTH_RATIO <= ratio <= SHORT_ANSWER_MAX_LENGTH_RATIO:
+        return False
+    unmatched = list(words)
+    matched = 0
+    for ref in ref_words:
+        hit = next((word for word in unmatched if _same_word(word, ref)), None)
+        if hit is not None:
+            unmatched.remove(hit)
+            matched += 1
+    return 2 * matched / (len(words) + len(ref_words)) >= SHORT_ANSWER_MATCH_RATIO
+
+
+def _as_list(answer: Any) -> list[str]:
+    if answer is None:
+        return []
+    if isinstance(answer, str):
+        return [answer]
+    if isinstance(answer, Iterable):
+        return [str(part) for part in answer]
+    return [str(answer)]
+
+
+def _normalize_objective(qtype: str, answer: Any) -> str:
+    joined = ",".join(part for part in _as_list(answer) if part and part.strip())
+    if not joined:
+        return ""
+    if qtype == "multi":
+        return normalize_multi_choice_answer(joined)
+    return normalize_single_choice_answer(joined)
+
+
+def grade(key: Optional[CompiledKey], answer: Any, *, grade_short: bool = True) -> GradeResult:
+    """
+    Grade one answer (``str`` or list of option codes / short answers).
+
+    ``grade_short=False`` leaves short answers ungraded (``is_correct=None``).
+    """
+    if key is None or not key.gradable or (key.qtype == "short" and not grade_short):
+        return GradeResult(is_correct=None, score=0.0)
+    if key.qtype == "short":
+        candidates = (normalize_text(part) for part in _as_list(answer))
+        correct = any(fuzzy_match(c, ref) for c in candidates if c for ref in key.references)
+    else:
+        correct = _normalize_objective(key.qtype, answer) == key.answer
+    return GradeResult(is_correct=correct, score=1.0 if correct else 0.0)
+
+
+def grade_session(
+    entries: Iterable[tuple[Hashable, Optional[CompiledKey], Any]], *, grade_short: bool = True
+) -> SessionGrade:
+    """
+    Grade a whole session in one pass.
+
+    ``entries``: ``(item_id, compiled_key, answer)``; ``answer=None`` means
+    unanswered and is left ungraded. ``grade_short`` as in :func:`grade`.
+    """
+    out = SessionGrade()
+    for item_id, key, answer in entries:
+        result = (
+            GradeResult(is_correct=None, score=0.0)
+            if answer is None
+            else grade(key, answer, grade_short=grade_short)
+        )
+        out.results[item_id] = result
+        if result.is_correct:
+            out.correct_count += 1
+        out.total_score += result.score
+    return out
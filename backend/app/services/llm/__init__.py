@@ -0,0 +1,30 @@
+"""LLM call infrastructure (providers, routing, scheduling, circuit breaking, telemetry)."""
+
+from app.services.llm.breaker import CircuitBreaker, CircuitOpenError, llm_breaker
+from app.services.llm.providers import (
+    LLMTimeoutError,
+    ProviderConfig,
+    ProviderNotConfiguredError,
+    provider_registry,
+)
+from app.services.llm.routing import ModelRouter, RoutingPolicy, llm_router
+from app.services.llm.scheduler import LLMScheduler, Priority, llm_scheduler
+from app.services.llm.telemetry import LLMTelemetry, llm_telemetry
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "LLMScheduler",
+    "LLMTelemetry",
+    "LLMTimeoutError",
+    "ModelRouter",
+    "Priority",
+    "ProviderConfig",
+    "ProviderNotConfiguredError",
+    "RoutingPolicy",
+    "llm_breaker",
+    "llm_router",
+    "llm_scheduler",
+    "llm_telemetry",
+    "provider_registry",
+]
@@ -0,0 +1,174 @@
+"""Circuit breaker for upstream LLM calls.
+
+``closed``    -> calls pass; consecutive failures are counted.
+``open``      -> calls fail fast with :class:`CircuitOpenError` until
+                 ``reset_timeout`` elapses.
+``half_open`` -> a limited number of probe calls pass; one success closes
+                 the circuit, one failure opens it again.
+
+Calls run on executor threads, so state is guarded by a lock.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+from app.core.config.config import (
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_BREAKER_RESET_SECONDS,
+)
+from app.core.metrics.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = gauge(
+    "llm_circuit_state", "Circuit state (0=closed, 1=half_open, 2=open)", ["name"]
+)
+CIRCUIT_TRANSITIONS = counter(
+    "llm_circuit_transitions_total", "Circuit state transitions", ["name", "to"]
+)
+
+
+def _is_upstream_failure(exc: Exception) -> bool:
+    """Client errors (bad request, auth, ...) say nothing about upstream health."""
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in (408, 429):
+        return False
+    return True
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling upstream while the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"circuit '{name}' is open; retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        CIRCUIT_STATE.labels(name=name).set(_STATE_VALUE[CLOSED])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allows_request(self) -> bool:
+        """Cheap pre-check (does not take a half-open probe slot)."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                return False
+            if self._state == HALF_OPEN:
+                return self._probes < self.half_open_max_calls
+            return True
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            if not _is_upstream_failure(exc):
+                self._on_success()
+            else:
+                self._on_failure(exc)
+            raise
+        self._on_success()
+        return result
+
+    # ---------------------------- internals -----------------------------
+
+    def _before_call(self) -> None:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                raise CircuitOpenError(
+                    self.name, self._opened_at + self.reset_timeout - self._clock()
+                )
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    raise CircuitOpenError(self.name, self.reset_timeout)
+                self._probes += 1
+
+    def _on_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+
+    def _on_failure(self, exc: Exception) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._transition(OPEN, reason=exc)
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str, reason: Exception | None = None) -> None:
+        if state == self._state:
+            return
+        previous, self._state = self._state, state
+        self._probes = 0
+        if state == CLOSED:
+            self._failures = 0
+        CIRCUIT_STATE.labels(name=self.name).set(_STATE_VALUE[state])
+        CIRCUIT_TRANSITIONS.labels(name=self.name, to=state).inc()
+        log = logger.warning if state == OPEN else logger.info
+        log(
+            "circuit %s: %s -> %s%s",
+            self.name,
+            previous,
+            state,
+            f" ({type(reason).__name__}: {reason})" if reason else "",
+        )
+
+
+llm_breaker = CircuitBreaker(
+    "openai",
+    failure_threshold=LLM_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=LLM_BREAKER_RESET_SECONDS,
+)
+
+
+__all__ = ["CircuitBreaker", "CircuitOpenError", "llm_breaker"]
@@ -0,0 +1,61 @@
+"""Prompt construction shared by live calls and offline batch jobs.
+
+Kept free of any client/SDK imports so scripts can build exactly the same
+prompts the API sends.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+
+from app.core.config.config import PROMPT_PATH
+from app.schemas.old.explain import ExplainOut
+
+EXPLAIN_TEMPERATURE = 0.4
+
+
+# 读取prompt模板 (JSON格式)
+@lru_cache()
+def load_prompt_template() -> dict:
+    if not PROMPT_PATH.exists():
+        raise RuntimeError(f"Prompt template not found: {PROMPT_PATH}")
+    with open(PROMPT_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_explain_messages(
+    module_id: str, subtopic: str, known_points: list[str], level: str
+) -> list[dict[str, str]]:
+    tmpl = load_prompt_template()
+    user_content = {
+        "task": "explain_subtopic",
+        "module_id": module_id,
+        "subtopic": subtopic,
+        "known_points": known_points,
+        "level": level,
+        "style": tmpl.get("style", {}),
+        "guardrails": tmpl.get("guardrails", ""),
+    }
+    return [
+        {"role": "system", "content": tmpl.get("system", "")},
+        {"role": "user", "content": json.dumps(user_content, ensure_ascii=False)},
+    ]
+
+
+def parse_explain_response(text: str, module_id: str, subtopic: str) -> dict:
+    # 约定：模型按 JSON 返回（模板中已提示），这里做兜底解析
+    try:
+        data = json.loads(text)
+        return ExplainOut(**{
+            "outline": data.get("outline", []),
+            "explanation": data.get("explanation", ""),
+            "checklist": data.get("checklist", []),
+        }).model_dump()
+    except Exception:
+        # 如果模型没严格按JSON返回，做一个最小降级包装
+        return ExplainOut(
+            outline=[f"{module_id} / {subtopic}"],
+            explanation=text,
+            checklist=[],
+        ).model_dump()
@@ -0,0 +1,111 @@
+"""Lazily-initialised LLM provider clients.
+
+Importing the OpenAI SDK costs a large share of ``import app.main``, so
+clients are only built the first time a provider is actually used. Missing
+credentials surface as :class:`ProviderNotConfiguredError` on that first use
+instead of failing the whole process at import time.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.core.config.config import (
+    LLM_MAX_RETRIES,
+    LLM_TIMEOUT_SECONDS,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+)
+
+DEFAULT_PROVIDER = "default"
+
+
+class ProviderNotConfiguredError(RuntimeError):
+    """The provider has no API key (or was never registered)."""
+
+    def __init__(self, name: str, reason: str = "OPENAI_API_KEY not set") -> None:
+        self.name = name
+        super().__init__(f"LLM provider '{name}' is not configured: {reason}")
+
+
+class LLMTimeoutError(TimeoutError):
+    """SDK-independent wrapper for an upstream request timeout."""
+
+
+@dataclass(frozen=True, slots=True)
+class ProviderConfig:
+    name: str
+    api_key: Optional[str]
+    base_url: Optional[str] = None
+    timeout: float = LLM_TIMEOUT_SECONDS
+    max_retries: int = LLM_MAX_RETRIES
+
+
+class ProviderRegistry:
+    """Named provider configs; clients are created on first :meth:`client` call."""
+
+    def __init__(self) -> None:
+        self._configs: dict[str, ProviderConfig] = {}
+        self._clients: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, config: ProviderConfig) -> None:
+        with self._lock:
+            self._configs[config.name] = config
+            # 配置变更后丢弃旧 client，下次使用时重建
+            self._clients.pop(config.name, None)
+
+    def is_configured(self, name: str = DEFAULT_PROVIDER) -> bool:
+        config = self._configs.get(name)
+        return bool(config and config.api_key)
+
+    def is_initialized(self, name: str = DEFAULT_PROVIDER) -> bool:
+        return name in self._clients
+
+    def client(self, name: str = DEFAULT_PROVIDER) -> Any:
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                client = self._build(name)
+                self._clients[name] = client
+            return client
+
+    def _build(self, name: str) -> Any:
+        config = self._configs.get(name)
+        if config is None:
+            raise ProviderNotConfiguredError(name, "unknown provider")
+        if not config.api_key:
+            raise ProviderNotConfiguredError(name)
+        from openai import OpenAI  # deferred: keeps the SDK out of app start-up
+
+        return OpenAI(
+            api_key=config.api_key,
+            base_url=config.base_url,
+            timeout=config.timeout,
+            max_retries=config.max_retries,
+        )
+
+    def reset(self) -> None:
+        """Drop built clients (tests / credential rotation)."""
+        with self._lock:
+            self._clients.clear()
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    """True for SDK timeouts without importing the SDK up front."""
+    if isinstance(exc, LLMTimeoutError):
+        return True
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(exc, openai.APITimeoutError)
+
+
+provider_registry = ProviderRegistry()
+provider_registry.register(
+    ProviderConfig(name=DEFAULT_PROVIDER, api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+)
@@ -0,0 +1,281 @@
+"""Latency-aware model routing for interactive AI endpoints.
+
+A routing policy is an ordered list of tiers. The first tier whose rules
+match the request (question length, learner level) is the *preferred* tier;
+a tier without rules matches everything, so the last tier is normally the
+catch-all. Each tier may name a ``fallback``: while the preferred tier's
+recent p95 latency is above its threshold the request goes to the fallback
+instead (if that one is not slower itself).
+
+Latency samples expire after ``window_seconds`` so a tier that was skipped
+because it was slow gets traffic again once its old samples age out.
+
+Policy (``LLM_ROUTING_POLICY``, inline JSON or a path to a JSON file)::
+
+    {
+      "tiers": [
+        {"name": "fast", "model": "gpt-4o-mini",
+         "max_question_chars": 200, "levels": ["beginner", "intermediate"]},
+        {"name": "primary", "model": "gpt-4o", "fallback": "fast",
+         "p95_threshold_ms": 8000,
+         "base_url": "http://127.0.0.1:9001/v1", "api_key_env": "PRIMARY_KEY"}
+      ],
+      "window_seconds": 300,
+      "min_samples": 10
+    }
+
+Tiers with their own ``base_url`` / ``api_key`` / ``api_key_env`` get a
+dedicated entry in the provider registry; the rest share the default one.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.core.config.config import (
+    LLM_FAST_MODEL,
+    LLM_ROUTING_P95_THRESHOLD_MS,
+    LLM_ROUTING_POLICY,
+    LLM_ROUTING_SHORT_QUESTION_CHARS,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MODEL,
+)
+from app.core.metrics.metrics import counter, gauge
+from app.services.llm.providers import (
+    DEFAULT_PROVIDER,
+    ProviderConfig,
+    ProviderRegistry,
+    provider_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+ROUTED = counter("llm_route_total", "Routing decisions", ["tier", "reason"])
+TIER_P95 = gauge("llm_tier_p95_seconds", "Recent p95 latency per model tier", ["tier"])
+
+
+@dataclass(frozen=True, slots=True)
+class ModelTier:
+    name: str
+    model: str
+    provider: str = DEFAULT_PROVIDER
+    max_question_chars: Optional[int] = None
+    levels: Optional[frozenset[str]] = None
+    fallback: Optional[str] = None
+    p95_threshold_ms: Optional[float] = None
+
+    def matches(self, question: str, level: str) -> bool:
+        if self.max_question_chars is not None and len(question) > self.max_question_chars:
+            return False
+        if self.levels is not None and (level or "").lower() not in self.levels:
+            return False
+        return True
+
+
+@dataclass(frozen=True, slots=True)
+class RouteDecision:
+    tier: ModelTier
+    reason: str          # "rule" | "latency_fallback"
+    preferred: str       # tier the rules picked before latency was considered
+
+    @property
+    def model(self) -> str:
+        return self.tier.model
+
+    @property
+    def provider(self) -> str:
+        return self.tier.provider
+
+
+@dataclass(slots=True)
+class RoutingPolicy:
+    tiers: list[ModelTier]
+    window_seconds: float = 300.0
+    min_samples: int = 10
+    max_samples: int = 200
+    default_p95_threshold_ms: float = 8000.0
+    providers: list[ProviderConfig] = field(default_factory=list)
+
+    def tier(self, name: str) -> ModelTier:
+        for tier in self.tiers:
+            if tier.name == name:
+                return tier
+        raise KeyError(name)
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "RoutingPolicy":
+        tiers: list[ModelTier] = []
+        providers: list[ProviderConfig] = []
+        for item in raw.get("tiers") or []:
+            name = str(item["name"])
+            provider = DEFAULT_PROVIDER
+            api_key = item.get("api_key")
+            if item.get("api_key_env"):
+                api_key = os.getenv(item["api_key_env"])
+            if item.get("base_url") or api_key:
+                provider = f"tier:{name}"
+                providers.append(
+                    ProviderConfig(
+                        name=provider,
+                        api_key=api_key or OPENAI_API_KEY,
+                        base_url=item.get("base_url") or OPENAI_BASE_URL,
+                    )
+                )
+            levels = item.get("levels")
+            tiers.append(
+                ModelTier(
+                    name=name,
+                    model=str(item["model"]),
+                    provider=provider,
+                    max_question_chars=item.get("max_question_chars"),
+                    levels=frozenset(str(lv).lower() for lv in levels) if levels else None,
+                    fallback=item.get("fallback"),
+                    p95_threshold_ms=item.get("p95_threshold_ms"),
+                )
+            )
+        if not tiers:
+            raise ValueError("routing policy needs at least one tier")
+        names = {t.name for t in tiers}
+        for tier in tiers:
+            if tier.fallback and tier.fallback not in names:
+                raise ValueError(f"tier '{tier.name}' falls back to unknown tier '{tier.fallback}'")
+        return cls(
+            tiers=tiers,
+            window_seconds=float(raw.get("window_seconds", 300)),
+            min_samples=int(raw.get("min_samples", 10)),
+            max_samples=int(raw.get("max_samples", 200)),
+            default_p95_threshold_ms=float(
+                raw.get("p95_threshold_ms", LLM_ROUTING_P95_THRESHOLD_MS)
+            ),
+            providers=providers,
+        )
+
+
+def default_policy() -> dict[str, Any]:
+    """Short, non-advanced questions go to the fast model; everything else to
+    ``OPENAI_MODEL``, falling back to the fast model when it gets slow."""
+    return {
+        "tiers": [
+            {
+                "name": "fast",
+                "model": LLM_FAST_MODEL,
+                "max_question_chars": LLM_ROUTING_SHORT_QUESTION_CHARS,
+                "levels": ["beginner", "intermediate"],
+            },
+            {"name": "primary", "model": OPENAI_MODEL, "fallback": "fast"},
+        ],
+        "p95_threshold_ms": LLM_ROUTING_P95_THRESHOLD_MS,
+    }
+
+
+def load_policy(source: Optional[str] = None) -> RoutingPolicy:
+    """Parse ``source`` (inline JSON or a file path); empty means the default."""
+    source = (source or "").strip()
+    if not source:
+        return RoutingPolicy.from_dict(default_policy())
+    if not source.startswith("{"):
+        source = Path(source).read_text(encoding="utf-8")
+    return RoutingPolicy.from_dict(json.loads(source))
+
+
+def _p95(samples: list[float]) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class ModelRouter:
+    """Chooses a tier per request and tracks recent latency per tier."""
+
+    def __init__(
+        self,
+        policy: RoutingPolicy,
+        *,
+        registry: ProviderRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.policy = policy
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[tuple[float, float]]] = {
+            tier.name: deque(maxlen=policy.max_samples) for tier in policy.tiers
+        }
+        for config in policy.providers:
+            (registry or provider_registry).register(config)
+
+    def observe(self, tier_name: str, seconds: float) -> None:
+        """Record an upstream latency (timeouts included) for ``tier_name``."""
+        samples = self._samples.get(tier_name)
+        if samples is None:
+            return
+        with self._lock:
+            samples.append((self._clock(), seconds))
+        p95 = self.p95(tier_name)
+        if p95 is not None:
+            TIER_P95.labels(tier=tier_name).set(p95)
+
+    def p95(self, tier_name: str) -> Optional[float]:
+        """Recent p95 in seconds, or ``None`` without enough fresh samples."""
+        samples = self._samples.get(tier_name)
+        if samples is None:
+            return None
+        cutoff = self._clock() - self.policy.window_seconds
+        with self._lock:
+            while samples and samples[0][0] < cutoff:
+                samples.popleft()
+            values = [latency for _, latency in samples]
+        if len(values) < self.policy.min_samples:
+            return None
+        return _p95(values)
+
+    def _too_slow(self, tier: ModelTier) -> bool:
+        p95 = self.p95(tier.name)
+        if p95 is None:
+            return False
+        threshold = tier.p95_threshold_ms or self.policy.default_p95_threshold_ms
+        return p95 * 1000 > threshold
+
+    def choose(self, question: str, level: str) -> RouteDecision:
+        preferred = next(
+            (tier for tier in self.policy.tiers if tier.matches(question, level)),
+            self.policy.tiers[-1],
+        )
+        decision = RouteDecision(tier=preferred, reason="rule", preferred=preferred.name)
+        if preferred.fallback and self._too_slow(preferred):
+            fallback = self.policy.tier(preferred.fallback)
+            fallback_p95 = self.p95(fallback.name)
+            preferred_p95 = self.p95(preferred.name) or 0.0
+            if fallback_p95 is None or fallback_p95 < preferred_p95:
+                decision = RouteDecision(
+                    tier=fallback, reason="latency_fallback", preferred=preferred.name
+                )
+        ROUTED.labels(tier=decision.tier.name, reason=decision.reason).inc()
+        return decision
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            tier.name: {"model": tier.model, "p95_seconds": self.p95(tier.name)}
+            for tier in self.policy.tiers
+        }
+
+
+def _build_router() -> ModelRouter:
+    try:
+        policy = load_policy(LLM_ROUTING_POLICY)
+    except (OSError, ValueError, KeyError) as exc:
+        # 配置写错时不要让整个服务起不来：退回默认策略
+        logger.error("invalid LLM_ROUTING_POLICY, using default: %s", exc)
+        policy = load_policy(None)
+    return ModelRouter(policy)
+
+
+llm_router = _build_router()
@@ -0,0 +1,203 @@
+"""Priority-aware scheduler for blocking LLM calls.
+
+Every model call goes through :data:`llm_scheduler`. It caps the number of
+calls in flight, serves interactive work before background work, round-robins
+between fairness keys (user / client IP) inside a priority, and sheds
+interactive load early -- ``503`` + ``Retry-After`` -- when the estimated
+queue wait exceeds the configured budget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import math
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from typing import Any, Callable, TypeVar
+
+from app.core.config.config import (
+    LLM_BACKGROUND_WAIT_BUDGET_SECONDS,
+    LLM_INTERACTIVE_WAIT_BUDGET_SECONDS,
+    LLM_MAX_CONCURRENCY,
+    LLM_SERVICE_TIME_SECONDS,
+)
+from app.core.exceptions.codes import BizCode
+from app.core.exceptions.exceptions import BizError
+from app.core.metrics.metrics import counter, gauge, histogram
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+QUEUE_DEPTH = gauge("llm_queue_depth", "LLM calls waiting for a slot", ["priority"])
+INFLIGHT = gauge("llm_inflight", "LLM calls currently running")
+QUEUE_WAIT = histogram(
+    "llm_queue_wait_seconds", "Time LLM calls spent queued", ["priority"]
+)
+SERVICE_TIME = histogram(
+    "llm_service_seconds", "Time spent inside LLM calls", ["priority"]
+)
+SHED = counter("llm_shed_total", "LLM calls rejected by load shedding", ["priority"])
+
+
+class LLMScheduler:
+    """Global concurrency cap + priority queues + per-key round robin."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 4,
+        wait_budgets: dict[Priority, float] | None = None,
+        initial_service_time: float = 3.0,
+        ewma_alpha: float = 0.2,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        # budget <= 0 means "never shed" for that priority
+        self.wait_budgets = wait_budgets or {}
+        self.service_time = initial_service_time
+        self.ewma_alpha = ewma_alpha
+        self._active = 0
+        self._queues: dict[Priority, OrderedDict[str, deque[asyncio.Future]]] = {
+            p: OrderedDict() for p in Priority
+        }
+        self._depth: dict[Priority, int] = {p: 0 for p in Priority}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="llm"
+        )
+
+    # ---------------------------- public API -----------------------------
+
+    def estimate_wait(self, priority: Priority) -> float:
+        """Expected queue wait for a new call at ``priority`` (seconds)."""
+        ahead = sum(self._depth[p] for p in Priority if p <= priority)
+        if self._active < self.max_concurrency and ahead == 0:
+            return 0.0
+        # Everyone ahead plus this call drains through ``max_concurrency`` slots.
+        return (ahead + 1) * self.service_time / self.max_concurrency
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        priority: Priority = Priority.INTERACTIVE,
+        key: str | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """Run blocking ``fn`` on the LLM pool once a slot is granted."""
+        await self._acquire(priority, key or "anonymous")
+        started = time.perf_counter()
+        try:
+            ctx = contextvars.copy_context()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(ctx.run, fn, *args, **kwargs)
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            SERVICE_TIME.labels(priority=priority.name.lower()).observe(elapsed)
+            self.service_time += self.ewma_alpha * (elapsed - self.service_time)
+            self._release()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queued": {p.name.lower(): self._depth[p] for p in Priority},
+            "service_time_ewma": round(self.service_time, 3),
+        }
+
+    # ---------------------------- internals -----------------------------
+
+    async def _acquire(self, priority: Priority, key: str) -> None:
+        label = priority.name.lower()
+        if self._active < self.max_concurrency and not any(self._depth.values()):
+            self._active += 1
+            INFLIGHT.set(self._active)
+            QUEUE_WAIT.labels(priority=label).observe(0.0)
+            return
+
+        budget = self.wait_budgets.get(priority, 0.0)
+        estimate = self.estimate_wait(priority)
+        if budget > 0 and estimate > budget:
+            SHED.labels(priority=label).inc()
+            raise BizError(
+                503,
+                BizCode.SERVICE_UNAVAILABLE,
+                "llm_overloaded",
+                data={"estimated_wait_seconds": round(estimate, 1)},
+                headers={"Retry-After": str(max(1, math.ceil(estimate)))},
+            )
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(key, deque()).append(future)
+        self._set_depth(priority, +1)
+        enqueued = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before cancellation: hand it on.
+                self._release()
+            else:
+                self._discard(priority, key, future)
+            raise
+        QUEUE_WAIT.labels(priority=label).observe(time.perf_counter() - enqueued)
+
+    def _release(self) -> None:
+        self._active -= 1
+        while self._active < self.max_concurrency:
+            future = self._next_waiter()
+            if future is None:
+                break
+            self._active += 1
+            future.set_result(None)
+        INFLIGHT.set(self._active)
+
+    def _next_waiter(self) -> asyncio.Future | None:
+        for priority in Priority:
+            queues = self._queues[priority]
+            while queues:
+                key, waiters = next(iter(queues.items()))
+                future = waiters.popleft()
+                if waiters:
+                    queues.move_to_end(key)  # round robin across keys
+                else:
+                    del queues[key]
+                self._set_depth(priority, -1)
+                if not future.done():
+                    return future
+        return None
+
+    def _discard(self, priority: Priority, key: str, future: asyncio.Future) -> None:
+        waiters = self._queues[priority].get(key)
+        if not waiters or future not in waiters:
+            return
+        waiters.remove(future)
+        if not waiters:
+            del self._queues[priority][key]
+        self._set_depth(priority, -1)
+
+    def _set_depth(self, priority: Priority, delta: int) -> None:
+        self._depth[priority] += delta
+        QUEUE_DEPTH.labels(priority=priority.name.lower()).set(self._depth[priority])
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    wait_budgets={
+        Priority.INTERACTIVE: LLM_INTERACTIVE_WAIT_BUDGET_SECONDS,
+        Priority.BACKGROUND: LLM_BACKGROUND_WAIT_BUDGET_SECONDS,
+    },
+    initial_service_time=LLM_SERVICE_TIME_SECONDS,
+)
+
+
+__all__ = ["LLMScheduler", "Priority", "llm_scheduler"]
@@ -0,0 +1,231 @@
+"""Per-call LLM telemetry.
+
+Every model call records model, token usage, upstream latency, SDK retries,
+cache outcome and the ``X-Request-Id`` of the request that caused it. Calls
+happen on scheduler threads, so :meth:`LLMTelemetry.record` only appends to a
+locked in-memory buffer; a background task flushes the buffer to
+``llm_calls`` in one multi-row INSERT. Aggregates live in the
+``llm_call_stats_hourly`` view and in Prometheus counters.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config.config import (
+    LLM_TELEMETRY_BATCH_SIZE,
+    LLM_TELEMETRY_BUFFER_MAX,
+    LLM_TELEMETRY_ENABLED,
+    LLM_TELEMETRY_FLUSH_SECONDS,
+)
+from app.core.db import db as db_module
+from app.core.metrics.metrics import counter, histogram
+from app.middleware.request_id import current_request_id
+from app.models.telemetry import LLMCall
+
+logger = logging.getLogger(__name__)
+
+LLM_CALLS = counter(
+    "llm_calls_total", "LLM calls by outcome", ["operation", "status", "cache"]
+)
+LLM_TOKENS = counter("llm_tokens_total", "LLM tokens used", ["operation", "kind"])
+LLM_LATENCY = histogram(
+    "llm_upstream_seconds", "Upstream LLM latency (cache misses only)", ["operation"]
+)
+TELEMETRY_DROPPED = counter(
+    "llm_telemetry_dropped_total", "Telemetry rows dropped (buffer full or rejected by the database)"
+)
+
+# X-Request-Id 来自客户端，不做长度校验；按列宽截断，避免一行超长拖垮整批 INSERT
+_REQUEST_ID_MAX = LLMCall.__table__.c.request_id.type.length
+
+
+@dataclass(slots=True)
+class LLMCallRecord:
+    operation: str
+    status: str
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: int = 0
+    retries: int = 0
+    cache_hit: bool = False
+    request_id: Optional[str] = None
+
+
+def _clip(value: Optional[str], length: int) -> Optional[str]:
+    return value[:length] if value else value
+
+
+def usage_tokens(response: Any) -> tuple[int, int]:
+    """``(prompt, completion)`` tokens from an SDK response; zeros when absent."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0
+    return int(getattr(usage, "prompt_tokens", 0) or 0), int(getattr(usage, "completion_tokens", 0) or 0)
+
+
+class LLMTelemetry:
+    """Thread-safe buffer + periodic batch writer for :class:`LLMCall` rows."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        flush_interval: float = 5.0,
+        batch_size: int = 500,
+        max_buffer: int = 10000,
+    ) -> None:
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self._buffer: deque[LLMCallRecord] = deque()
+        self._max_buffer = max(1, max_buffer)
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def record(
+        self,
+        operation: str,
+        *,
+        status: str = "ok",
+        model: Optional[str] = None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        latency_ms: int = 0,
+        retries: int = 0,
+        cache_hit: bool = False,
+    ) -> LLMCallRecord:
+        """Buffer one call; cheap enough to run on the request path or a worker thread."""
+        rec = LLMCallRecord(
+            operation=operation,
+            status=status,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency_ms=latency_ms,
+            retries=retries,
+            cache_hit=cache_hit,
+            request_id=_clip(current_request_id(), _REQUEST_ID_MAX),
+        )
+        cache = "hit" if cache_hit else "miss"
+        LLM_CALLS.labels(operation=operation, status=status, cache=cache).inc()
+        if prompt_tokens:
+            LLM_TOKENS.labels(operation=operation, kind="prompt").inc(prompt_tokens)
+        if completion_tokens:
+            LLM_TOKENS.labels(operation=operation, kind="completion").inc(completion_tokens)
+        if not cache_hit and status != "circuit_open":
+            LLM_LATENCY.labels(operation=operation).observe(latency_ms / 1000)
+
+        if self.enabled:
+            with self._lock:
+                if len(self._buffer) >= self._max_buffer:
+                    # 数据库写不进去时保护内存：丢最旧的
+                    self._buffer.popleft()
+                    TELEMETRY_DROPPED.inc()
+                self._buffer.append(rec)
+        return rec
+
+    def _take(self) -> list[LLMCallRecord]:
+        with self._lock:
+            n = min(len(self._buffer), self.batch_size)
+            return [self._buffer.popleft() for _ in range(n)]
+
+    def _requeue(self, batch: list[LLMCallRecord]) -> None:
+        with self._lock:
+            room = self._max_buffer - len(self._buffer)
+            if room < len(batch):
+                TELEMETRY_DROPPED.inc(len(batch) - max(room, 0))
+                batch = batch[len(batch) - max(room, 0):]
+            self._buffer.extendleft(reversed(batch))
+
+    async def flush(self) -> int:
+        """Write buffered rows in batches; returns the number written."""
+        written = 0
+        while True:
+            batch = self._take()
+            if not batch:
+                return written
+            try:
+                await self._insert(batch)
+            except (DataError, IntegrityError) as exc:
+                # 批里有坏行：逐行重写，只丢被拒的行
+                logger.warning("llm telemetry batch rejected, retrying row by row: %s", exc)
+                ok, kept = await self._insert_rows(batch)
+                written += ok
+                if kept:
+                    return written
+                continue
+            except Exception as exc:
+                # 数据库不可用：放回缓冲区，下个周期重试
+                self._requeue(batch)
+                logger.warning("llm telemetry flush failed (%d rows kept): %s", len(batch), exc)
+                return written
+            written += len(batch)
+
+    async def _insert(self, rows: list[LLMCallRecord]) -> None:
+        async with db_module.AsyncSessionLocal() as db:
+            await db.execute(insert(LLMCall), [asdict(rec) for rec in rows])
+            await db.commit()
+
+    async def _insert_rows(self, batch: list[LLMCallRecord]) -> tuple[int, int]:
+        """
+        逐行写入；被数据库拒绝的行计入 dropped 丢弃
+
+        Returns:
+            (写入行数, 因数据库不可用放回缓冲区的行数)
+        """
+        written = 0
+        for i, rec in enumerate(batch):
+            try:
+                await self._insert([rec])
+            except (DataError, IntegrityError) as exc:
+                TELEMETRY_DROPPED.inc()
+                logger.warning("llm telemetry row dropped (%s): %s", rec.operation, exc)
+                continue
+            except Exception as exc:
+                rest = batch[i:]
+                self._requeue(rest)
+                logger.warning("llm telemetry flush failed (%d rows kept): %s", len(rest), exc)
+                return written, len(rest)
+            written += 1
+        return written, 0
+
+    async def start(self) -> None:
+        if self._task is None and self.enabled:
+            self._task = asyncio.create_task(self._flush_loop(), name="llm-telemetry-flush")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self.enabled:
+            await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("llm telemetry flush loop error")
+
+
+llm_telemetry = LLMTelemetry(
+    enabled=LLM_TELEMETRY_ENABLED,
+    flush_interval=LLM_TELEMETRY_FLUSH_SECONDS,
+    batch_size=LLM_TELEMETRY_BATCH_SIZE,
+    max_buffer=LLM_TELEMETRY_BUFFER_MAX,
+)
@@ -13,10 +13,11 @@ import asyncio
 import logging
 from typing import Optional, List, Dict
 from uuid import UUID
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config.config import ASSESSMENT_ARCHIVE_RETENTION_DAYS, SHORT_ANSWER_AUTO_GRADE
 from app.core.exceptions.exceptions import BizError, BizCode
 from app.schemas.assessment import (
     AssessmentStartIn,
@@ -25,7 +26,10 @@ from app.schemas.assessment import (
     AssessmentProgress,
     AnswerSaveIn,
     AnswerSaveOut,
+    AnswerBatchSaveIn,
+    AnswerBatchSaveOut,
     AssessmentSubmitOut,
+    AssessmentFeedbackOut,
     AssessmentHistoryOut,
     AssessmentHistoryItem,
     AssessmentDetailOut,
@@ -37,10 +41,16 @@ from app.schemas.assessment import (
     TopicBreakdown,
     AIRecommendation,
     format_answer_for_storage,
-    normalize_single_choice_answer,
-    normalize_multi_choice_answer,
     build_pagination_meta,
+    decode_history_cursor,
+    encode_history_cursor,
 )
+from app.services import grading
+from app.services.answer_drafts import DraftSaveRejected, answer_drafts
+from app.services.assessment_detail_cache import CachedDetail, detail_cache
+from app.services.assessment_feedback import feedback_worker
+from app.services.llm.breaker import CircuitOpenError, llm_breaker
+from app.services.llm.scheduler import Priority, llm_scheduler
 from app.services.old.gpt_call import generate_assessment_feedback
 
 logger = logging.getLogger(__name__)
@@ -50,6 +60,9 @@ from app.repositories import questions as questions_repo
 from app.repositories import assessment_sessions as sessions_repo
 from app.repositories import assessment_items as items_repo
 from app.repositories import assessment_responses as responses_repo
+from app.repositories import item_stats as stats_repo
+from app.repositories import assessment_archive as archive_repo
+from app.repositories.question_pool import question_topic_map
 
 
 class AssessmentService:
@@ -119,6 +132,9 @@ class AssessmentService:
                     self.db, session_id=existing.id
                 )
                 last_index = existing.last_question_index or answered
+                drafts = await self._draft_progress(existing.id)
+                if drafts is not None:
+                    answered, last_index = drafts.answered, drafts.last_question_index
 
                 logger.info(
                     "Resuming unfinished global assessment session %s for user %s",
@@ -136,20 +152,15 @@ class AssessmentService:
                     session=existing, items=existing_items, progress=progress
                 )
 
+            # 没有题目的残留会话不在请求内删除，留给后台清理（session_sweeper）
             logger.warning(
-                "Found unfinished global assessment session %s without items; removing stale session",
+                "Found unfinished global assessment session %s without items; starting a new one",
                 existing.id,
             )
-            await self.db.delete(existing)
-            await self.db.flush()
 
         difficulty = config.difficulty if config else "mixed"
         count = requested_count
 
-        session = await sessions_repo.create_session(
-            self.db, user_id=user_id, kind="global", last_question_index=0
-        )
-
         questions = await self._select_questions_for_global(
             difficulty=difficulty, count=count
         )
@@ -166,14 +177,46 @@ class AssessmentService:
                 },
             )
 
+        session = await sessions_repo.create_session(
+            self.db,
+            user_id=user_id,
+            kind="global",
+            last_question_index=0,
+            question_count=len(questions),
+        )
+
+        # 判分键在建快照时编译一次，提交时不再回查题库
         items = await items_repo.create_items_batch(
-            self.db, session_id=session.id, questions=questions
+            self.db,
+            session_id=session.id,
+            questions=questions,
+            grading_keys={q.id: grading.compile_question(q).to_snapshot() for q in questions},
         )
 
         await self.db.commit()
 
+        if answer_drafts.available:
+            try:
+                await answer_drafts.prime(
+                    session.id,
+                    user_id=user_id,
+                    items=[(item.id, item.question_snapshot.get("qtype")) for item in items],
+                )
+            except Exception as exc:  # 首次保存时会再载入
+                logger.warning("answer draft prime failed for session %s: %s", session.id, exc)
+
         return self._build_start_out(session=session, items=items)
 
+    async def _draft_progress(self, session_id: UUID):
+        """Redis 草稿中的进度（未启用或未载入时返回 None）"""
+        if not answer_drafts.available:
+            return None
+        try:
+            return await answer_drafts.progress(session_id)
+        except Exception as exc:
+            logger.warning("answer draft progress failed for session %s: %s", session_id, exc)
+            return None
+
     async def _select_questions_for_global(self, difficulty: str, count: int) -> List:
         """
         为整体评测选题
@@ -248,8 +291,9 @@ class AssessmentService:
         1. 验证会话归属（session.user_id == current_user.id）
         2. 查询 assessment_items 确认 item_id 属于该会话
         3. 写入/更新 assessment_responses(answer)
-        4. 客观题可实时计算 is_correct（但不影响总分）
-        5. 更新 assessment_sessions.last_question_index
+        4. 更新 assessment_sessions.last_question_index
+
+        与批量保存（save_answers）共用同一路径，单题即只有一条的批次。
 
         Args:
             session_id: 会话ID
@@ -272,63 +316,186 @@ class AssessmentService:
             ...     payload=AnswerSaveIn(item_id=item_id, answer="B")
             ... )
         """
-        # 1. 验证会话归属
+        progress = await self._save_answers(
+            session_id=session_id,
+            user_id=user_id,
+            answers={payload.item_id: payload.answer},
+            last_question_index=payload.last_question_index,
+        )
+        return AnswerSaveOut(saved=True, progress=progress)
+
+    async def save_answers(
+        self, *, session_id: UUID, user_id: UUID, payload: AnswerBatchSaveIn
+    ) -> AnswerBatchSaveOut:
+        """
+        批量保存答案（离线/重连后补传）
+
+        所有题目一次校验归属、一次写入；任一题不属于该会话则整批不写。
+
+        Args:
+            session_id: 会话ID
+            user_id: 用户ID（权限校验）
+            payload: AnswerBatchSaveIn 对象
+
+        Returns:
+            AnswerBatchSaveOut 对象（写入题数 + 最新进度）
+
+        Raises:
+            BizError(403): 无权访问他人会话
+            BizError(404): 有题目不属于该会话
+            BizError(409): 会话已提交
+
+        Example:
+            >>> result = await assessment_service.save_answers(
+            ...     session_id=session_id,
+            ...     user_id=user_id,
+            ...     payload=AnswerBatchSaveIn(answers=[
+            ...         AnswerSaveIn(item_id=item_a, answer="B"),
+            ...         AnswerSaveIn(item_id=item_b, answer="A,C", last_question_index=5),
+            ...     ]),
+            ... )
+        """
+        answers = payload.answer_map()
+        progress = await self._save_answers(
+            session_id=session_id,
+            user_id=user_id,
+            answers=answers,
+            last_question_index=payload.last_question_index(),
+        )
+        return AnswerBatchSaveOut(saved=len(answers), progress=progress)
+
+    async def _save_answers(
+        self,
+        *,
+        session_id: UUID,
+        user_id: UUID,
+        answers: Dict[UUID, str],
+        last_question_index: Optional[int],
+    ) -> AssessmentProgress:
+        """单题/批量保存的唯一路径：优先写 Redis 草稿，不可用时直接写库"""
+        # 草稿模式：一次 Redis 往返（Lua 内完成归属/状态/题目校验），提交或定时批量落库
+        if answer_drafts.available:
+            try:
+                return await self._save_answers_draft(
+                    session_id=session_id,
+                    user_id=user_id,
+                    answers=answers,
+                    last_question_index=last_question_index,
+                )
+            except DraftSaveRejected as exc:
+                raise self._draft_rejection(exc.reason) from exc
+            except BizError:
+                raise
+            except Exception as exc:  # Redis 不可用：退回直接写库
+                logger.warning("answer draft save failed, writing through: %s", exc)
+
+        return await self._save_answers_db(
+            session_id=session_id,
+            user_id=user_id,
+            answers=answers,
+            last_question_index=last_question_index,
+        )
+
+    @staticmethod
+    def _draft_rejection(reason: str) -> BizError:
+        if reason == "submitted":
+            return BizError(409, BizCode.ALREADY_DONE, "assessment_already_submitted")
+        if reason == "item_not_found":
+            return BizError(404, BizCode.NOT_FOUND, "item_not_found")
+        return BizError(403, BizCode.FORBIDDEN, "forbidden")
+
+    async def _save_answers_draft(
+        self,
+        *,
+        session_id: UUID,
+        user_id: UUID,
+        answers: Dict[UUID, str],
+        last_question_index: Optional[int],
+    ) -> AssessmentProgress:
+        """写 Redis 草稿；会话尚未载入 Redis 时先从数据库载入再重试一次"""
+        draft = dict(user_id=user_id, answers=answers, last_question_index=last_question_index)
+        result = await answer_drafts.save(session_id, **draft)
+        if result is None:
+            await self._prime_drafts(session_id=session_id, user_id=user_id)
+            result = await answer_drafts.save(session_id, **draft)
+        if result is None:
+            raise RuntimeError("answer drafts not primed")
+        return AssessmentProgress(
+            total=result.total,
+            answered=result.answered,
+            last_question_index=result.last_question_index,
+        )
+
+    async def _prime_drafts(self, *, session_id: UUID, user_id: UUID) -> None:
+        """把会话归属、题目列表和已保存答案载入 Redis（会话开始时或首次保存时）"""
+        session = await self._get_open_session(session_id=session_id, user_id=user_id)
+
+        items = await items_repo.get_session_items(self.db, session_id, order_by_no=False)
+        responses = await responses_repo.get_session_responses(self.db, session_id)
+        await answer_drafts.prime(
+            session_id,
+            user_id=user_id,
+            items=[(item.id, item.question_snapshot.get("qtype")) for item in items],
+            answers={resp.item_id: resp.answer for resp in responses},
+            last_question_index=session.last_question_index or 0,
+        )
+
+    async def _get_open_session(self, *, session_id: UUID, user_id: UUID):
+        """校验会话归属且尚未提交"""
         session = await sessions_repo.get_user_session(
             self.db, session_id=session_id, user_id=user_id
         )
-
         if not session:
             raise BizError(403, BizCode.FORBIDDEN, "forbidden")
-
-        # 2. 检查会话是否已提交
         if session.submitted_at:
             raise BizError(409, BizCode.ALREADY_DONE, "assessment_already_submitted")
+        return session
 
-        # 3. 验证 item_id 属于该会话
-        item = await items_repo.get_item_by_id(self.db, payload.item_id)
-
-        if not item or item.session_id != session_id:
+    async def _save_answers_db(
+        self,
+        *,
+        session_id: UUID,
+        user_id: UUID,
+        answers: Dict[UUID, str],
+        last_question_index: Optional[int],
+    ) -> AssessmentProgress:
+        """直接写库（未启用草稿或 Redis 不可用时）：一次归属校验 + 一条多行 upsert"""
+        session = await self._get_open_session(session_id=session_id, user_id=user_id)
+
+        # 一次查询校验所有 item 属于该会话，并取出题型用于答案标准化
+        qtypes = await items_repo.get_session_item_qtypes(self.db, session_id, list(answers))
+        if len(qtypes) != len(answers):
             raise BizError(404, BizCode.NOT_FOUND, "item_not_found")
 
-        # 4. Upsert 答题记录（创建或更新）
-        # TODO: 可选实时判分（需要查询 question 的 answer_key）
-        snapshot = item.question_snapshot or {}
-        qtype = snapshot.get("qtype")
-        stored_answer = (
-            format_answer_for_storage(payload.answer, qtype)
-            if qtype
-            else payload.answer
-        )
-
-        await responses_repo.upsert_response(
+        await responses_repo.upsert_answers_bulk(
             self.db,
             session_id=session_id,
-            item_id=payload.item_id,
-            answer=stored_answer,
+            answers={
+                item_id: format_answer_for_storage(answer, qtypes[item_id])
+                if qtypes[item_id]
+                else answer
+                for item_id, answer in answers.items()
+            },
         )
 
-        # 5. 更新 last_question_index（可选）
-        if payload.last_question_index is not None:
+        if last_question_index is not None:
             await sessions_repo.update_last_question_index(
                 self.db,
                 session_id=session_id,
-                last_question_index=payload.last_question_index,
+                last_question_index=last_question_index,
             )
 
         await self.db.commit()
 
-        # 6. 查询当前进度
         answered = await responses_repo.count_session_responses(self.db, session_id)
-        total = await items_repo.count_session_items(self.db, session_id)
+        total = session.question_count or await items_repo.count_session_items(self.db, session_id)
 
-        progress = AssessmentProgress(
+        return AssessmentProgress(
             total=total,
             answered=answered,
-            last_question_index=payload.last_question_index or 0,
+            last_question_index=last_question_index or 0,
         )
 
-        return AnswerSaveOut(saved=True, progress=progress)
-
     # ========================================
     # 三、提交整体评测（汇总评分+AI总结）
     # ========================================
@@ -346,7 +513,7 @@ class AssessmentService:
         4. 更新 assessment_sessions:
            - submitted_at = NOW()
            - total_score
-           - ai_summary, ai_recommendation（可异步生成）
+           - ai_summary, ai_recommendation（先写兜底文案，后台异步生成）
         5. 分项得分：按 question_topics 分组统计
 
         Args:
@@ -382,6 +549,35 @@ class AssessmentService:
         if session.submitted_at:
             raise BizError(409, BizCode.ALREADY_DONE, "assessment_already_submitted")
 
+        # 先关闭草稿写入，再把全部草稿一次性批量写入（含后台 flusher 正在落库的部分）
+        drafts_taken = False
+        if answer_drafts.available:
+            try:
+                await answer_drafts.set_submitted(session_id, True)
+                drafts_taken = True
+                await answer_drafts.flush(self.db, session_id, full=True)
+            except Exception as exc:
+                logger.warning("answer draft flush failed for session %s: %s", session_id, exc)
+                await self._reopen_drafts(session_id)
+                raise BizError(500, BizCode.INTERNAL_ERROR, "answer_flush_failed") from exc
+
+        try:
+            return await self._finalize(session_id=session_id, user_id=user_id, force=force)
+        except Exception:
+            if drafts_taken:
+                await self._reopen_drafts(session_id)
+            raise
+
+    async def _reopen_drafts(self, session_id: UUID) -> None:
+        """提交失败：事务已回滚，草稿重新标记为待落库并恢复可写"""
+        try:
+            await answer_drafts.reopen(session_id)
+        except Exception as exc:
+            logger.warning("answer draft reopen failed for session %s: %s", session_id, exc)
+
+    async def _finalize(
+        self, *, session_id: UUID, user_id: UUID, force: bool
+    ) -> AssessmentSubmitOut:
         # 3. 检查是否所有题目都已答
         total_items = await items_repo.count_session_items(self.db, session_id)
         is_complete, answered = await responses_repo.check_all_items_answered(
@@ -422,22 +618,47 @@ class AssessmentService:
                     "score": result["score"],
                 }
 
-        if item_scores:
-            await responses_repo.batch_update_scores(self.db, item_scores)
+        # 判分写回与总分汇总在同一条语句中完成（PostgreSQL）
+        totals = await responses_repo.apply_scores_and_totals(
+            self.db, session_id=session_id, item_scores=item_scores
+        )
+
+        # 题目 → 主题（进程内缓存），分主题得分与主题统计共用
+        topic_map = await question_topic_map.get(
+            self.db, filter(None, (self._question_id(item) for item in items))
+        )
 
-        # 5. 计算总分
-        total_score = await responses_repo.calculate_session_total_score(
-            self.db, session_id
+        # 题目/主题统计与判分同一事务累加
+        await stats_repo.record_graded(
+            self.db,
+            [
+                stats_repo.graded_answer(
+                    item.question_snapshot,
+                    responses_map[item.id].answer,
+                    result["is_correct"],
+                    result["score"],
+                )
+                for item, result in zip(items, grading_results)
+                if item.id in responses_map
+            ],
+            question_topics={
+                qid: [topic_id for topic_id, _ in refs] for qid, refs in topic_map.items()
+            },
         )
+
+        # 5. 计算总分
+        total_score = totals.total_score
         total_score_percent = (total_score / len(items)) * 100 if items else 0.0
 
         # 6. 生成分项得分（按主题统计）
         breakdown = await self._calculate_breakdown(
-            session_id=session_id, items=items, responses_map=responses_map
+            items=items,
+            scores={r["item_id"]: (r["is_correct"], r["score"]) for r in grading_results},
+            topic_map=topic_map,
         )
 
-        # 7. 生成 AI 总结和建议（可异步）
-        ai_summary, ai_recommendation = await self._generate_ai_content(
+        # 7. 先写入兜底总结，AI 反馈交给后台任务生成（ai_status=pending）
+        ai_summary, ai_recommendation = self._build_ai_content(
             total_score=total_score_percent, breakdown=breakdown
         )
 
@@ -448,9 +669,18 @@ class AssessmentService:
             total_score=total_score_percent,
             ai_summary=ai_summary,
             ai_recommendation=ai_recommendation,
+            ai_status="pending",
         )
 
         await self.db.commit()
+        # 详情在入队前缓存：AI 反馈写回时 worker 负责失效，不会被这里覆盖
+        await self._cache_detail(session_id=session_id, user_id=user_id)
+        feedback_worker.enqueue(session_id)
+        if answer_drafts.available:
+            try:
+                await answer_drafts.discard(session_id)
+            except Exception as exc:  # TTL 兜底清理
+                logger.warning("answer draft discard failed for session %s: %s", session_id, exc)
 
         # 9. 构建响应
         return AssessmentSubmitOut(
@@ -459,6 +689,7 @@ class AssessmentService:
             breakdown=breakdown,
             ai_summary=ai_summary,
             ai_recommendation=ai_recommendation,
+            ai_status="pending",
             submitted_at=datetime.now(timezone.utc),
         )
 
@@ -466,7 +697,9 @@ class AssessmentService:
         self, *, items: List, responses_map: dict
     ) -> List[dict]:
         """
-        判分所有答题记录
+        判分所有答题记录（一次遍历）
+
+        判分键读快照中预编译的 grading 字段；旧快照没有该字段时才回查题库。
 
         Args:
             items: 题目实例列表
@@ -475,88 +708,48 @@ class AssessmentService:
         Returns:
             判分结果列表
         """
-        results = []
-
-        item_question_map: Dict[UUID, UUID] = {}
-        question_ids: List[UUID] = []
-
+        # 旧快照（无 grading 字段）：批量回查题目再编译
+        legacy_qids: Dict[UUID, UUID] = {}
         for item in items:
             snapshot = item.question_snapshot or {}
-            raw_qid = snapshot.get("question_id")
-            if not raw_qid:
+            if grading.GRADING_KEY in snapshot or item.id not in responses_map:
                 continue
             try:
-                qid = UUID(str(raw_qid))
+                legacy_qids[item.id] = UUID(str(snapshot.get("question_id")))
             except ValueError:
                 continue
-            item_question_map[item.id] = qid
-            question_ids.append(qid)
 
         question_map = {}
-        if question_ids:
-            unique_ids = list(dict.fromkeys(question_ids))
+        if legacy_qids:
+            unique_ids = list(dict.fromkeys(legacy_qids.values()))
             question_map = await questions_repo.get_questions_by_ids(self.db, unique_ids)
 
+        entries = []
         for item in items:
             response = responses_map.get(item.id)
-
-            if not response:
-                # 未答题，跳过
-                results.append(
-                    {
-                        "item_id": item.id,
-                        "order_no": item.order_no,
-                        "is_correct": None,
-                        "score": 0.0,
-                    }
-                )
-                continue
-
-            # 如果已判分，跳过
-            if response.is_correct is not None:
-                results.append(
-                    {
-                        "item_id": item.id,
-                        "order_no": item.order_no,
-                        "is_correct": response.is_correct,
-                        "score": float(response.score or 0.0),
-                    }
-                )
+            # 未答题、或已判分的记录不再重判
+            if not response or response.is_correct is not None:
                 continue
+            key = grading.key_from_snapshot(
+                item.question_snapshot, question_map.get(legacy_qids.get(item.id))
+            )
+            entries.append((item.id, key, (response.answer or "").strip()))
 
-            question = question_map.get(item_question_map.get(item.id))
-            is_correct = None
-            score = 0.0
-
-            if question:
-                user_answer = (response.answer or "").strip()
-                correct_answer = questions_repo.extract_correct_answer(question)
-
-                if question.qtype == "single":
-                    if correct_answer:
-                        correct = normalize_single_choice_answer(correct_answer)
-                        user = normalize_single_choice_answer(user_answer) if user_answer else ""
-                        if user:
-                            is_correct = user == correct
-                            score = 1.0 if is_correct else 0.0
-
-                elif question.qtype == "multi":
-                    if correct_answer:
-                        correct = normalize_multi_choice_answer(correct_answer)
-                        user = (
-                            normalize_multi_choice_answer(user_answer)
-                            if user_answer
-                            else ""
-                        )
-                        if user:
-                            is_correct = user == correct
-                            score = 1.0 if is_correct else 0.0
-
-                else:
-                    # 主观题暂不自动判分，沿用已有成绩（若有）
-                    is_correct = response.is_correct
-                    score = float(response.score or 0.0)
+        # 简答题是否自动判分由 SHORT_ANSWER_AUTO_GRADE 控制（默认留空待人工）
+        graded = grading.grade_session(entries, grade_short=SHORT_ANSWER_AUTO_GRADE).results
 
+        results = []
+        for item in items:
+            response = responses_map.get(item.id)
+            result = graded.get(item.id)
+            if result is not None and result.is_correct is not None:
+                is_correct, score = result.is_correct, result.score
+            elif response is not None:
+                # 已判分 / 不可自动判分（如无参考答案的简答题）：沿用已有成绩
+                is_correct = response.is_correct
+                score = float(response.score or 0.0)
+            else:
+                is_correct, score = None, 0.0
             results.append(
                 {
                     "item_id": item.id,
@@ -568,33 +761,75 @@ class AssessmentService:
 
         return results
 
+    @staticmethod
+    def _question_id(item) -> Optional[UUID]:
+        question_id = (item.question_snapshot or {}).get("question_id")
+        try:
+            return UUID(str(question_id)) if question_id else None
+        except ValueError:
+            return None
+
     async def _calculate_breakdown(
-        self, *, session_id: UUID, items: List, responses_map: dict
+        self,
+        *,
+        items: List,
+        scores: Dict[UUID, tuple],
+        topic_map: Optional[Dict[UUID, tuple]] = None,
     ) -> List[TopicBreakdown]:
         """
-        计算分主题得分
+        计算分主题得分（内存汇总，不随主题数增加查询）
 
         Args:
-            session_id: 会话ID
             items: 题目实例列表
-            responses_map: {item_id: response} 映射
+            scores: {item_id: (is_correct, score)}，未答题可缺省（按 0 分计）
+            topic_map: {question_id: ((topic_id, topic_name), ...)}；
+                不传则取 question_topic_map 缓存（未命中的题目一次查询补齐）
 
         Returns:
-            分主题得分列表
+            分主题得分列表（按主题名排序）
 
         Note:
-            需要从 question_topics 查询每题的主题归属
+            一题属于多个主题时计入每个主题
         """
-        # TODO: 实现分主题统计
-        # 1. 从 items 提取 question_id 列表
-        # 2. 查询 question_topics 获取主题归属
-        # 3. 按主题分组统计得分
+        question_ids = {item.id: self._question_id(item) for item in items}
+        if topic_map is None:
+            topic_map = await question_topic_map.get(
+                self.db, filter(None, question_ids.values())
+            )
+
+        # topic_id -> [topic_name, correct, total, score_sum]
+        totals: Dict[UUID, list] = {}
+        for item in items:
+            is_correct, score = scores.get(item.id, (None, 0.0))
+            for topic_id, topic_name in topic_map.get(question_ids[item.id], ()):
+                entry = totals.setdefault(topic_id, [topic_name, 0, 0, 0.0])
+                entry[1] += 1 if is_correct else 0
+                entry[2] += 1
+                entry[3] += float(score or 0.0)
+
+        breakdown = [
+            TopicBreakdown(
+                topic_id=topic_id,
+                topic_name=name,
+                score=round(min(100.0, score_sum / total * 100), 2),
+                correct=correct,
+                total=total,
+            )
+            for topic_id, (name, correct, total, score_sum) in totals.items()
+        ]
+        return sorted(breakdown, key=lambda b: b.topic_name)
 
-        # 暂时返回空列表
-        return []
+    _FALLBACK_ACTIONS = [
+        "Review topics with lower scores.",
+        "Schedule additional practice sessions.",
+    ]
 
     async def _generate_ai_content(
-        self, *, total_score: float, breakdown: List[TopicBreakdown]
+        self,
+        *,
+        total_score: float,
+        breakdown: List[TopicBreakdown],
+        user_id: Optional[UUID] = None,
     ) -> tuple[Optional[str], Optional[dict]]:
         """
         生成 AI 总结和建议
@@ -602,37 +837,58 @@ class AssessmentService:
         Args:
             total_score: 总分（百分制）
             breakdown: 分主题得分
+            user_id: 用户ID（LLM 调度的公平性分组键）
 
         Returns:
             (ai_summary, ai_recommendation) 元组
 
+        Raises:
+            CircuitOpenError / LLMTimeoutError / APIError: 模型调用失败
+            BizError(503): 调度器过载拒绝
+
         Note:
-            可以异步生成，先返回基础结果，后台更新
+            会调用模型，只应在后台任务中使用（见 generate_session_feedback）；
+            同步提交路径用 _build_ai_content 的兜底文案
         """
-        loop = asyncio.get_running_loop()
         breakdown_payload = [item.model_dump() for item in breakdown]
 
-        fallback_summary = f"Your overall score is {total_score:.1f}. Keep refining weaker areas."
-        fallback_actions = [
-            "Review topics with lower scores.",
-            "Schedule additional practice sessions.",
-        ]
+        # 失败不降级为兜底文案：异常交给后台任务，保持 pending 按次数重试
+        summary, actions = await llm_scheduler.run(
+            generate_assessment_feedback,
+            float(total_score),
+            breakdown_payload,
+            priority=Priority.BACKGROUND,
+            key=str(user_id) if user_id else None,
+        )
 
-        try:
-            summary, actions = await loop.run_in_executor(
-                None,
-                generate_assessment_feedback,
-                float(total_score),
-                breakdown_payload,
-            )
-        except Exception as exc:
-            logger.warning("Failed to generate AI feedback: %s", exc)
-            summary, actions = fallback_summary, fallback_actions
+        return self._build_ai_content(
+            total_score=total_score, breakdown=breakdown, summary=summary, actions=actions
+        )
+
+    def _build_ai_content(
+        self,
+        *,
+        total_score: float,
+        breakdown: List[TopicBreakdown],
+        summary: Optional[str] = None,
+        actions: Optional[List[str]] = None,
+    ) -> tuple[str, dict]:
+        """
+        组装 AI 总结和建议；summary/actions 缺失时使用兜底文案
 
+        Args:
+            total_score: 总分（百分制）
+            breakdown: 分主题得分
+            summary: 模型生成的总结
+            actions: 模型生成的建议动作
+
+        Returns:
+            (ai_summary, ai_recommendation) 元组
+        """
         if not summary:
-            summary = fallback_summary
+            summary = f"Your overall score is {total_score:.1f}. Keep refining weaker areas."
         if not actions:
-            actions = fallback_actions
+            actions = list(self._FALLBACK_ACTIONS)
 
         level = (
             "beginner"
@@ -640,9 +896,7 @@ class AssessmentService:
             else "intermediate" if total_score < 80 else "advanced"
         )
 
-        focus_topics = [
-            item.topic_name for item in breakdown if item.score < 80
-        ]
+        focus_topics = [item.topic_id for item in breakdown if item.score < 80]
 
         ai_recommendation = AIRecommendation(
             level=level,
@@ -650,57 +904,253 @@ class AssessmentService:
             suggested_actions=actions,
         )
 
-        return summary, ai_recommendation.model_dump()
+        # JSONB 列：UUID 等需先转成 JSON 基本类型
+        return summary, ai_recommendation.model_dump(mode="json")
+
+    async def generate_session_feedback(self, *, session_id: UUID) -> bool:
+        """
+        为已提交的会话生成 AI 总结和建议（后台任务调用，不提交事务）
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            True 表示已写入 ai_status='ready'
+
+        Raises:
+            CircuitOpenError: LLM 熔断中（任务保持 pending，稍后重试）
+            LLMTimeoutError / APIError / BizError(503): 同上，由后台任务计入重试次数
+
+        Example:
+            >>> await AssessmentService(db).generate_session_feedback(session_id=sid)
+            >>> await db.commit()
+        """
+        session = await sessions_repo.get_session_by_id(self.db, session_id)
+        if not session or not session.submitted_at:
+            return False
+
+        # 熔断期间不生成兜底内容，保持 pending 由后台稍后重试
+        if not llm_breaker.allows_request():
+            raise CircuitOpenError(llm_breaker.name, llm_breaker.retry_after())
+
+        items = await items_repo.get_session_items(self.db, session_id)
+        responses = await responses_repo.get_session_responses(self.db, session_id)
+
+        breakdown = await self._calculate_breakdown(
+            items=items,
+            scores={
+                resp.item_id: (resp.is_correct, float(resp.score or 0.0)) for resp in responses
+            },
+        )
+        total_score = float(session.total_score or 0.0)
+
+        ai_summary, ai_recommendation = await self._generate_ai_content(
+            total_score=total_score, breakdown=breakdown, user_id=session.user_id
+        )
+
+        updated = await sessions_repo.update_ai_content(
+            self.db,
+            session_id,
+            ai_summary=ai_summary,
+            ai_recommendation=ai_recommendation,
+            ai_status="ready",
+        )
+        return updated > 0
+
+    async def get_feedback(
+        self, *, session_id: UUID, user_id: UUID, wait_seconds: float = 0
+    ) -> AssessmentFeedbackOut:
+        """
+        查询评测的 AI 反馈（支持长轮询）
+
+        Args:
+            session_id: 会话ID
+            user_id: 用户ID（权限校验）
+            wait_seconds: ai_status 为 pending 时最多等待的秒数
+
+        Returns:
+            AssessmentFeedbackOut 对象
+
+        Raises:
+            BizError(403): 无权访问他人会话
+            BizError(404): 会话未提交
+
+        Example:
+            >>> result = await assessment_service.get_feedback(
+            ...     session_id=session_id, user_id=user_id, wait_seconds=10
+            ... )
+        """
+        # 先登记等待者再读取状态：读取之后才完成的任务也会唤醒本次请求
+        waiter = feedback_worker.watch(session_id) if wait_seconds > 0 else None
+        try:
+            return await self._read_feedback(
+                session_id=session_id, user_id=user_id, wait_seconds=wait_seconds, waiter=waiter
+            )
+        finally:
+            if waiter is not None:
+                feedback_worker.unwatch(session_id, waiter)
+
+    async def _read_feedback(
+        self,
+        *,
+        session_id: UUID,
+        user_id: UUID,
+        wait_seconds: float,
+        waiter: Optional[asyncio.Event],
+    ) -> AssessmentFeedbackOut:
+        session = await sessions_repo.get_user_session(
+            self.db, session_id=session_id, user_id=user_id
+        )
+
+        if not session:
+            # 已归档会话的 AI 反馈早已结束，直接取归档内容
+            archived = await self._get_archived(session_id=session_id, user_id=user_id)
+            detail = archive_repo.unpack(archived.payload, archived.format)["session"]
+            return AssessmentFeedbackOut(
+                session_id=archived.session_id,
+                ai_status=detail.get("ai_status") or "ready",
+                ai_summary=detail.get("ai_summary"),
+                ai_recommendation=detail.get("ai_recommendation"),
+            )
+
+        if not session.submitted_at:
+            raise BizError(404, BizCode.NOT_FOUND, "assessment_not_submitted")
+
+        if session.ai_status == "pending" and waiter is not None:
+            # 等待期间释放连接；本进程的任务靠事件唤醒，其他进程的任务靠短查询发现
+            await self.db.rollback()
+            await feedback_worker.wait_for(
+                session_id,
+                wait_seconds,
+                event=waiter,
+                poll=lambda: self._feedback_settled(session_id),
+            )
+            await self.db.refresh(session)
+
+        return AssessmentFeedbackOut(
+            session_id=session.id,
+            ai_status=session.ai_status or "ready",
+            ai_summary=session.ai_summary,
+            ai_recommendation=(
+                AIRecommendation(**session.ai_recommendation)
+                if session.ai_recommendation
+                else None
+            ),
+        )
+
+    async def _feedback_settled(self, session_id: UUID) -> bool:
+        """长轮询中的短查询：ai_status 已离开 pending 时返回 True"""
+        status = await sessions_repo.get_ai_status(self.db, session_id)
+        await self.db.rollback()
+        return status != "pending"
 
     # ========================================
     # 四、查看历史记录（个人中心）
     # ========================================
 
     async def get_user_history(
-        self, *, user_id: UUID, page: int = 1, limit: int = 10
+        self,
+        *,
+        user_id: UUID,
+        page: int = 1,
+        limit: int = 10,
+        cursor: Optional[str] = None,
     ) -> AssessmentHistoryOut:
         """
         查询用户的评测历史
 
+        一次查询取整页（题目数量读 session.question_count，不再逐会话 COUNT）；
+        给出 cursor 时按 (started_at, id) keyset 翻页，page 仅回显。
+        页面落到归档保留期之前时改为热表 + 归档 UNION ALL 一次查询。
+
         Args:
             user_id: 用户ID
-            page: 页码（从1开始）
+            page: 页码（从1开始，cursor 为空时生效）
             limit: 每页条数
+            cursor: 上一页返回的 pagination.next_cursor
 
         Returns:
             AssessmentHistoryOut 对象
 
+        Raises:
+            BizError(422): cursor 不合法
+
         Example:
             >>> result = await assessment_service.get_user_history(
             ...     user_id=user_id, page=1, limit=10
             ... )
+            >>> more = await assessment_service.get_user_history(
+            ...     user_id=user_id, limit=10, cursor=result.pagination.next_cursor
+            ... )
         """
-        sessions, total = await sessions_repo.get_user_history(
-            self.db, user_id=user_id, kind="global", page=page, limit=limit
-        )
-
-        items = []
-        for session in sessions:
-            # 查询题目数量
-            question_count = await items_repo.count_session_items(self.db, session.id)
-
-            items.append(
-                AssessmentHistoryItem(
-                    session_id=session.id,
-                    kind=session.kind,
-                    started_at=session.started_at,
-                    submitted_at=session.submitted_at,
-                    total_score=(
-                        float(session.total_score) if session.total_score else None
-                    ),
-                    question_count=question_count,
-                )
+        after = None
+        if cursor:
+            try:
+                after = decode_history_cursor(cursor)
+            except ValueError:
+                raise BizError(422, BizCode.VALIDATION_ERROR, "invalid_cursor")
+
+        # 多取一条判断是否还有下一页；总数用一条语句同时数热表与归档
+        sessions, _ = await sessions_repo.get_user_history(
+            self.db,
+            user_id=user_id,
+            kind="global",
+            page=page,
+            limit=limit + 1,
+            after=after,
+            with_total=False,
+        )
+        hot_total, archived_total = await archive_repo.count_user_history(
+            self.db, user_id=user_id, kind="global"
+        )
+        total = hot_total + archived_total
+
+        # 归档行都早于保留期截止时间：热表这一页（含多取的一条）已取满且最后一条
+        # 不早于截止时间时，归档不可能插入本页，直接用热表结果
+        if archived_total and not self._page_before_archive(sessions, limit):
+            sessions = await archive_repo.get_merged_history(
+                self.db,
+                user_id=user_id,
+                kind="global",
+                limit=limit + 1,
+                offset=0 if after is not None else (page - 1) * limit,
+                after=after,
+            )
+        has_more = len(sessions) > limit
+        sessions = sessions[:limit]
+
+        items = [
+            AssessmentHistoryItem(
+                session_id=session.id,
+                kind=session.kind,
+                started_at=session.started_at,
+                submitted_at=session.submitted_at,
+                total_score=(
+                    float(session.total_score) if session.total_score else None
+                ),
+                question_count=session.question_count,
             )
+            for session in sessions
+        ]
 
         pagination = build_pagination_meta(page, limit, total)
+        if has_more:
+            last = sessions[-1]
+            pagination.next_cursor = encode_history_cursor(last.started_at, last.id)
 
         return AssessmentHistoryOut(items=items, pagination=pagination)
 
+    @staticmethod
+    def _page_before_archive(sessions: list, limit: int) -> bool:
+        """热表页已取满 limit+1 条且都不早于归档截止时间（归档行不会出现在本页）"""
+        if len(sessions) <= limit:
+            return False
+        started_at = sessions[-1].started_at
+        if started_at.tzinfo is None:
+            started_at = started_at.replace(tzinfo=timezone.utc)
+        cutoff = datetime.now(timezone.utc) - timedelta(days=ASSESSMENT_ARCHIVE_RETENTION_DAYS)
+        return started_at >= cutoff
+
     # ========================================
     # 五、查看评测详情（逐题回放）
     # ========================================
@@ -733,12 +1183,29 @@ class AssessmentService:
         )
 
         if not session:
-            raise BizError(403, BizCode.FORBIDDEN, "forbidden")
+            # 热表没有：可能已归档（慢路径，解压归档内容）
+            archived = await self._get_archived(session_id=session_id, user_id=user_id)
+            return AssessmentDetailOut.model_validate(
+                archive_repo.unpack(archived.payload, archived.format)
+            )
 
         # 2. 检查是否已提交（只能查看已提交的详情）
         if not session.submitted_at:
             raise BizError(404, BizCode.NOT_FOUND, "assessment_not_submitted")
 
+        return await self.build_session_detail(session)
+
+    async def _get_archived(self, *, session_id: UUID, user_id: UUID):
+        """读取归档会话；不存在或不属于该用户时与热表一致返回 403"""
+        archived = await archive_repo.get_archived(self.db, session_id)
+        if not archived or archived.user_id != user_id:
+            raise BizError(403, BizCode.FORBIDDEN, "forbidden")
+        return archived
+
+    async def build_session_detail(self, session) -> AssessmentDetailOut:
+        """由已提交的热表会话组装详情（不做权限校验；归档任务也用它生成归档内容）"""
+        session_id = session.id
+
         # 3. 查询题目和答题记录（JOIN）
         results = await responses_repo.get_responses_with_items(self.db, session_id)
 
@@ -772,9 +1239,8 @@ class AssessmentService:
                 except ValueError:
                     question = None
 
-            correct_answer = (
-                questions_repo.extract_correct_answer(question) if question else None
-            )
+            key = grading.key_from_snapshot(snapshot, question)
+            correct_answer = key.answer if key else None
             explanation = question.explanation if question and question.explanation else None
             score_value = float(response.score) if response.score is not None else None
 
@@ -817,6 +1283,38 @@ class AssessmentService:
                 if session.ai_recommendation
                 else None
             ),
+            ai_status=session.ai_status,
         )
 
         return AssessmentDetailOut(session=session_detail, items=items_with_responses)
+
+    async def get_session_detail_cached(
+        self, *, session_id: UUID, user_id: UUID
+    ) -> CachedDetail:
+        """
+        查询评测详情（序列化结果 + ETag，命中缓存时不查库）
+
+        Raises:
+            BizError(403): 无权访问他人会话
+            BizError(404): 会话不存在或未提交
+        """
+        cached = await detail_cache.get(session_id)
+        if cached is not None:
+            if cached.user_id != str(user_id):
+                raise BizError(403, BizCode.FORBIDDEN, "forbidden")
+            return cached
+
+        detail = await self.get_session_detail(session_id=session_id, user_id=user_id)
+        cached = CachedDetail.build(user_id=user_id, detail=detail)
+        await detail_cache.put(session_id, cached)
+        return cached
+
+    async def _cache_detail(self, *, session_id: UUID, user_id: UUID) -> None:
+        """提交后预先序列化详情；失败只记日志，首次查看时再生成"""
+        if not detail_cache.available:
+            return
+        try:
+            detail = await self.get_session_detail(session_id=session_id, user_id=user_id)
+            await detail_cache.put(session_id, CachedDetail.build(user_id=user_id, detail=detail))
+        except Exception as exc:
+            logger.warning("detail cache warm-up failed for session %s: %s", session_id, exc)
@@ -1,81 +1,171 @@
 # GPT interaction logic
 import os
 import json
-from functools import lru_cache
+import time
 
-# OpenAI v1 SDK
-from openai import OpenAI
 from typing import Sequence, Mapping, Tuple, List, Any
 
-from app.core.config.config import OPENAI_API_KEY, PROMPT_PATH, OPENAI_MODEL
+from app.core.config.config import OPENAI_MODEL, EXPLAIN_MODEL
+from app.core.exceptions.codes import BizCode
+from app.core.exceptions.exceptions import BizError
 from app.schemas.old.explain import ExplainOut
+from app.services.llm.breaker import CircuitOpenError, llm_breaker
+from app.services.llm.prompts import (
+    EXPLAIN_TEMPERATURE,
+    build_explain_messages,
+    load_prompt_template,
+    parse_explain_response,
+)
+from app.services.llm.providers import (
+    DEFAULT_PROVIDER,
+    LLMTimeoutError,
+    ProviderNotConfiguredError,
+    is_timeout_error,
+    provider_registry,
+)
+from app.services.llm.routing import RouteDecision, llm_router
+from app.services.llm.scheduler import Priority, llm_scheduler
+from app.services.llm.telemetry import llm_telemetry, usage_tokens
 import logging
 
 logger = logging.getLogger(__name__)
 
-if not OPENAI_API_KEY:
-    raise RuntimeError("OPENAI_API_KEY not set in .env")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+def _chat_completion(
+    operation: str, *, route: RouteDecision | None = None, **kwargs
+):
+    """All upstream calls go through the circuit breaker and are recorded.
 
-# 读取prompt模板 (JSON格式)
-@lru_cache()
-def _load_prompt_template() -> dict:
-    if not PROMPT_PATH.exists():
-        raise RuntimeError(f"Prompt template not found: {PROMPT_PATH}")
-    with open(PROMPT_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    The OpenAI client is built by the provider registry on first use, so a
+    missing key only fails the calls that need it. ``operation`` tags the
+    telemetry row (see app/services/llm/telemetry.py); with ``route`` the
+    model/provider come from the router and latency is fed back to it.
+    """
+    if route is not None:
+        kwargs["model"] = route.model
+    try:
+        client = provider_registry.client(route.provider if route else DEFAULT_PROVIDER)
+    except ProviderNotConfiguredError as exc:
+        raise BizError(503, BizCode.SERVICE_UNAVAILABLE, "llm_not_configured") from exc
 
+    model = kwargs.get("model")
+    started = time.perf_counter()
+    try:
+        # with_raw_response 暴露 SDK 内部重试次数（retries_taken）
+        raw = llm_breaker.call(client.chat.completions.with_raw_response.create, **kwargs)
+    except CircuitOpenError:
+        llm_telemetry.record(operation, status="circuit_open", model=model)
+        raise
+    except Exception as exc:
+        timed_out = is_timeout_error(exc)
+        if timed_out and route is not None:
+            llm_router.observe(route.tier.name, time.perf_counter() - started)
+        llm_telemetry.record(
+            operation,
+            status="timeout" if timed_out else "error",
+            model=model,
+            latency_ms=int((time.perf_counter() - started) * 1000),
+        )
+        if timed_out:
+            raise LLMTimeoutError(str(exc)) from exc
+        raise
 
+    if route is not None:
+        llm_router.observe(route.tier.name, time.perf_counter() - started)
+    resp = raw.parse()
+    prompt_tokens, completion_tokens = usage_tokens(resp)
+    llm_telemetry.record(
+        operation,
+        model=getattr(resp, "model", None) or model,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        latency_ms=int((time.perf_counter() - started) * 1000),
+        retries=getattr(raw, "retries_taken", 0) or 0,
+    )
+    return resp
 
-async def explain_topic(module_id: str, subtopic: str, known_points: list[str], level: str) -> dict:
-    tmpl = _load_prompt_template()
-    system_prompt = tmpl.get("system", "")
-    style = tmpl.get("style", {})
-    guardrails = tmpl.get("guardrails", "")
 
-    user_content = {
-        "task": "explain_subtopic",
-        "module_id": module_id,
-        "subtopic": subtopic,
-        "known_points": known_points,
-        "level": level,
-        "style": style,
-        "guardrails": guardrails,
-    }
+def _explain_fallback(module_id: str, subtopic: str) -> dict:
+    return ExplainOut(
+        outline=[f"{module_id} / {subtopic}"],
+        explanation="The AI explanation is temporarily unavailable. Please try again shortly.",
+        checklist=[],
+    ).model_dump()
 
-    # Chat Completions 风格（兼容性更好）
-    resp = client.chat.completions.create(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": json.dumps(user_content, ensure_ascii=False)},
-        ],
-        temperature=0.4,
+
+def _unavailable(exc: CircuitOpenError | None = None) -> BizError:
+    retry_after = exc.retry_after if exc else llm_breaker.retry_after()
+    return BizError(
+        503,
+        BizCode.SERVICE_UNAVAILABLE,
+        "llm_unavailable",
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
     )
 
+async def explain_topic(
+    module_id: str,
+    subtopic: str,
+    known_points: list[str],
+    level: str,
+    *,
+    fairness_key: str | None = None,
+) -> dict:
+    """Explain a subtopic; runs on the LLM scheduler at interactive priority."""
+    # 熔断打开时直接返回降级内容，不排队
+    if not llm_breaker.allows_request():
+        return _explain_fallback(module_id, subtopic)
+    try:
+        return await llm_scheduler.run(
+            _explain_topic_sync,
+            module_id,
+            subtopic,
+            known_points,
+            level,
+            priority=Priority.INTERACTIVE,
+            key=fairness_key,
+        )
+    except (CircuitOpenError, LLMTimeoutError):
+        return _explain_fallback(module_id, subtopic)
+
+
+def _explain_topic_sync(module_id: str, subtopic: str, known_points: list[str], level: str) -> dict:
+    # Chat Completions 风格（兼容性更好）
+    resp = _chat_completion(
+        "explain",
+        model=EXPLAIN_MODEL,
+        messages=build_explain_messages(module_id, subtopic, known_points, level),
+        temperature=EXPLAIN_TEMPERATURE,
+    )
     text = resp.choices[0].message.content.strip()
+    return parse_explain_response(text, module_id, subtopic)
+
+
+async def ask_question(question: str, level: str, *, fairness_key: str | None = None) -> str:
+    """Simple question answering based on user level (interactive priority).
 
-    # 约定：模型按 JSON 返回（模板中已提示），这里做兜底解析
+    The model tier is picked by :data:`llm_router` from question length,
+    level and recent per-tier latency.
+    """
+    if not llm_breaker.allows_request():
+        raise _unavailable()
+    route = llm_router.choose(question, level)
     try:
-        data = json.loads(text)
-        return ExplainOut(**{
-            "outline": data.get("outline", []),
-            "explanation": data.get("explanation", ""),
-            "checklist": data.get("checklist", []),
-        }).model_dump()
-    except Exception:
-        # 如果模型没严格按JSON返回，做一个最小降级包装
-        return ExplainOut(
-            outline=[f"{module_id} / {subtopic}"],
-            explanation=text,
-            checklist=[],
-        ).model_dump()
-
-
-async def ask_question(question: str, level: str) -> str:
-    """Simple question answering based on user level."""
-    tmpl = _load_prompt_template()
+        return await llm_scheduler.run(
+            _ask_question_sync,
+            question,
+            level,
+            route,
+            priority=Priority.INTERACTIVE,
+            key=fairness_key,
+        )
+    except CircuitOpenError as exc:
+        raise _unavailable(exc) from exc
+    except LLMTimeoutError as exc:
+        raise BizError(504, BizCode.UPSTREAM_TIMEOUT, "llm_timeout") from exc
+
+
+def _ask_question_sync(question: str, level: str, route: RouteDecision | None = None) -> str:
+    tmpl = load_prompt_template()
     system_prompt = tmpl.get("system", "")
     style = tmpl.get("style", {})
     guardrails = tmpl.get("guardrails", "")
@@ -88,7 +178,9 @@ async def ask_question(question: str, level: str) -> str:
         "guardrails": guardrails,
     }
 
-    resp = client.chat.completions.create(
+    resp = _chat_completion(
+        "ask",
+        route=route,
         model=OPENAI_MODEL,
         messages=[
             {"role": "system", "content": system_prompt},
@@ -100,11 +192,83 @@ async def ask_question(question: str, level: str) -> str:
     return resp.choices[0].message.content.strip()
 
 
+async def chat_reply(
+    messages: list[dict[str, str]], *, fairness_key: str | None = None
+) -> str:
+    """Reply to an already-assembled chat prompt (interactive priority)."""
+    if not llm_breaker.allows_request():
+        raise _unavailable()
+    try:
+        return await llm_scheduler.run(
+            _chat_reply_sync,
+            messages,
+            priority=Priority.INTERACTIVE,
+            key=fairness_key,
+        )
+    except CircuitOpenError as exc:
+        raise _unavailable(exc) from exc
+    except LLMTimeoutError as exc:
+        raise BizError(504, BizCode.UPSTREAM_TIMEOUT, "llm_timeout") from exc
+
+
+def _chat_reply_sync(messages: list[dict[str, str]]) -> str:
+    resp = _chat_completion(
+        "chat_reply",
+        model=OPENAI_MODEL,
+        messages=messages,
+        temperature=0.5,
+    )
+    return resp.choices[0].message.content.strip()
+
+
+async def summarize_conversation(
+    previous_summary: str | None,
+    transcript: list[dict[str, str]],
+    *,
+    fairness_key: str | None = None,
+) -> str:
+    """Fold ``transcript`` into the rolling summary (background priority)."""
+    return await llm_scheduler.run(
+        _summarize_conversation_sync,
+        previous_summary,
+        transcript,
+        priority=Priority.BACKGROUND,
+        key=fairness_key,
+    )
+
+
+def _summarize_conversation_sync(
+    previous_summary: str | None, transcript: list[dict[str, str]]
+) -> str:
+    lines = [f"{item['role']}: {item['content']}" for item in transcript]
+    prompt = (
+        "Update the running summary of a tutoring conversation.\n"
+        f"Current summary:\n{previous_summary or '(none)'}\n\n"
+        "New messages:\n" + "\n".join(lines) + "\n\n"
+        "Return only the updated summary (<= 200 words). Keep the learner's goals, "
+        "misunderstandings, facts already explained and any open questions."
+    )
+    resp = _chat_completion(
+        "chat_summary",
+        model=OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": "You maintain concise conversation summaries."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.2,
+    )
+    return resp.choices[0].message.content.strip()
+
+
 def generate_assessment_feedback(
     total_score: float, breakdown: Sequence[Mapping[str, Any]]
 ) -> Tuple[str, List[str]]:
     """
     Generate a summary and suggested actions for an assessment result using OpenAI.
+
+    Upstream failures (timeout, circuit open, API errors) propagate so the
+    background feedback job stays pending and is retried; the canned text is
+    only returned when no provider is configured or the reply is malformed.
     """
     fallback_summary = (
         f"Your overall score is {total_score:.1f}. Keep practising the areas that scored lower."
@@ -114,7 +278,7 @@ def generate_assessment_feedback(
         "Schedule focused practice sessions to reinforce understanding.",
     ]
 
-    if not OPENAI_API_KEY:
+    if not provider_registry.is_configured():
         return fallback_summary, fallback_actions
 
     payload = [
@@ -136,16 +300,20 @@ def generate_assessment_feedback(
         "Respond strictly as JSON with keys 'summary' and 'suggested_actions' (array of short strings)."
     )
 
+    # 超时 / 熔断 / 上游 APIError 向上抛出：后台任务保持 pending 并按租约重试
+    resp = _chat_completion(
+        "assessment_feedback",
+        model=os.getenv("OPENAI_MODEL", OPENAI_MODEL or "gpt-4o"),
+        messages=[
+            {"role": "system", "content": "You provide concise coaching feedback for assessments."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.6,
+        response_format={"type": "json_object"},
+    )
+
+    # 只有模型输出不合规时才用兜底文案（重试也大概率得到同样结果）
     try:
-        resp = client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL", OPENAI_MODEL or "gpt-4o"),
-            messages=[
-                {"role": "system", "content": "You provide concise coaching feedback for assessments."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.6,
-            response_format={"type": "json_object"},
-        )
         text = resp.choices[0].message.content.strip()
         data = json.loads(text)
         summary = data.get("summary")
@@ -159,6 +327,6 @@ def generate_assessment_feedback(
             actions = fallback_actions
 
         return summary.strip(), actions[:5]
-    except Exception as exc:
-        logger.warning("AI feedback generation failed: %s", exc)
+    except (ValueError, TypeError, AttributeError, IndexError) as exc:
+        logger.warning("AI feedback response unusable: %s", exc)
         return fallback_summary, fallback_actions
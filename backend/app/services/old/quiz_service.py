@@ -12,6 +12,7 @@ from datetime import datetime, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config.config import SHORT_ANSWER_AUTO_GRADE
 from app.core.exceptions.exceptions import BizError, BizCode
 from app.schemas.assessment import (
     QuizPendingOut,
@@ -22,8 +23,6 @@ from app.schemas.assessment import (
     AnswerItem,
     QuestionSnapshot,
     format_answer_for_storage,
-    normalize_single_choice_answer,
-    normalize_multi_choice_answer,
 )
 
 # Repositories
@@ -32,6 +31,27 @@ from app.repositories import assessment_sessions as sessions_repo
 from app.repositories import assessment_items as items_repo
 from app.repositories import assessment_responses as responses_repo
 from app.repositories import user_topic_progress as progress_repo
+from app.repositories import question_snapshots as snapshots_repo
+from app.repositories import item_stats as stats_repo
+
+from app.services import grading
+from app.services.quiz_pool import quiz_pool
+
+QUIZ_POOL_VARIANT = "pending"
+
+
+def build_pending_snapshot(question) -> dict:
+    """待做题单的题目快照（不含答案；判分键仅服务端使用，返回前端时经 QuestionSnapshot 过滤）"""
+    return {
+        "question_id": str(question.id),
+        "qtype": question.qtype,
+        "stem": question.stem,
+        "choices": question.choices,
+        grading.GRADING_KEY: grading.compile_question(question).to_snapshot(),
+    }
+
+
+quiz_pool.register(QUIZ_POOL_VARIANT, build_pending_snapshot)
 
 
 class QuizService:
@@ -80,9 +100,34 @@ class QuizService:
 
         if progress.pending_quiz and progress.quiz_state == "pending":
             return self._build_pending_out(
-                progress.pending_quiz, topic_id, quiz_state=progress.quiz_state
+                await self._resolve_pending_quiz(progress.pending_quiz),
+                topic_id,
+                quiz_state=progress.quiz_state,
             )
 
+        # 优先取后台预生成的题单（快照已入库）；池空或未启用 Redis 时现场抽题
+        records = await quiz_pool.take(QUIZ_POOL_VARIANT, topic_id, question_count)
+        if records is None:
+            records = await self._build_quiz_records(topic_id, question_count)
+
+        pending_quiz = [
+            {"order_no": idx, "snapshot_hash": record.hash}
+            for idx, record in enumerate(records, start=1)
+        ]
+
+        await progress_repo.set_pending_quiz(
+            self.db, progress=progress, pending_quiz=pending_quiz
+        )
+        await self.db.commit()
+
+        resolved = [
+            {"order_no": idx, "snapshot": record.payload}
+            for idx, record in enumerate(records, start=1)
+        ]
+        return self._build_pending_out(resolved, topic_id, quiz_state="pending")
+
+    async def _build_quiz_records(self, topic_id: UUID, question_count: int) -> List:
+        """现场抽题并写入快照（题单池未命中时）"""
         is_enough, actual_count = await questions_repo.check_topic_has_enough_questions(
             self.db, topic_id=topic_id, required_count=question_count
         )
@@ -103,23 +148,34 @@ class QuizService:
             self.db, topic_id=topic_id, count=question_count
         )
 
-        pending_quiz = []
-        for idx, question in enumerate(questions, start=1):
-            snapshot = {
-                "question_id": str(question.id),
-                "qtype": question.qtype,
-                "stem": question.stem,
-                "choices": question.choices,
-            }
-            pending_quiz.append({"order_no": idx, "snapshot": snapshot})
-
-        await progress_repo.set_pending_quiz(
-            self.db, progress=progress, pending_quiz=pending_quiz
+        # 快照内容写入 question_snapshots（按哈希去重），pending_quiz 只存哈希
+        return await snapshots_repo.intern_snapshots(
+            self.db, [build_pending_snapshot(question) for question in questions]
         )
-        await self.db.commit()
 
+    async def _resolve_pending_quiz(self, pending_quiz: List[dict]) -> List[dict]:
+        """
+        将 pending_quiz 中的快照哈希换成快照内容（一次查询）
 
-        return self._build_pending_out(pending_quiz, topic_id, quiz_state="pending")
+        兼容旧格式：条目里直接带 snapshot（或平铺字段）时原样返回
+        """
+        if not isinstance(pending_quiz, list):
+            return pending_quiz
+        hashes = [
+            entry.get("snapshot_hash")
+            for entry in pending_quiz
+            if isinstance(entry, dict) and entry.get("snapshot_hash")
+        ]
+        payloads = await snapshots_repo.get_snapshots(self.db, hashes)
+        resolved = []
+        for entry in pending_quiz:
+            if isinstance(entry, dict) and entry.get("snapshot_hash"):
+                payload = payloads.get(entry["snapshot_hash"])
+                if payload is None:
+                    raise BizError(500, BizCode.INTERNAL_ERROR, "quiz_snapshot_missing")
+                entry = {"order_no": entry.get("order_no"), "snapshot": payload}
+            resolved.append(entry)
+        return resolved
 
     def _build_pending_out(
         self, pending_quiz: List[dict], topic_id: UUID, quiz_state: str = "pending"
@@ -128,7 +184,7 @@ class QuizService:
         构建 QuizPendingOut 响应
 
         Args:
-            pending_quiz: 题单列表（JSONB 格式）
+            pending_quiz: 题单列表（[{order_no, snapshot}]，见 _resolve_pending_quiz）
             topic_id: 主题ID
             quiz_state: 小测状态
 
@@ -186,6 +242,7 @@ class QuizService:
         pending_quiz_raw = progress.pending_quiz
         if not isinstance(pending_quiz_raw, list):
             raise BizError(500, BizCode.INTERNAL_ERROR, "pending_quiz_invalid")
+        pending_quiz_raw = await self._resolve_pending_quiz(pending_quiz_raw)
 
         snapshot_map: Dict[int, dict] = {}
         question_ids: List[UUID] = []
@@ -300,11 +357,20 @@ class QuizService:
                 )
 
         session = await sessions_repo.create_session(
-            self.db, user_id=user_id, kind="topic_quiz", topic_id=topic_id
+            self.db,
+            user_id=user_id,
+            kind="topic_quiz",
+            topic_id=topic_id,
+            question_count=len(snapshot_map),
         )
 
         items = await items_repo.create_items_from_snapshots(
-            self.db, session_id=session.id, snapshots=pending_quiz_raw
+            self.db,
+            session_id=session.id,
+            snapshots=[
+                {"order_no": order_no, "snapshot": snapshot}
+                for order_no, snapshot in snapshot_map.items()
+            ],
         )
 
         prepared_answers = [
@@ -333,6 +399,21 @@ class QuizService:
             self.db, session_id=session.id, responses_data=responses_data
         )
 
+        # 题目/主题统计与判分同一事务累加
+        snapshots_by_item = {item.id: item.question_snapshot for item in items}
+        await stats_repo.record_graded(
+            self.db,
+            [
+                stats_repo.graded_answer(
+                    snapshots_by_item.get(result["item_id"]),
+                    result["answer"],
+                    result["is_correct"],
+                    result["score"],
+                )
+                for result in grading_results
+            ],
+        )
+
         total_score = sum(r["score"] for r in grading_results)
         total_score_percent = (
             (total_score / len(grading_results)) * 100 if grading_results else 0.0
@@ -367,9 +448,9 @@ class QuizService:
         snapshot_map: Dict[int, dict],
         questions_map: Dict[UUID, object],
     ) -> List[dict]:
-        """判分核心逻辑。"""
+        """判分核心逻辑（一次遍历；判分键来自快照，旧快照回退到题目 answer_key）。"""
         answers_map = {ans.order_no: ans.answer.strip() for ans in answers}
-        results = []
+        prepared = []
 
         for item in items:
             order_no = item.order_no
@@ -390,50 +471,28 @@ class QuizService:
                 if qtype and user_answer_raw
                 else user_answer_raw.strip()
             )
+            key = grading.key_from_snapshot(snapshot, question)
+            prepared.append((item, snapshot, question, stored_answer, key))
 
-            correct_answer_raw = (
-                questions_repo.extract_correct_answer(question) if question else None
-            )
-
-            normalized_correct = None
-            if correct_answer_raw:
-                if qtype == "single":
-                    normalized_correct = normalize_single_choice_answer(correct_answer_raw)
-                elif qtype == "multi":
-                    normalized_correct = normalize_multi_choice_answer(correct_answer_raw)
-                else:
-                    normalized_correct = correct_answer_raw
-
-            is_correct = None
-            score = 0.0
-
-            if qtype == "single" and normalized_correct:
-                is_correct = stored_answer == normalized_correct
-                score = 1.0 if is_correct else 0.0
-            elif qtype == "multi" and normalized_correct:
-                is_correct = stored_answer == normalized_correct
-                score = 1.0 if is_correct else 0.0
-            elif qtype in ("short", "text"):
-                is_correct = None
-                score = 0.0
-            elif normalized_correct is not None:
-                is_correct = stored_answer == normalized_correct
-                score = 1.0 if is_correct else 0.0
-            else:
-                is_correct = False
-                score = 0.0
+        graded = grading.grade_session(
+            ((item.id, key, stored_answer) for item, _, _, stored_answer, key in prepared),
+            grade_short=SHORT_ANSWER_AUTO_GRADE,
+        ).results
 
+        results = []
+        for item, snapshot, question, stored_answer, key in prepared:
+            result = graded[item.id]
             results.append(
                 {
                     "item_id": item.id,
-                    "order_no": order_no,
+                    "order_no": item.order_no,
                     "answer": stored_answer,
-                    "is_correct": is_correct,
-                    "correct_answer": normalized_correct,
+                    "is_correct": result.is_correct,
+                    "correct_answer": key.answer if key else None,
                     "explanation": questions_repo.get_explanation(question)
                     if question
                     else None,
-                    "score": score,
+                    "score": result.score,
                     "snapshot": snapshot,
                 }
             )
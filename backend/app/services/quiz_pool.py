@@ -0,0 +1,221 @@
+"""
+主题小测题单池（Redis）
+
+按 (variant, topic, 题数) 预生成随机题单，快照在生成时已入库，开始小测只需
+LPOP 一份；题库变更时 invalidate_topic 递增代数并重建。没有 Redis 时调用方
+照旧现场组卷。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Callable, Optional
+from uuid import UUID
+
+from app.core.config.config import (
+    QUIZ_POOL_ENABLED,
+    QUIZ_POOL_SIZE,
+    QUIZ_POOL_TTL_SECONDS,
+)
+from app.core.db import db as db_module
+from app.models.assessment import QuestionSnapshotRecord
+from app.repositories import question_snapshots as snapshots_repo
+from app.repositories import questions as questions_repo
+
+logger = logging.getLogger(__name__)
+
+SnapshotBuilder = Callable[[object], dict]
+PoolSpec = tuple[str, UUID, int]  # (variant, topic_id, count)
+
+# KEYS: generation, pool list, topic index
+# ARGV: expected generation, ttl, set[, set ...]
+PUSH_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then return -1 end
+for i = 3, #ARGV do redis.call('RPUSH', KEYS[2], ARGV[i]) end
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('SADD', KEYS[3], KEYS[2])
+redis.call('EXPIRE', KEYS[3], ARGV[2])
+return redis.call('LLEN', KEYS[2])
+"""
+
+
+def _pool_key(variant: str, topic_id: UUID, count: int) -> str:
+    return f"quizpool:{variant}:{topic_id}:{count}"
+
+
+def _gen_key(topic_id: UUID) -> str:
+    return f"quizpool:gen:{topic_id}"
+
+
+def _index_key(topic_id: UUID) -> str:
+    return f"quizpool:topic:{topic_id}"
+
+
+def _parse_pool_key(key: str) -> Optional[PoolSpec]:
+    try:
+        _, variant, topic_id, count = key.split(":")
+        return variant, UUID(topic_id), int(count)
+    except ValueError:
+        return None
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class QuizSetPool:
+    """Redis lists of ready quiz sets plus the background producer filling them."""
+
+    def __init__(self, *, size: int = 3, ttl_seconds: int = 3600, enabled: bool = True) -> None:
+        self.size = max(1, size)
+        self.ttl_seconds = int(ttl_seconds)
+        self.enabled = enabled
+        self._builders: dict[str, SnapshotBuilder] = {}
+        self._redis = None
+        self._push = None
+        self._queue: asyncio.Queue[PoolSpec] | None = None
+        self._queued: set[PoolSpec] = set()
+        self._task: asyncio.Task | None = None
+
+    def register(self, variant: str, build_snapshot: SnapshotBuilder) -> None:
+        """Snapshot builder for a quiz variant (called at service import time)."""
+        self._builders[variant] = build_snapshot
+
+    def bind_redis(self, redis) -> None:
+        """lifespan 中注入 app.state.redis；None 表示不启用题单池"""
+        self._redis = redis
+        self._push = redis.register_script(PUSH_SCRIPT) if redis is not None else None
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and self._redis is not None
+
+    # ------------------------------ consumers ------------------------------
+
+    async def take(
+        self, variant: str, topic_id: UUID, count: int
+    ) -> Optional[list[QuestionSnapshotRecord]]:
+        """
+        Pop a ready set (already interned snapshots, in quiz order).
+
+        Returns ``None`` when the pool is empty or unavailable; the caller
+        builds the quiz inline. Either way the pool is queued for a top-up.
+        """
+        if not self.available or variant not in self._builders:
+            return None
+        self.request_refill(variant, topic_id, count)
+        try:
+            raw = await self._redis.lpop(_pool_key(variant, topic_id, count))
+        except Exception as exc:
+            logger.warning("quiz pool pop failed for topic %s: %s", topic_id, exc)
+            return None
+        if raw is None:
+            return None
+        return [
+            QuestionSnapshotRecord(hash=snapshot_hash, payload=payload)
+            for snapshot_hash, payload in json.loads(_text(raw))
+        ]
+
+    async def invalidate_topic(self, topic_id: UUID) -> None:
+        """Question bank of the topic changed: drop its sets and regenerate."""
+        if not self.available:
+            return
+        try:
+            members = [_text(m) for m in await self._redis.smembers(_index_key(topic_id))]
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.incr(_gen_key(topic_id))
+            pipe.delete(_index_key(topic_id), *members)
+            await pipe.execute()
+        except Exception as exc:
+            logger.warning("quiz pool invalidation failed for topic %s: %s", topic_id, exc)
+            return
+        for member in members:
+            spec = _parse_pool_key(member)
+            if spec:
+                self.request_refill(*spec)
+
+    # ------------------------------ producer -------------------------------
+
+    def request_refill(self, variant: str, topic_id: UUID, count: int) -> None:
+        if self._queue is None:
+            return
+        spec = (variant, topic_id, count)
+        if spec in self._queued:
+            return
+        self._queued.add(spec)
+        self._queue.put_nowait(spec)
+
+    async def refill(self, variant: str, topic_id: UUID, count: int) -> int:
+        """Top one pool up to ``size`` sets; returns the number of sets added."""
+        build = self._builders.get(variant)
+        if not self.available or build is None:
+            return 0
+        key = _pool_key(variant, topic_id, count)
+        generation = _text(await self._redis.get(_gen_key(topic_id)) or "0")
+        missing = self.size - int(await self._redis.llen(key))
+        if missing <= 0:
+            return 0
+
+        async with db_module.AsyncSessionLocal() as db:
+            sets: list[list[dict]] = []
+            for _ in range(missing):
+                questions = await questions_repo.get_random_questions_by_topic(
+                    db, topic_id=topic_id, count=count
+                )
+                if len(questions) < count:
+                    # 题量不足：不入池，开始小测时走原路径并返回 insufficient_questions
+                    break
+                sets.append([build(question) for question in questions])
+            if not sets:
+                return 0
+            records = await snapshots_repo.intern_snapshots(
+                db, [payload for quiz_set in sets for payload in quiz_set]
+            )
+            await db.commit()
+
+        encoded = [
+            json.dumps(
+                [[r.hash, r.payload] for r in records[i * count:(i + 1) * count]],
+                ensure_ascii=False,
+                default=str,
+            )
+            for i in range(len(sets))
+        ]
+        pushed = await self._push(
+            keys=[_gen_key(topic_id), key, _index_key(topic_id)],
+            args=[generation, self.ttl_seconds, *encoded],
+        )
+        return len(sets) if int(pushed) >= 0 else 0
+
+    async def start(self) -> None:
+        if self._task is None and self.available:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._consume(), name="quiz-pool-producer")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._queue = None
+        self._queued.clear()
+
+    async def _consume(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            spec = await queue.get()
+            self._queued.discard(spec)
+            try:
+                await self.refill(*spec)
+            except Exception as exc:
+                logger.warning("quiz pool refill failed for %s: %s", spec, exc)
+            finally:
+                queue.task_done()
+
+
+quiz_pool = QuizSetPool(size=QUIZ_POOL_SIZE, ttl_seconds=QUIZ_POOL_TTL_SECONDS, enabled=QUIZ_POOL_ENABLED)
+
+
+__all__ = ["QuizSetPool", "quiz_pool"]
@@ -0,0 +1,139 @@
+"""
+未提交评测会话的后台清理
+
+超过 TTL 仍未提交的会话分批删除（每批一个短事务，items / responses 随外键
+级联删除），同时丢弃对应的答案草稿。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from app.core.config.config import (
+    ABANDONED_SESSION_SWEEP_BATCH,
+    ABANDONED_SESSION_SWEEP_MAX_BATCHES,
+    ABANDONED_SESSION_SWEEP_SECONDS,
+    ABANDONED_SESSION_TTL_SECONDS,
+)
+from app.core.db import db as db_module
+from app.repositories import assessment_sessions as sessions_repo
+from app.services.answer_drafts import answer_drafts
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class SweepReport:
+    """Outcome of one sweep run."""
+
+    cutoff: datetime
+    deleted: int = 0
+    batches: int = 0
+    by_kind: Counter = field(default_factory=Counter)
+    # True when the run stopped at max_batches with rows possibly left over.
+    truncated: bool = False
+
+    def as_dict(self) -> dict:
+        return {
+            "cutoff": self.cutoff.isoformat(),
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "by_kind": dict(self.by_kind),
+            "truncated": self.truncated,
+        }
+
+
+class AbandonedSessionSweeper:
+    """Periodic loop deleting unsubmitted sessions older than ``ttl_seconds``."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int = 604800,
+        interval: float = 600.0,
+        batch_size: int = 500,
+        max_batches: int = 20,
+    ) -> None:
+        self.ttl_seconds = int(ttl_seconds)
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.max_batches = max(1, max_batches)
+        self.last_report: SweepReport | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    async def start(self) -> None:
+        if self._task is None and self.enabled:
+            self._task = asyncio.create_task(self._run(), name="abandoned-session-sweeper")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as exc:
+                logger.warning("abandoned session sweep failed: %s", exc)
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self, *, now: datetime | None = None) -> SweepReport:
+        """Delete up to ``batch_size * max_batches`` abandoned sessions."""
+        now = now or datetime.now(timezone.utc)
+        report = SweepReport(cutoff=now - timedelta(seconds=self.ttl_seconds))
+        for _ in range(self.max_batches):
+            deleted = await self._delete_batch(report.cutoff)
+            if not deleted:
+                break
+            report.batches += 1
+            report.deleted += len(deleted)
+            report.by_kind.update(deleted.values())
+            await self._discard_drafts(deleted)
+            if len(deleted) < self.batch_size:
+                break
+        else:
+            report.truncated = True
+
+        self.last_report = report
+        if report.deleted:
+            logger.info({"action": "abandoned_sessions_swept", **report.as_dict()})
+        return report
+
+    async def _delete_batch(self, cutoff: datetime) -> dict[UUID, str]:
+        async with db_module.AsyncSessionLocal() as db:
+            deleted = await sessions_repo.delete_abandoned_sessions(
+                db, started_before=cutoff, limit=self.batch_size
+            )
+            await db.commit()
+        return deleted
+
+    async def _discard_drafts(self, session_ids) -> None:
+        """Drop Redis drafts so the flusher doesn't write into deleted sessions."""
+        if not answer_drafts.available:
+            return
+        for session_id in session_ids:
+            try:
+                await answer_drafts.discard(session_id)
+            except Exception as exc:
+                logger.warning("answer draft discard failed for session %s: %s", session_id, exc)
+
+
+session_sweeper = AbandonedSessionSweeper(
+    ttl_seconds=ABANDONED_SESSION_TTL_SECONDS,
+    interval=ABANDONED_SESSION_SWEEP_SECONDS,
+    batch_size=ABANDONED_SESSION_SWEEP_BATCH,
+    max_batches=ABANDONED_SESSION_SWEEP_MAX_BATCHES,
+)
+
+
+__all__ = ["AbandonedSessionSweeper", "SweepReport", "session_sweeper"]
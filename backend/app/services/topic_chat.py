@@ -0,0 +1,255 @@
+"""
+主题对话（持久化，提示词长度有上限）
+
+模型只看到 system + 滚动摘要 + 最近 K 条 + 新消息；未归纳的 token 超过
+CHAT_SUMMARY_TRIGGER_TOKENS 时，后台把较早的消息合并进 ChatSession.summary。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Sequence
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.config import CHAT_RECENT_MESSAGES, CHAT_SUMMARY_TRIGGER_TOKENS
+from app.core.db import db as db_module
+from app.core.exceptions.codes import BizCode
+from app.core.exceptions.exceptions import BizError
+from app.core.metrics.metrics import histogram
+from app.models import ChatMessage, ChatSession, LearningTopic, LearningTopicContent, User
+from app.repositories import chat as chat_repo
+from app.services.llm.prompts import load_prompt_template
+from app.services.old import gpt_call
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TOKENS = histogram(
+    "topic_chat_prompt_tokens",
+    "Estimated prompt tokens sent for topic chat replies",
+    buckets=(250, 500, 1000, 2000, 4000, 8000),
+)
+
+_ROLE_TO_OPENAI = {"user": "user", "ai": "assistant"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return max(1, len(text or "") // 4)
+
+
+def build_prompt(
+    *,
+    system_prompt: str,
+    topic_context: str,
+    summary: str | None,
+    recent: Sequence[tuple[str, str]],
+    user_content: str,
+) -> list[dict[str, str]]:
+    """Assemble chat messages from the rolling summary and recent turns."""
+    system = system_prompt.strip()
+    if topic_context:
+        system = f"{system}\n\n{topic_context}".strip()
+    messages = [{"role": "system", "content": system}]
+    if summary:
+        messages.append(
+            {"role": "system", "content": f"Summary of the conversation so far:\n{summary}"}
+        )
+    for role, content in recent:
+        messages.append({"role": _ROLE_TO_OPENAI.get(role, role), "content": content})
+    messages.append({"role": "user", "content": user_content})
+    return messages
+
+
+@dataclass(slots=True)
+class ChatMessageView:
+    message_id: UUID
+    role: str
+    content: str
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, message: ChatMessage) -> "ChatMessageView":
+        return cls(
+            message_id=message.id,
+            role=message.role,
+            content=message.content,
+            created_at=message.created_at,
+        )
+
+    def as_payload(self) -> dict:
+        return {
+            "message_id": str(self.message_id),
+            "role": self.role,
+            "content": self.content,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class TopicChatService:
+    def __init__(
+        self,
+        *,
+        recent_messages: int = CHAT_RECENT_MESSAGES,
+        summary_trigger_tokens: int = CHAT_SUMMARY_TRIGGER_TOKENS,
+    ) -> None:
+        self.recent_messages = max(1, recent_messages)
+        self.summary_trigger_tokens = summary_trigger_tokens
+        self._compacting: set[UUID] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def _ensure_topic(self, session: AsyncSession, topic_id: UUID) -> LearningTopic:
+        topic = await session.get(LearningTopic, topic_id)
+        if not topic or not topic.is_active:
+            raise BizError(404, BizCode.NOT_FOUND, "topic_not_found")
+        return topic
+
+    async def _topic_context(self, session: AsyncSession, topic: LearningTopic) -> str:
+        content = (
+            await session.execute(
+                sa.select(LearningTopicContent).where(LearningTopicContent.topic_id == topic.id)
+            )
+        ).scalar_one_or_none()
+        lines = [f"The learner is studying the topic: {topic.name}."]
+        if content and content.summary:
+            lines.append(f"Topic overview: {content.summary}")
+        return "\n".join(lines)
+
+    async def get_history(
+        self,
+        session: AsyncSession,
+        *,
+        user: User,
+        topic_id: UUID,
+        limit: int = 50,
+        before: datetime | None = None,
+    ) -> tuple[ChatSession | None, list[ChatMessageView]]:
+        await self._ensure_topic(session, topic_id)
+        chat = await chat_repo.get_topic_session(session, user_id=user.id, topic_id=topic_id)
+        if not chat:
+            return None, []
+        messages = await chat_repo.list_messages(
+            session, session_id=chat.id, limit=limit, before=before
+        )
+        return chat, [ChatMessageView.from_model(m) for m in messages]
+
+    async def send_message(
+        self,
+        session: AsyncSession,
+        *,
+        user: User,
+        topic_id: UUID,
+        content: str,
+        fairness_key: str | None = None,
+    ) -> tuple[ChatSession, ChatMessageView, ChatMessageView]:
+        content = content.strip()
+        if not content:
+            raise BizError(422, BizCode.VALIDATION_ERROR, "empty_message")
+        topic = await self._ensure_topic(session, topic_id)
+        chat = await chat_repo.get_or_create_topic_session(
+            session, user_id=user.id, topic_id=topic.id, title=topic.name
+        )
+
+        recent = await chat_repo.get_recent_unsummarized(
+            session, session=chat, limit=self.recent_messages
+        )
+        messages = build_prompt(
+            system_prompt=load_prompt_template().get("system", ""),
+            topic_context=await self._topic_context(session, topic),
+            summary=chat.summary,
+            recent=[(m.role, m.content) for m in recent],
+            user_content=content,
+        )
+        PROMPT_TOKENS.observe(sum(estimate_tokens(m["content"]) for m in messages))
+
+        # Release the connection before the model call. The question is only
+        # stored together with its answer, so a failed call (503 / 504) leaves
+        # no unanswered user turn in the history.
+        await session.commit()
+        asked_at = datetime.now(timezone.utc)
+
+        answer = await gpt_call.chat_reply(messages, fairness_key=fairness_key)
+
+        user_message = await chat_repo.add_message(
+            session,
+            session=chat,
+            role="user",
+            content=content,
+            token_count=estimate_tokens(content),
+            created_at=asked_at,
+        )
+        ai_message = await chat_repo.add_message(
+            session, session=chat, role="ai", content=answer, token_count=estimate_tokens(answer)
+        )
+        await session.commit()
+
+        if (chat.token_count or 0) >= self.summary_trigger_tokens:
+            self.schedule_compaction(chat.id)
+
+        return chat, ChatMessageView.from_model(user_message), ChatMessageView.from_model(ai_message)
+
+    async def reset(self, session: AsyncSession, *, user: User, topic_id: UUID) -> None:
+        await self._ensure_topic(session, topic_id)
+        chat = await chat_repo.get_topic_session(session, user_id=user.id, topic_id=topic_id)
+        if chat:
+            await chat_repo.reset_session(session, session=chat)
+
+    # ---------------------------- compaction -----------------------------
+
+    def schedule_compaction(self, chat_id: UUID) -> None:
+        if chat_id in self._compacting:
+            return
+        self._compacting.add(chat_id)
+        task = asyncio.create_task(self._run_compaction(chat_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_compaction(self, chat_id: UUID) -> None:
+        try:
+            await self.compact(chat_id)
+        except Exception as exc:
+            logger.warning("topic chat compaction failed for %s: %s", chat_id, exc)
+        finally:
+            self._compacting.discard(chat_id)
+
+    async def compact(self, chat_id: UUID) -> bool:
+        """Fold everything but the last K unsummarized messages into the summary."""
+        async with db_module.AsyncSessionLocal() as session:
+            chat = await session.get(ChatSession, chat_id)
+            if not chat:
+                return False
+            pending = await chat_repo.get_unsummarized(session, session=chat)
+            to_fold = pending[: max(0, len(pending) - self.recent_messages)]
+            if not to_fold:
+                return False
+
+            expected_cutoff = chat.summarized_upto_message_id
+            previous_summary = chat.summary
+            user_key = str(chat.user_id)
+            transcript = [{"role": m.role, "content": m.content} for m in to_fold]
+            folded_tokens = sum(m.token_count or estimate_tokens(m.content) for m in to_fold)
+            new_cutoff = to_fold[-1].id
+            # Don't hold a connection while the model runs.
+            await session.rollback()
+
+            summary = await gpt_call.summarize_conversation(
+                previous_summary, transcript, fairness_key=user_key
+            )
+
+            applied = await chat_repo.apply_summary(
+                session,
+                session_id=chat_id,
+                expected_cutoff=expected_cutoff,
+                summary=summary,
+                new_cutoff=new_cutoff,
+                summarized_tokens=folded_tokens,
+            )
+            await session.commit()
+            return applied
+
+
+__all__ = ["TopicChatService", "ChatMessageView", "build_prompt", "estimate_tokens"]
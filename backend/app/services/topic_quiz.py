@@ -5,8 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Iterable
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,11 +16,34 @@ from app.models import (
     AssessmentItem,
     AssessmentSession,
     LearningTopic,
-    Question,
-    QuestionTopic,
     User,
     UserTopicProgress,
 )
+from app.repositories import item_stats as stats_repo
+from app.repositories import questions as questions_repo
+from app.repositories import user_topic_progress as progress_repo
+from app.repositories import question_snapshots as snapshots_repo
+from app.schemas.assessment import QuestionDTO
+from app.services import grading
+from app.services.quiz_pool import quiz_pool
+
+QUIZ_POOL_VARIANT = "topic"
+
+
+def build_quiz_snapshot(question) -> dict:
+    """Snapshot stored for a topic quiz item (``Question`` row or ``QuestionDTO``)."""
+    return {
+        "question_id": str(question.id),
+        "stem": question.stem,
+        "qtype": question.qtype,
+        "choices": question.choices or {},
+        # 判分键预编译，提交时一次遍历判分
+        grading.GRADING_KEY: grading.compile_question(question).to_snapshot(),
+        "explanation": question.explanation,
+    }
+
+
+quiz_pool.register(QUIZ_POOL_VARIANT, build_quiz_snapshot)
 
 
 @dataclass(slots=True)
@@ -65,8 +87,9 @@ class QuizSummary:
 
 
 class TopicQuizService:
-    def __init__(self, minimum_questions: int = 3) -> None:
+    def __init__(self, minimum_questions: int = 3, cas_attempts: int = 3) -> None:
         self.minimum_questions = minimum_questions
+        self.cas_attempts = cas_attempts
 
     async def _ensure_topic(self, session: AsyncSession, topic_id: UUID) -> LearningTopic:
         topic = await session.get(LearningTopic, topic_id)
@@ -75,28 +98,17 @@ class TopicQuizService:
         return topic
 
     async def _ensure_progress(self, session: AsyncSession, user: User, topic: LearningTopic) -> UserTopicProgress:
-        progress = await session.get(UserTopicProgress, (user.id, topic.id))
-        if progress:
-            return progress
-        progress = UserTopicProgress(
-            user_id=user.id,
-            topic_id=topic.id,
-            progress_status="in_progress",
+        return await progress_repo.ensure_progress(
+            session, user_id=user.id, topic_id=topic.id, progress_status="in_progress"
         )
-        session.add(progress)
-        await session.flush()
-        return progress
 
-    async def _select_questions(self, session: AsyncSession, topic: LearningTopic, limit: int) -> list[Question]:
-        stmt = (
-            sa.select(Question)
-            .join(QuestionTopic, QuestionTopic.question_id == Question.id)
-            .where(QuestionTopic.topic_id == topic.id, Question.is_active.is_(True))
-            .order_by(Question.id.asc())
-            .limit(limit)
+    async def _select_questions(
+        self, session: AsyncSession, topic: LearningTopic, limit: int
+    ) -> list[QuestionDTO]:
+        """Random sample from the topic's question id pool (same source as the quiz pool)."""
+        questions = await questions_repo.get_random_questions_by_topic(
+            session, topic_id=topic.id, count=limit
         )
-        result = await session.execute(stmt)
-        questions = result.scalars().all()
         if len(questions) < limit:
             raise BizError(
                 409,
@@ -114,108 +126,122 @@ class TopicQuizService:
         topic_id: UUID,
         question_limit: int | None = None,
     ) -> tuple[AssessmentSession, list[QuizQuestion]]:
+        """
+        Resume the pending quiz or start a new one.
+
+        The pending state is claimed with a compare-and-swap on
+        ``quiz_version`` before anything is inserted, so concurrent starts
+        (double clicks) end up on one quiz session; the loser re-reads the
+        progress row and resumes the winner's quiz.
+        """
         topic = await self._ensure_topic(session, topic_id)
         progress = await self._ensure_progress(session, user, topic)
 
-        if progress.quiz_state == "pending" and progress.pending_quiz:
-            # Allow resuming existing quiz without creating a new one.
-            session_id = UUID(progress.pending_quiz["session_id"])
-            questions = [
-                QuizQuestion(
-                    item_id=UUID(item["item_id"]),
-                    question_id=UUID(item["question_id"]),
-                    order_no=item["order"],
-                    stem=item["stem"],
-                    qtype=item["qtype"],
-                    choices=item.get("choices") or {},
-                )
-                for item in progress.pending_quiz["questions"]
-            ]
-            existing_session = await session.get(AssessmentSession, session_id)
-            if not existing_session:
-                # Session was deleted; reset quiz state and start a fresh quiz.
-                progress.pending_quiz = None
-                progress.quiz_state = "none"
-            else:
-                return existing_session, questions
+        for _ in range(self.cas_attempts):
+            if progress.quiz_state == "pending" and progress.pending_quiz:
+                resumed = await self._resume(session, progress.pending_quiz)
+                if resumed is not None:
+                    return resumed
+                # Session was deleted (e.g. swept); the CAS below replaces the reference.
+
+            started = await self._start_new(session, progress, topic, question_limit)
+            if started is not None:
+                return started
+            await session.refresh(progress)
+
+        raise BizError(409, BizCode.CONFLICT, "quiz_state_conflict")
+
+    async def _resume(
+        self, session: AsyncSession, pending_quiz: dict
+    ) -> tuple[AssessmentSession, list[QuizQuestion]] | None:
+        session_id = UUID(pending_quiz["session_id"])
+        # Older payloads kept every question inline; only their item ids are needed.
+        item_ids = pending_quiz.get("item_ids") or [
+            entry["item_id"] for entry in pending_quiz.get("questions", [])
+        ]
+        existing_session = await session.get(AssessmentSession, session_id)
+        if not existing_session or not item_ids:
+            return None
+        result = await session.execute(
+            sa.select(AssessmentItem)
+            .where(AssessmentItem.id.in_([UUID(str(item_id)) for item_id in item_ids]))
+            .order_by(AssessmentItem.order_no.asc())
+        )
+        items = result.scalars().all()
+        if not items:
+            return None
+        return existing_session, [self._quiz_question(item) for item in items]
+
+    @staticmethod
+    def _quiz_question(item: AssessmentItem) -> QuizQuestion:
+        content = item.question_snapshot
+        return QuizQuestion(
+            item_id=item.id,
+            question_id=UUID(content["question_id"]),
+            order_no=item.order_no,
+            stem=content["stem"],
+            qtype=content["qtype"],
+            choices=content.get("choices") or {},
+        )
 
+    async def _start_new(
+        self,
+        session: AsyncSession,
+        progress: UserTopicProgress,
+        topic: LearningTopic,
+        question_limit: int | None,
+    ) -> tuple[AssessmentSession, list[QuizQuestion]] | None:
+        """Build a quiz and claim it; ``None`` when a concurrent request won the CAS."""
         limit = question_limit or self.minimum_questions
-        questions = await self._select_questions(session, topic, limit)
+        # Prefer a pre-generated set (snapshots already stored); build inline on a miss.
+        records = await quiz_pool.take(QUIZ_POOL_VARIANT, topic.id, limit)
+        if records is None:
+            questions = await self._select_questions(session, topic, limit)
+            # Snapshot content is stored once per distinct content hash; items
+            # only reference the hash.
+            records = await snapshots_repo.intern_snapshots(
+                session, [build_quiz_snapshot(question) for question in questions]
+            )
 
+        # ids are generated client-side so the session and all of its items
+        # go out in one flush (a single multi-row INSERT for the items), and
+        # pending_quiz can reference them before they are written.
         assessment_session = AssessmentSession(
-            user_id=user.id,
+            id=uuid4(),
+            user_id=progress.user_id,
             kind="topic_quiz",
             topic_id=topic.id,
+            question_count=len(records),
         )
-        session.add(assessment_session)
-        await session.flush()
-
-        quiz_questions: list[QuizQuestion] = []
-        pending_payload = {
-            "session_id": str(assessment_session.id),
-            "questions": [],
-        }
-        for order_no, question in enumerate(questions, start=1):
-            item = AssessmentItem(
-                session_id=assessment_session.id,
-                order_no=order_no,
-                question_snapshot={
-                    "question_id": str(question.id),
-                    "stem": question.stem,
-                    "qtype": question.qtype,
-                    "choices": question.choices or {},
-                    "answer_key": question.answer_key or {},
-                    "explanation": question.explanation,
-                },
-            )
-            session.add(item)
-            await session.flush()
-            quiz_question = QuizQuestion(
-                item_id=item.id,
-                question_id=question.id,
-                order_no=order_no,
-                stem=question.stem,
-                qtype=question.qtype,
-                choices=question.choices or {},
-            )
-            quiz_questions.append(quiz_question)
-            pending_payload["questions"].append(
-                quiz_question.as_payload() | {"item_id": str(item.id)}
+        items = [
+            snapshots_repo.attach_snapshot(
+                AssessmentItem(id=uuid4(), session_id=assessment_session.id, order_no=order_no),
+                record,
             )
+            for order_no, record in enumerate(records, start=1)
+        ]
+
+        claimed = await progress_repo.compare_and_set_quiz(
+            session,
+            progress=progress,
+            expected_version=progress.quiz_version,
+            quiz_state="pending",
+            pending_quiz={
+                "session_id": str(assessment_session.id),
+                "item_ids": [str(item.id) for item in items],
+            },
+        )
+        if not claimed:
+            return None
 
-        progress.pending_quiz = pending_payload
-        progress.quiz_state = "pending"
+        session.add(assessment_session)
+        session.add_all(items)
+        await session.flush()
+        # FK target exists only after the flush above.
         progress.last_quiz_session_id = assessment_session.id
         await session.flush()
 
-        return assessment_session, quiz_questions
-
-    @staticmethod
-    def _normalise_answer(answer: object) -> list[str]:
-        if isinstance(answer, str):
-            return [answer]
-        if isinstance(answer, Iterable):
-            return [str(item) for item in answer]
-        return []
-
-    @staticmethod
-    def _score_question(snapshot: dict, answer: list[str]) -> tuple[bool, float]:
-        qtype = snapshot.get("qtype")
-        answer_key = snapshot.get("answer_key") or {}
-        correct_options = {str(opt) for opt in answer_key.get("correct_options", [])}
-
-        if qtype == "single":
-            return (set(answer) == correct_options, 1.0)
-        if qtype == "multi":
-            return (set(answer) == correct_options, 1.0)
-        if qtype == "short":
-            reference = answer_key.get("reference")
-            if not reference:
-                return False, 0.0
-            expected = {token.lower() for token in correct_options} | {reference.lower()}
-            provided = {opt.lower() for opt in answer}
-            return (bool(provided & expected), 1.0)
-        return False, 1.0
+        return assessment_session, [self._quiz_question(item) for item in items]
 
     async def submit(
         self,
@@ -251,35 +277,63 @@ class TopicQuizService:
             raise BizError(409, BizCode.CONFLICT, "quiz_items_missing")
 
         total_questions = len(items)
-        correct = 0
-        for item in items:
-            user_answer = answers.get(str(item.id)) or answers.get(str(item.question_snapshot.get("question_id")))
-            normalised = self._normalise_answer(user_answer)
-            is_correct, _ = self._score_question(item.question_snapshot, normalised)
-            if is_correct:
-                correct += 1
-
+        submitted = {
+            item.id: answers.get(str(item.id))
+            or answers.get(str(item.question_snapshot.get("question_id")))
+            or ""
+            for item in items
+        }
+        graded = grading.grade_session(
+            (item.id, grading.key_from_snapshot(item.question_snapshot), submitted[item.id])
+            for item in items
+        )
+        correct = graded.correct_count
         score = correct / total_questions if total_questions else 0.0
 
+        # Claim the submission first: a concurrent submit / restart that already
+        # moved quiz_version turns this into a 409 before any session or stats write.
+        progress_status = progress.progress_status
+        if score > 0 and progress_status == "not_started":
+            progress_status = "in_progress"
+        threshold = float(topic.pass_threshold or Decimal("0"))
+        passed = score >= threshold
+        if passed and (progress_status != "completed" or not progress.marked_complete):
+            progress_status = "in_progress"
+
+        best = progress.best_score
+        claimed = await progress_repo.compare_and_set_quiz(
+            session,
+            progress=progress,
+            expected_version=progress.quiz_version,
+            quiz_state="completed",
+            pending_quiz=None,
+            last_quiz_session_id=assessment_session.id,
+            last_score=Decimal(str(score)),
+            attempt_count=progress.attempt_count + 1,
+            best_score=Decimal(str(score)) if best is None or score > float(best) else best,
+            progress_status=progress_status,
+        )
+        if not claimed:
+            raise BizError(409, BizCode.CONFLICT, "quiz_not_pending")
+
         assessment_session.submitted_at = datetime.now(timezone.utc)
         assessment_session.total_score = Decimal(str(score))
         session.add(assessment_session)
 
-        progress.last_score = Decimal(str(score))
-        progress.attempt_count += 1
-        if progress.best_score is None or score > float(progress.best_score):
-            progress.best_score = Decimal(str(score))
-        progress.quiz_state = "completed"
-        progress.pending_quiz = None
-        progress.last_quiz_session_id = assessment_session.id
-        if score > 0 and progress.progress_status == "not_started":
-            progress.progress_status = "in_progress"
-
-        threshold = float(topic.pass_threshold or Decimal("0"))
-        passed = score >= threshold
-
-        if passed and (progress.progress_status != "completed" or not progress.marked_complete):
-            progress.progress_status = "in_progress"
+        # Item / topic statistics are accumulated in the grading transaction.
+        await stats_repo.record_graded(
+            session,
+            [
+                stats_repo.graded_answer(
+                    item.question_snapshot,
+                    submitted[item.id],
+                    graded.results[item.id].is_correct,
+                    graded.results[item.id].score,
+                )
+                for item in items
+                if item.id in graded.results
+            ],
+        )
 
         await session.flush()
 
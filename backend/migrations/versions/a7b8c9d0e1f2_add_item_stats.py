@@ -0,0 +1,119 @@
+"""incremental per-question / per-choice / per-topic item statistics
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2025-11-17 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7b8c9d0e1f2"
+down_revision: Union[str, Sequence[str], None] = "f6a7b8c9d0e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 已判分作答 + 快照中的题目 id（回填用）
+GRADED_FROM = """
+    FROM assessment_responses AS r
+    JOIN assessment_items AS i ON i.id = r.item_id
+    JOIN question_snapshots AS s ON s.hash = i.snapshot_hash
+    JOIN questions AS q ON q.id = (s.payload->>'question_id')::uuid
+"""
+GRADED_WHERE = "WHERE r.is_correct IS NOT NULL"
+
+
+def _counter_columns() -> list[sa.Column]:
+    return [
+        sa.Column("attempts", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("correct", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("score_sum", sa.Numeric(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    """Create the stats tables and backfill them from already graded responses."""
+    op.create_table(
+        "question_stats",
+        sa.Column("question_id", postgresql.UUID(as_uuid=True), nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(
+            ["question_id"], ["questions.id"],
+            name=op.f("fk_question_stats_question_id_questions"), ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("question_id", name=op.f("pk_question_stats")),
+    )
+    op.create_table(
+        "question_choice_stats",
+        sa.Column("question_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("choice", sa.String(length=16), nullable=False),
+        sa.Column("selections", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["question_id"], ["questions.id"],
+            name=op.f("fk_question_choice_stats_question_id_questions"), ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("question_id", "choice", name="pk_question_choice_stats"),
+    )
+    op.create_table(
+        "topic_stats",
+        sa.Column("topic_id", postgresql.UUID(as_uuid=True), nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(
+            ["topic_id"], ["learning_topics.id"],
+            name=op.f("fk_topic_stats_topic_id_learning_topics"), ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("topic_id", name=op.f("pk_topic_stats")),
+    )
+
+    op.execute(
+        f"""
+        INSERT INTO question_stats (question_id, attempts, correct, score_sum)
+        SELECT q.id, COUNT(*), COUNT(*) FILTER (WHERE r.is_correct), COALESCE(SUM(r.score), 0)
+        {GRADED_FROM}
+        {GRADED_WHERE}
+        GROUP BY q.id
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO topic_stats (topic_id, attempts, correct, score_sum)
+        SELECT qt.topic_id, COUNT(*), COUNT(*) FILTER (WHERE r.is_correct), COALESCE(SUM(r.score), 0)
+        {GRADED_FROM}
+        JOIN question_topics AS qt ON qt.question_id = q.id
+        {GRADED_WHERE}
+        GROUP BY qt.topic_id
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO question_choice_stats (question_id, choice, selections)
+        SELECT q.id, c.choice, COUNT(*)
+        {GRADED_FROM}
+        CROSS JOIN LATERAL (
+            SELECT DISTINCT upper(trim(part)) AS choice
+            FROM regexp_split_to_table(r.answer, ',') AS part
+        ) AS c
+        {GRADED_WHERE}
+          AND s.payload->>'qtype' IN ('single', 'multi')
+          AND c.choice <> '' AND length(c.choice) <= 16
+        GROUP BY q.id, c.choice
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("topic_stats")
+    op.drop_table("question_choice_stats")
+    op.drop_table("question_stats")
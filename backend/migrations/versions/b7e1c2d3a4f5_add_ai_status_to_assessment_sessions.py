@@ -0,0 +1,56 @@
+"""add ai feedback status to assessment_sessions
+
+Revision ID: b7e1c2d3a4f5
+Revises: 0ba445d7a031
+Create Date: 2025-10-27 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e1c2d3a4f5"
+down_revision: Union[str, Sequence[str], None] = "0ba445d7a031"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track background AI feedback generation per session."""
+    op.add_column(
+        "assessment_sessions",
+        sa.Column("ai_status", sa.String(length=16), nullable=True),
+    )
+    op.add_column(
+        "assessment_sessions",
+        sa.Column(
+            "ai_attempts",
+            sa.Integer(),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "assessment_sessions",
+        sa.Column("ai_updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_assessment_sessions_ai_status"),
+        "assessment_sessions",
+        ["ai_status"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop AI feedback status columns."""
+    op.drop_index(
+        op.f("ix_assessment_sessions_ai_status"), table_name="assessment_sessions"
+    )
+    op.drop_column("assessment_sessions", "ai_updated_at")
+    op.drop_column("assessment_sessions", "ai_attempts")
+    op.drop_column("assessment_sessions", "ai_status")
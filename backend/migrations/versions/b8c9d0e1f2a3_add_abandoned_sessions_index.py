@@ -0,0 +1,33 @@
+"""index assessment_sessions on (submitted_at, started_at) for the abandoned-session sweep
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2025-11-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c9d0e1f2a3"
+down_revision: Union[str, Sequence[str], None] = "a7b8c9d0e1f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index (submitted_at, started_at) so the sweeper finds old unsubmitted sessions cheaply."""
+    op.create_index(
+        "ix_assessment_sessions_abandoned",
+        "assessment_sessions",
+        ["submitted_at", "started_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the sweep index."""
+    op.drop_index("ix_assessment_sessions_abandoned", table_name="assessment_sessions")
@@ -0,0 +1,87 @@
+"""add topic_explanations for pre-generated explanations
+
+Revision ID: c3d4e5f6a7b8
+Revises: b7e1c2d3a4f5
+Create Date: 2025-10-28 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d4e5f6a7b8"
+down_revision: Union[str, Sequence[str], None] = "b7e1c2d3a4f5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store offline-generated /ai/explain payloads."""
+    op.create_table(
+        "topic_explanations",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column("topic_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("module_key", sa.String(length=255), nullable=False),
+        sa.Column("subtopic_key", sa.String(length=512), nullable=False),
+        sa.Column("level", sa.String(length=32), nullable=False),
+        sa.Column(
+            "known_points_hash",
+            sa.String(length=64),
+            server_default=sa.text("''"),
+            nullable=False,
+        ),
+        sa.Column(
+            "payload",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+        ),
+        sa.Column("model", sa.String(length=128), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["topic_id"],
+            ["learning_topics.id"],
+            name=op.f("fk_topic_explanations_topic_id_learning_topics"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_topic_explanations")),
+        sa.UniqueConstraint(
+            "module_key",
+            "subtopic_key",
+            "level",
+            "known_points_hash",
+            name="ux_topic_explanations_input",
+        ),
+    )
+    op.create_index(
+        op.f("ix_topic_explanations_topic_id"),
+        "topic_explanations",
+        ["topic_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop topic_explanations."""
+    op.drop_index(op.f("ix_topic_explanations_topic_id"), table_name="topic_explanations")
+    op.drop_table("topic_explanations")
@@ -0,0 +1,61 @@
+"""assessment_archive: compressed cold storage for old submitted sessions
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2025-11-19 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c9d0e1f2a3b4"
+down_revision: Union[str, Sequence[str], None] = "b8c9d0e1f2a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create assessment_archive; rows are moved in by scripts/archive_assessments.py."""
+    op.create_table(
+        "assessment_archive",
+        sa.Column("session_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("topic_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("total_score", sa.Numeric(), nullable=True),
+        sa.Column("question_count", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("format", sa.SmallInteger(), server_default=sa.text("1"), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"],
+            name=op.f("fk_assessment_archive_user_id_users"), ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("session_id", name=op.f("pk_assessment_archive")),
+    )
+    op.create_index(
+        "ix_assessment_archive_user_history",
+        "assessment_archive",
+        ["user_id", "kind", "started_at", "session_id"],
+        unique=False,
+    )
+    # payload 已是 gzip，不再让 TOAST 重复压缩
+    op.execute("ALTER TABLE assessment_archive ALTER COLUMN payload SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assessment_archive_user_history", table_name="assessment_archive")
+    op.drop_table("assessment_archive")
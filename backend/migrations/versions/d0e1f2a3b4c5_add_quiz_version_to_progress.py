@@ -0,0 +1,53 @@
+"""quiz_version on user_topic_progress; pending_quiz keeps item id references
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2025-11-20 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d0e1f2a3b4c5"
+down_revision: Union[str, Sequence[str], None] = "c9d0e1f2a3b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the CAS version column and shrink topic-quiz pending payloads to item ids."""
+    op.add_column(
+        "user_topic_progress",
+        sa.Column("quiz_version", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+    # {"session_id", "questions": [{item_id, order, ...}]} -> {"session_id", "item_ids": [...]}
+    op.execute(
+        """
+        UPDATE user_topic_progress
+        SET pending_quiz = jsonb_build_object(
+            'session_id', pending_quiz->'session_id',
+            'item_ids', COALESCE((
+                SELECT jsonb_agg(q->'item_id' ORDER BY (q->>'order')::int)
+                FROM jsonb_array_elements(pending_quiz->'questions') AS q
+            ), '[]'::jsonb)
+        )
+        WHERE jsonb_typeof(pending_quiz) = 'object' AND pending_quiz ? 'questions'
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the version column; pending topic quizzes in the new shape are reset."""
+    op.execute(
+        """
+        UPDATE user_topic_progress
+        SET pending_quiz = NULL, quiz_state = 'none'
+        WHERE jsonb_typeof(pending_quiz) = 'object' AND pending_quiz ? 'item_ids'
+        """
+    )
+    op.drop_column("user_topic_progress", "quiz_version")
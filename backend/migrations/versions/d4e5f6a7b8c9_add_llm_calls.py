@@ -0,0 +1,75 @@
+"""add llm_calls telemetry table and hourly rollup view
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2025-11-03 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e5f6a7b8c9"
+down_revision: Union[str, Sequence[str], None] = "c3d4e5f6a7b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Append-only per-call LLM telemetry plus an hourly rollup view."""
+    op.create_table(
+        "llm_calls",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("request_id", sa.String(length=64), nullable=True),
+        sa.Column("operation", sa.String(length=32), nullable=False),
+        sa.Column("model", sa.String(length=128), nullable=True),
+        sa.Column("prompt_tokens", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("completion_tokens", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("latency_ms", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("retries", sa.SmallInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("cache_hit", sa.Boolean(), server_default=sa.text("false"), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_llm_calls")),
+    )
+    op.create_index(op.f("ix_llm_calls_created_at"), "llm_calls", ["created_at"], unique=False)
+    op.create_index(op.f("ix_llm_calls_request_id"), "llm_calls", ["request_id"], unique=False)
+
+    op.execute(
+        """
+        CREATE VIEW llm_call_stats_hourly AS
+        SELECT
+            date_trunc('hour', created_at) AS bucket,
+            operation,
+            model,
+            count(*) AS calls,
+            count(*) FILTER (WHERE cache_hit) AS cache_hits,
+            count(*) FILTER (WHERE status <> 'ok') AS failures,
+            sum(retries) AS retries,
+            sum(prompt_tokens) AS prompt_tokens,
+            sum(completion_tokens) AS completion_tokens,
+            avg(latency_ms) FILTER (WHERE NOT cache_hit) AS avg_latency_ms,
+            percentile_cont(0.95) WITHIN GROUP (ORDER BY latency_ms)
+                FILTER (WHERE NOT cache_hit) AS p95_latency_ms,
+            max(latency_ms) AS max_latency_ms
+        FROM llm_calls
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the rollup view and llm_calls."""
+    op.execute("DROP VIEW IF EXISTS llm_call_stats_hourly")
+    op.drop_index(op.f("ix_llm_calls_request_id"), table_name="llm_calls")
+    op.drop_index(op.f("ix_llm_calls_created_at"), table_name="llm_calls")
+    op.drop_table("llm_calls")
@@ -0,0 +1,52 @@
+"""add question_count to assessment_sessions and a history index
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2025-11-10 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5f6a7b8c9d0"
+down_revision: Union[str, Sequence[str], None] = "d4e5f6a7b8c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store the item count on the session and index (user, kind, started_at, id)."""
+    op.add_column(
+        "assessment_sessions",
+        sa.Column("question_count", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+    # 回填已有会话
+    op.execute(
+        """
+        UPDATE assessment_sessions AS s
+        SET question_count = c.n
+        FROM (
+            SELECT session_id, COUNT(*) AS n
+            FROM assessment_items
+            GROUP BY session_id
+        ) AS c
+        WHERE c.session_id = s.id
+        """
+    )
+    op.create_index(
+        "ix_assessment_sessions_user_history",
+        "assessment_sessions",
+        ["user_id", "kind", "started_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the history index and the question_count column."""
+    op.drop_index("ix_assessment_sessions_user_history", table_name="assessment_sessions")
+    op.drop_column("assessment_sessions", "question_count")
@@ -0,0 +1,147 @@
+"""content-addressed question_snapshots referenced by assessment_items
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2025-11-14 09:00:00.000000
+
+"""
+
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f6a7b8c9d0e1"
+down_revision: Union[str, Sequence[str], None] = "e5f6a7b8c9d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH = 5000
+
+
+def _snapshot_hash(payload: dict) -> str:
+    # 与 app/repositories/question_snapshots.py 保持一致
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    """Move item snapshots into a deduplicated, insert-only table keyed by content hash."""
+    op.create_table(
+        "question_snapshots",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("hash", name=op.f("pk_question_snapshots")),
+    )
+    # 快照只插入不修改（审计回放）
+    op.execute(
+        """
+        CREATE FUNCTION question_snapshots_immutable() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'question_snapshots rows are immutable';
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_question_snapshots_immutable
+        BEFORE UPDATE ON question_snapshots
+        FOR EACH ROW EXECUTE FUNCTION question_snapshots_immutable()
+        """
+    )
+
+    op.add_column(
+        "assessment_items",
+        sa.Column("snapshot_hash", sa.String(length=64), nullable=True),
+    )
+
+    # 回填：分批读出旧快照，按内容哈希去重写入
+    bind = op.get_bind()
+    snapshots = sa.table(
+        "question_snapshots",
+        sa.column("hash", sa.String),
+        sa.column("payload", postgresql.JSONB),
+    )
+    items = sa.table(
+        "assessment_items",
+        sa.column("id", postgresql.UUID(as_uuid=True)),
+        sa.column("question_snapshot", postgresql.JSONB),
+        sa.column("snapshot_hash", sa.String),
+    )
+    last_id = None
+    while True:
+        query = sa.select(items.c.id, items.c.question_snapshot).order_by(items.c.id).limit(BATCH)
+        if last_id is not None:
+            query = query.where(items.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            break
+        hashes = {row.id: _snapshot_hash(row.question_snapshot or {}) for row in rows}
+        payloads = {hashes[row.id]: row.question_snapshot or {} for row in rows}
+        bind.execute(
+            postgresql.insert(snapshots)
+            .values([{"hash": h, "payload": p} for h, p in payloads.items()])
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+        bind.execute(
+            items.update()
+            .where(items.c.id == sa.bindparam("item_id"))
+            .values(snapshot_hash=sa.bindparam("hash")),
+            [{"item_id": item_id, "hash": h} for item_id, h in hashes.items()],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column("assessment_items", "snapshot_hash", nullable=False)
+    op.create_foreign_key(
+        op.f("fk_assessment_items_snapshot_hash_question_snapshots"),
+        "assessment_items",
+        "question_snapshots",
+        ["snapshot_hash"],
+        ["hash"],
+    )
+    op.create_index(
+        op.f("ix_assessment_items_snapshot_hash"),
+        "assessment_items",
+        ["snapshot_hash"],
+        unique=False,
+    )
+    op.drop_column("assessment_items", "question_snapshot")
+
+
+def downgrade() -> None:
+    """Copy snapshot content back onto assessment_items and drop question_snapshots."""
+    op.add_column(
+        "assessment_items",
+        sa.Column("question_snapshot", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+    op.execute(
+        """
+        UPDATE assessment_items AS i
+        SET question_snapshot = s.payload
+        FROM question_snapshots AS s
+        WHERE s.hash = i.snapshot_hash
+        """
+    )
+    op.alter_column("assessment_items", "question_snapshot", nullable=False)
+    op.drop_index(op.f("ix_assessment_items_snapshot_hash"), table_name="assessment_items")
+    op.drop_constraint(
+        op.f("fk_assessment_items_snapshot_hash_question_snapshots"),
+        "assessment_items",
+        type_="foreignkey",
+    )
+    op.drop_column("assessment_items", "snapshot_hash")
+    op.execute("DROP TRIGGER IF EXISTS trg_question_snapshots_immutable ON question_snapshots")
+    op.execute("DROP FUNCTION IF EXISTS question_snapshots_immutable()")
+    op.drop_table("question_snapshots")
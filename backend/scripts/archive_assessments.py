@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Move submitted assessments older than the retention window into assessment_archive.
+
+Each batch is rendered into the final per-question detail, gzip-compressed
+into ``assessment_archive`` and deleted from the hot tables in one
+transaction, so an interrupted run can simply be started again. History and
+detail endpoints keep serving archived sessions from the archive table.
+
+Usage:
+    cd backend
+    python scripts/archive_assessments.py --dry-run
+    python scripts/archive_assessments.py --retention-days 180 --batch-size 200
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config.config import (  # noqa: E402
+    ASSESSMENT_ARCHIVE_BATCH,
+    ASSESSMENT_ARCHIVE_RETENTION_DAYS,
+)
+from app.services.assessment_archive import AssessmentArchiver  # noqa: E402
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--retention-days", type=int, default=ASSESSMENT_ARCHIVE_RETENTION_DAYS,
+                        help="Archive sessions submitted more than this many days ago "
+                             "(default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=ASSESSMENT_ARCHIVE_BATCH,
+                        help="Sessions per transaction (default: %(default)s)")
+    parser.add_argument("--max-batches", type=int, default=None,
+                        help="Stop after this many batches (default: until done)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Build one batch and report its size without writing")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> int:
+    archiver = AssessmentArchiver(retention_days=args.retention_days, batch_size=args.batch_size)
+    report = await archiver.run(max_batches=args.max_batches, dry_run=args.dry_run)
+    print(json.dumps(report.as_dict()))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    return asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible fake chat-completions server for local load tests.
+
+Serves ``POST /v1/chat/completions`` (plain and ``stream=true`` SSE) with
+configurable latency, token rate and injected failures, so the /ai routes and
+the assessment feedback worker can be exercised without spending quota.
+Replies have the shape each caller expects: explain payloads for
+``explain_subtopic`` prompts, ``summary`` / ``suggested_actions`` JSON when
+``response_format`` asks for JSON, plain text otherwise.
+
+Usage:
+    cd backend
+    python scripts/fake_llm_server.py --port 9000 --latency-ms 800 --jitter-ms 200 \\
+        --tokens-per-second 60 --error-rate 0.02 --timeout-rate 0.01
+
+    # point the API (or scripts/pregenerate_explanations.py) at it
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+
+``GET /stats`` returns request / error counters; ``POST /config`` with a JSON
+body changes any of the knobs at runtime (e.g. ``{"latency_ms": 5000}``).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 500.0          # time to first token
+    jitter_ms: float = 100.0           # +/- uniform jitter on latency
+    tokens_per_second: float = 0.0     # 0 = whole completion at once
+    completion_tokens: int = 120
+    error_rate: float = 0.0            # fraction answered with HTTP 500
+    rate_limit_rate: float = 0.0       # fraction answered with HTTP 429
+    timeout_rate: float = 0.0          # fraction that hang for ``hang_seconds``
+    hang_seconds: float = 120.0
+    seed: int | None = None
+
+
+class FakeLLM:
+    def __init__(self, config: FakeConfig) -> None:
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0,
+                      "hung": 0, "streamed": 0, "inflight": 0, "max_inflight": 0}
+
+    # ------------------------------ content ------------------------------
+
+    @staticmethod
+    def _user_payload(body: dict) -> dict:
+        for message in reversed(body.get("messages") or []):
+            if message.get("role") == "user":
+                try:
+                    data = json.loads(message.get("content") or "")
+                    return data if isinstance(data, dict) else {}
+                except (TypeError, ValueError):
+                    return {}
+        return {}
+
+    def _words(self, n: int) -> list[str]:
+        vocab = ("board", "governance", "duty", "quorum", "risk", "member", "policy",
+                 "director", "minutes", "conflict", "charity", "oversight")
+        return [self.rng.choice(vocab) for _ in range(max(1, n))]
+
+    def reply_text(self, body: dict) -> str:
+        n = self.config.completion_tokens
+        user = self._user_payload(body)
+        if user.get("task") == "explain_subtopic":
+            subtopic = user.get("subtopic", "topic")
+            return json.dumps({
+                "outline": [f"{subtopic}: overview", f"{subtopic}: in practice"],
+                "explanation": " ".join(self._words(n)),
+                "checklist": ["Review the key duties", "Check the constitution"],
+            })
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            return json.dumps({
+                "summary": " ".join(self._words(min(n, 50))),
+                "suggested_actions": ["Revisit the weakest topic.", "Practise one quiz a day."],
+            })
+        return " ".join(self._words(n))
+
+    # ------------------------------ handlers -----------------------------
+
+    async def _sleep_latency(self) -> None:
+        c = self.config
+        delay = max(0.0, c.latency_ms + self.rng.uniform(-c.jitter_ms, c.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+    def _error(self, status: int, message: str) -> JSONResponse:
+        return JSONResponse(
+            {"error": {"message": message, "type": "fake_error", "code": status}},
+            status_code=status,
+        )
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        c = self.config
+        self.stats["requests"] += 1
+        self.stats["inflight"] += 1
+        self.stats["max_inflight"] = max(self.stats["max_inflight"], self.stats["inflight"])
+        try:
+            roll = self.rng.random()
+            if roll < c.timeout_rate:
+                self.stats["hung"] += 1
+                await asyncio.sleep(c.hang_seconds)
+                return self._error(504, "fake upstream hang")
+            roll -= c.timeout_rate
+            if roll < c.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return self._error(429, "fake rate limit")
+            roll -= c.rate_limit_rate
+            if roll < c.error_rate:
+                self.stats["errors"] += 1
+                await self._sleep_latency()
+                return self._error(500, "fake server error")
+
+            await self._sleep_latency()
+            text = self.reply_text(body)
+            model = body.get("model", "fake-model")
+            prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages") or []) // 4
+            if body.get("stream"):
+                self.stats["streamed"] += 1
+                return StreamingResponse(
+                    self._stream(model, text), media_type="text/event-stream"
+                )
+            tokens = text.split(" ")
+            if c.tokens_per_second > 0:
+                await asyncio.sleep(len(tokens) / c.tokens_per_second)
+            self.stats["ok"] += 1
+            return JSONResponse({
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": text},
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                },
+            })
+        finally:
+            self.stats["inflight"] -= 1
+
+    async def _stream(self, model: str, text: str):
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        interval = 1 / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0
+        words = text.split(" ")
+        for idx, word in enumerate(words):
+            delta = {"content": word if idx == 0 else " " + word}
+            if idx == 0:
+                delta["role"] = "assistant"
+            chunk = {"id": chunk_id, "object": "chat.completion.chunk", "created": created,
+                     "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if interval:
+                await asyncio.sleep(interval)
+        done = {"id": chunk_id, "object": "chat.completion.chunk", "created": created,
+                "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        yield f"data: {json.dumps(done)}\n\n"
+        yield "data: [DONE]\n\n"
+        self.stats["ok"] += 1
+
+    async def models(self, request: Request):
+        return JSONResponse({"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+
+    async def get_stats(self, request: Request):
+        return JSONResponse({"stats": self.stats, "config": asdict(self.config)})
+
+    async def set_config(self, request: Request):
+        changes = await request.json()
+        known = {f.name for f in fields(FakeConfig)}
+        for key, value in changes.items():
+            if key in known:
+                setattr(self.config, key, value)
+        return JSONResponse(asdict(self.config))
+
+
+def create_app(config: FakeConfig | None = None) -> Starlette:
+    fake = FakeLLM(config or FakeConfig())
+    app = Starlette(routes=[
+        Route("/v1/chat/completions", fake.chat_completions, methods=["POST"]),
+        Route("/v1/models", fake.models, methods=["GET"]),
+        Route("/stats", fake.get_stats, methods=["GET"]),
+        Route("/config", fake.set_config, methods=["POST"]),
+    ])
+    app.state.fake = fake
+    return app
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible fake LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Generation speed; 0 returns the completion at once")
+    parser.add_argument("--completion-tokens", type=int, default=120)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500s")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of HTTP 429s")
+    parser.add_argument("--timeout-rate", type=float, default=0.0,
+                        help="Fraction of requests that hang for --hang-seconds")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    import uvicorn
+
+    args = parse_args(argv)
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
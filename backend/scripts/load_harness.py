@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Throughput / tail-latency harness for the AI routes.
+
+Drives ``POST /ai/ask``, ``POST /ai/explain`` and the global assessment flow
+(start -> answer every item -> submit) at a fixed concurrency and reports
+requests/s, p50/p95/p99 latency, status codes and event-loop blocking.
+
+By default the app runs in-process (``httpx.ASGITransport`` + the app
+lifespan), so a ticker on the same event loop measures how long request
+handling blocks the loop. With ``--target`` it drives a running server
+instead; loop lag then only covers the harness itself.
+
+Pair it with ``scripts/fake_llm_server.py`` so no real quota is spent:
+
+    cd backend
+    python scripts/fake_llm_server.py --port 9000 --latency-ms 800 &
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 OPENAI_API_KEY=fake \\
+        python scripts/load_harness.py --scenarios ask,explain --concurrency 32 --duration 30
+
+    # include the assessment flow (needs a user's access token)
+    python scripts/load_harness.py --scenarios assessment --token "$TOKEN" --requests 50
+
+    # against a deployed instance
+    python scripts/load_harness.py --target http://127.0.0.1:8000 --scenarios ask --duration 60
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import math
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SCENARIOS = ("ask", "explain", "assessment")
+LEVELS = ("beginner", "intermediate", "advanced")
+QUESTIONS = (
+    "What does a quorum mean?",
+    "How should a trustee declare a conflict of interest?",
+    "What is the difference between governance and management in a small charity, "
+    "and how should the board avoid drifting into operational decisions?",
+)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Results:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+
+    def add(self, name: str, seconds: float, status: int | str) -> None:
+        self.latencies[name].append(seconds)
+        self.statuses[name][str(status)] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        out = {}
+        for name, values in sorted(self.latencies.items()):
+            statuses = self.statuses[name]
+            ok = sum(n for code, n in statuses.items() if code.startswith("2"))
+            out[name] = {
+                "count": len(values),
+                "ok": ok,
+                "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(max(values) * 1000, 1),
+                "statuses": dict(statuses),
+            }
+        return out
+
+
+class LoopLagMonitor:
+    """Sleeps ``interval`` in a loop and records how late each wake-up is."""
+
+    def __init__(self, interval: float = 0.01, stall_threshold: float = 0.05) -> None:
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    def summary(self) -> dict:
+        stalls = [lag for lag in self.lags if lag >= self.stall_threshold]
+        return {
+            "samples": len(self.lags),
+            "p99_ms": round(percentile(self.lags, 99) * 1000, 1),
+            "max_ms": round(max(self.lags, default=0.0) * 1000, 1),
+            "stalls_over_threshold": len(stalls),
+            "stalled_seconds": round(sum(stalls), 3),
+            "threshold_ms": self.stall_threshold * 1000,
+        }
+
+
+class Harness:
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace) -> None:
+        self.client = client
+        self.args = args
+        self.results = Results()
+        self._seq = itertools.count()
+
+    async def _timed(self, name: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.results.add(name, time.perf_counter() - started, type(exc).__name__)
+            return None
+        self.results.add(name, time.perf_counter() - started, resp.status_code)
+        return resp
+
+    async def ask(self, n: int) -> None:
+        await self._timed("ask", "POST", "/ai/ask", json={
+            "question": QUESTIONS[n % len(QUESTIONS)],
+            "level": LEVELS[n % len(LEVELS)],
+        })
+
+    async def explain(self, n: int) -> None:
+        # --explain-unique 避开预生成结果，测实时生成路径
+        subtopic = f"board_roles_{n}" if self.args.explain_unique else "board_roles"
+        await self._timed("explain", "POST", "/ai/explain", json={
+            "module_id": "governance_basics",
+            "subtopic": subtopic,
+            "known_points": [],
+            "level": LEVELS[n % len(LEVELS)],
+        })
+
+    async def assessment(self, n: int) -> None:
+        headers = {"Authorization": f"Bearer {self.args.token}"}
+        started = time.perf_counter()
+        resp = await self._timed("assessment_start", "POST", "/api/v1/assessments/global/start",
+                                 json={"count": self.args.assessment_count}, headers=headers)
+        if resp is None or resp.status_code != 200:
+            return
+        data = resp.json()["data"]
+        session_id = data["session_id"]
+        for item in data["items"]:
+            qtype = item["snapshot"]["qtype"]
+            await self._timed("assessment_answer", "POST", f"/api/v1/assessments/{session_id}/answer",
+                              json={"item_id": item["item_id"], "answer": "A" if qtype != "short" else "n/a"},
+                              headers=headers)
+        resp = await self._timed("assessment_submit", "POST",
+                                 f"/api/v1/assessments/{session_id}/submit?force=true", headers=headers)
+        if resp is not None:
+            self.results.add("assessment_flow", time.perf_counter() - started, resp.status_code)
+
+    async def worker(self, scenarios: list[str], deadline: float | None, budget: list[int]) -> None:
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if deadline is None:
+                if budget[0] <= 0:
+                    return
+                budget[0] -= 1
+            n = next(self._seq)
+            await getattr(self, scenarios[n % len(scenarios)])(n)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load harness for the /ai routes")
+    parser.add_argument("--target", default=None,
+                        help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--scenarios", default="ask,explain",
+                        help=f"Comma separated, from {', '.join(SCENARIOS)} (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to run")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Total scenario runs when --duration is not given")
+    parser.add_argument("--token", default=None, help="Bearer token for the assessment scenario")
+    parser.add_argument("--assessment-count", type=int, default=5)
+    parser.add_argument("--explain-unique", action="store_true",
+                        help="Unique subtopic per request (bypass pre-generated explanations)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--stall-ms", type=float, default=50.0,
+                        help="Loop lag counted as a stall (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args(argv)
+
+
+@contextlib.asynccontextmanager
+async def open_client(args: argparse.Namespace):
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    if args.target:
+        async with httpx.AsyncClient(base_url=args.target, timeout=timeout, limits=limits) as client:
+            yield client
+        return
+
+    from app.main import app  # imported lazily: --target needs no app config
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://harness", timeout=timeout) as client:
+            yield client
+
+
+async def run(args: argparse.Namespace) -> dict:
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if "assessment" in scenarios and not args.token:
+        raise SystemExit("the assessment scenario needs --token")
+
+    monitor = LoopLagMonitor(stall_threshold=args.stall_ms / 1000)
+    async with open_client(args) as client:
+        harness = Harness(client, args)
+        monitor.start()
+        started = time.perf_counter()
+        deadline = started + args.duration if args.duration else None
+        budget = [args.requests]
+        await asyncio.gather(*(
+            harness.worker(scenarios, deadline, budget) for _ in range(max(1, args.concurrency))
+        ))
+        elapsed = time.perf_counter() - started
+        await monitor.stop()
+
+    return {
+        "mode": "remote" if args.target else "in-process",
+        "concurrency": args.concurrency,
+        "elapsed_seconds": round(elapsed, 2),
+        "routes": harness.results.summary(elapsed),
+        "event_loop_lag": monitor.summary(),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"mode={report['mode']} concurrency={report['concurrency']} "
+          f"elapsed={report['elapsed_seconds']}s")
+    print(f"{'route':<20}{'count':>7}{'ok':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  statuses")
+    for name, row in report["routes"].items():
+        print(f"{name:<20}{row['count']:>7}{row['ok']:>7}{row['rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}  {row['statuses']}")
+    lag = report["event_loop_lag"]
+    scope = "app + harness" if report["mode"] == "in-process" else "harness only"
+    print(f"\nevent loop lag ({scope}): p99={lag['p99_ms']}ms max={lag['max_ms']}ms "
+          f"stalls>={lag['threshold_ms']:.0f}ms: {lag['stalls_over_threshold']} "
+          f"({lag['stalled_seconds']}s total)")
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Pre-generate /ai/explain payloads for every active topic × level.
+
+Results are upserted into ``topic_explanations``; the explain endpoint serves
+those rows directly and only calls the model for inputs it has not seen.
+Progress is appended to a JSONL checkpoint so an interrupted run resumes
+where it stopped.
+
+Usage:
+    cd backend
+    python scripts/pregenerate_explanations.py --concurrency 4
+    # against a local OpenAI-compatible fake server
+    python scripts/pregenerate_explanations.py --base-url http://127.0.0.1:9000/v1 --api-key test
+
+Stored inputs are ``module_id = str(module.id)``, ``subtopic = topic.name``
+and empty ``known_points``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import UUID
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select  # noqa: E402
+
+from app.core.config.config import EXPLAIN_MODEL, OPENAI_BASE_URL  # noqa: E402
+from app.core.db.db import AsyncSessionLocal  # noqa: E402
+from app.models.content import LearningTopic, Module  # noqa: E402
+from app.repositories import explanations as explanations_repo  # noqa: E402
+from app.services.llm.prompts import (  # noqa: E402
+    EXPLAIN_TEMPERATURE,
+    build_explain_messages,
+    parse_explain_response,
+)
+from app.services.llm.telemetry import llm_telemetry, usage_tokens  # noqa: E402
+
+logger = logging.getLogger("pregenerate_explanations")
+
+DEFAULT_LEVELS = ("beginner", "intermediate", "advanced")
+DEFAULT_CHECKPOINT = Path(__file__).parent / ".pregenerate_explanations.jsonl"
+
+
+@dataclass(frozen=True)
+class Job:
+    topic_id: UUID
+    module_id: str
+    subtopic: str
+    level: str
+
+    @property
+    def key(self) -> explanations_repo.ExplanationKey:
+        return explanations_repo.explanation_key(self.module_id, self.subtopic, self.level, [])
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--levels", default=",".join(DEFAULT_LEVELS),
+                        help="Comma separated levels (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Max in-flight model calls (default: %(default)s)")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT,
+                        help="JSONL progress file used to resume (default: %(default)s)")
+    parser.add_argument("--base-url", default=OPENAI_BASE_URL,
+                        help="OpenAI-compatible base URL, e.g. a local fake server")
+    parser.add_argument("--api-key", default=os.getenv("OPENAI_API_KEY"),
+                        help="API key (defaults to OPENAI_API_KEY)")
+    parser.add_argument("--model", default=EXPLAIN_MODEL)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--retries", type=int, default=3, help="Attempts per job")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate rows that already exist")
+    parser.add_argument("--limit", type=int, default=None, help="Only process N jobs")
+    parser.add_argument("--dry-run", action="store_true", help="List jobs without calling the model")
+    return parser.parse_args(argv)
+
+
+async def load_jobs(levels: list[str]) -> list[Job]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(LearningTopic.id, LearningTopic.name, Module.id)
+            .join(Module, LearningTopic.module_id == Module.id)
+            .where(LearningTopic.is_active.is_(True))
+            .order_by(Module.sort_order, LearningTopic.sort_order)
+        )
+        rows = result.all()
+    return [
+        Job(topic_id=topic_id, module_id=str(module_id), subtopic=name, level=level)
+        for topic_id, name, module_id in rows
+        for level in levels
+    ]
+
+
+def read_checkpoint(path: Path) -> set[str]:
+    done: set[str] = set()
+    if not path.exists():
+        return done
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line from an interrupted run
+            if record.get("status") == "done":
+                done.add(record["key"])
+    return done
+
+
+class Checkpoint:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("a", encoding="utf-8")
+
+    def record(self, job: Job, status: str, **extra) -> None:
+        entry = {"key": job.key.as_str(), "topic_id": str(job.topic_id),
+                 "level": job.level, "status": status, "ts": time.time(), **extra}
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+async def generate(client, job: Job, *, model: str, retries: int) -> dict:
+    delay = 1.0
+    for attempt in range(1, retries + 1):
+        started = time.perf_counter()
+        try:
+            resp = await client.chat.completions.create(
+                model=model,
+                messages=build_explain_messages(job.module_id, job.subtopic, [], job.level),
+                temperature=EXPLAIN_TEMPERATURE,
+            )
+            prompt_tokens, completion_tokens = usage_tokens(resp)
+            llm_telemetry.record(
+                "explain_pregen",
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                latency_ms=int((time.perf_counter() - started) * 1000),
+                retries=attempt - 1,
+            )
+            text = resp.choices[0].message.content.strip()
+            return parse_explain_response(text, job.module_id, job.subtopic)
+        except Exception as exc:
+            if attempt == retries:
+                llm_telemetry.record(
+                    "explain_pregen",
+                    status="error",
+                    model=model,
+                    latency_ms=int((time.perf_counter() - started) * 1000),
+                    retries=attempt - 1,
+                )
+                raise
+            logger.warning("%s (%s) attempt %d failed: %s", job.subtopic, job.level, attempt, exc)
+            await asyncio.sleep(delay)
+            delay *= 2
+    raise RuntimeError("unreachable")
+
+
+async def run(args: argparse.Namespace) -> int:
+    levels = [lvl.strip() for lvl in args.levels.split(",") if lvl.strip()]
+    jobs = await load_jobs(levels)
+
+    done = read_checkpoint(args.checkpoint)
+    if not args.force:
+        async with AsyncSessionLocal() as db:
+            done |= await explanations_repo.list_existing_keys(db)
+        jobs = [job for job in jobs if job.key.as_str() not in done]
+    if args.limit is not None:
+        jobs = jobs[: args.limit]
+
+    logger.info("%d jobs to run (concurrency=%d)", len(jobs), args.concurrency)
+    if args.dry_run or not jobs:
+        for job in jobs:
+            print(f"{job.level:<12} {job.subtopic}")
+        return 0
+
+    from openai import AsyncOpenAI  # imported lazily: --dry-run needs no SDK
+
+    client = AsyncOpenAI(
+        api_key=args.api_key or "unused",
+        base_url=args.base_url,
+        timeout=args.timeout,
+        max_retries=0,
+    )
+    checkpoint = Checkpoint(args.checkpoint)
+    queue: asyncio.Queue[Job] = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    stats = {"done": 0, "failed": 0}
+    started = time.perf_counter()
+
+    async def worker() -> None:
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                payload = await generate(client, job, model=args.model, retries=args.retries)
+                async with AsyncSessionLocal() as db:
+                    await explanations_repo.upsert_explanation(
+                        db, key=job.key, payload=payload, topic_id=job.topic_id, model=args.model
+                    )
+                    await db.commit()
+                checkpoint.record(job, "done")
+                stats["done"] += 1
+            except Exception as exc:
+                checkpoint.record(job, "failed", error=str(exc)[:500])
+                stats["failed"] += 1
+                logger.error("%s (%s) failed: %s", job.subtopic, job.level, exc)
+            finally:
+                total = stats["done"] + stats["failed"]
+                if total % 10 == 0 or total == len(jobs):
+                    logger.info("progress %d/%d", total, len(jobs))
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, args.concurrency))))
+    finally:
+        checkpoint.close()
+        await client.close()
+        await llm_telemetry.flush()
+
+    elapsed = time.perf_counter() - started
+    logger.info("finished: %d done, %d failed in %.1fs", stats["done"], stats["failed"], elapsed)
+    return 1 if stats["failed"] else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    return asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
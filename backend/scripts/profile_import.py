@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Profile the import cost of ``app.main`` (cold start of an API worker).
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter and
+prints the slowest modules by cumulative time, so regressions such as an SDK
+pulled in at import time are easy to spot.
+
+Usage:
+    cd backend
+    python scripts/profile_import.py --top 25
+    python scripts/profile_import.py --module app.api.routes.assessment
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def profile(module: str) -> list[tuple[int, int, str]]:
+    """Return ``(self_us, cumulative_us, name)`` rows from ``-X importtime``."""
+    env = dict(os.environ)
+    env.setdefault("PYTHONPATH", str(BACKEND_DIR))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows: list[tuple[int, int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+        except ValueError:
+            continue
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile import time of the API app")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20, help="Rows to show (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    rows = profile(args.module)
+    total = next((cum for _, cum, name in rows if name.strip() == args.module), 0)
+    print(f"{args.module}: {total / 1000:.1f} ms cumulative ({len(rows)} modules)\n")
+    print(f"{'self ms':>9} {'cum ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[: args.top]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
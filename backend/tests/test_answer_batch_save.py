@@ -0,0 +1,86 @@
+import os
+import unittest
+import uuid
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from pydantic import ValidationError  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models.assessment import (  # noqa: E402
+    AssessmentItem,
+    AssessmentResponse,
+    QuestionSnapshotRecord,
+)
+from app.repositories import assessment_items as items_repo  # noqa: E402
+from app.repositories import assessment_responses as responses_repo  # noqa: E402
+from app.schemas.assessment import AnswerBatchSaveIn, QuestionDTO  # noqa: E402
+
+
+class AnswerBatchSaveTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            for model in (QuestionSnapshotRecord, AssessmentItem, AssessmentResponse):
+                await conn.run_sync(model.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        self.session_id = uuid.uuid4()
+        questions = [
+            QuestionDTO(id=uuid.uuid4(), qtype=qtype, stem=f"{qtype}?", choices=["A. x", "B. y"])
+            for qtype in ("single", "multi", "short")
+        ]
+        async with self.Session() as db:
+            self.items = await items_repo.create_items_batch(
+                db, session_id=self.session_id, questions=questions
+            )
+            await db.commit()
+
+    async def asyncTearDown(self) -> None:
+        await self.engine.dispose()
+
+    async def test_item_ownership_checked_in_one_query(self) -> None:
+        foreign = uuid.uuid4()
+        async with self.Session() as db:
+            qtypes = await items_repo.get_session_item_qtypes(
+                db, self.session_id, [item.id for item in self.items] + [foreign]
+            )
+            other = await items_repo.get_session_item_qtypes(db, uuid.uuid4(), [self.items[0].id])
+        self.assertEqual(list(qtypes.values()), ["single", "multi", "short"])
+        self.assertNotIn(foreign, qtypes)
+        self.assertEqual(other, {})
+
+    async def test_single_upsert_shares_bulk_path(self) -> None:
+        single, multi, _ = self.items
+        async with self.Session() as db:
+            await responses_repo.upsert_answers_bulk(
+                db, session_id=self.session_id, answers={single.id: "A", multi.id: "A,B"}
+            )
+            await db.commit()
+            response = await responses_repo.upsert_response(
+                db, session_id=self.session_id, item_id=single.id, answer="B"
+            )
+            await db.commit()
+            self.assertEqual(response.answer, "B")
+            count = await db.scalar(select(func.count()).select_from(AssessmentResponse))
+        self.assertEqual(count, 2)
+
+    def test_batch_payload_last_entry_wins(self) -> None:
+        item = uuid.uuid4()
+        payload = AnswerBatchSaveIn(
+            answers=[
+                {"item_id": item, "answer": "A", "last_question_index": 2},
+                {"item_id": uuid.uuid4(), "answer": "B"},
+                {"item_id": item, "answer": " C "},
+            ]
+        )
+        self.assertEqual(payload.answer_map()[item], "C")
+        self.assertEqual(payload.last_question_index(), 2)
+        with self.assertRaises(ValidationError):
+            AnswerBatchSaveIn(answers=[])
+
+
+if __name__ == "__main__":
+    unittest.main()
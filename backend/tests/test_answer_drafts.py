@@ -0,0 +1,259 @@
+import os
+import unittest
+import uuid
+from unittest import mock
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models.assessment import AssessmentResponse  # noqa: E402
+from app.services import answer_drafts as drafts_module  # noqa: E402
+from app.services.answer_drafts import (  # noqa: E402
+    DIRTY_SESSIONS_KEY,
+    SAVE_SCRIPT,
+    AnswerDraftStore,
+    DraftSaveRejected,
+)
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the draft store; scripts are emulated in Python."""
+
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    def register_script(self, source):
+        return self._save if source == SAVE_SCRIPT else self._take
+
+    async def _save(self, keys, args):
+        meta_key, answers_key, dirty_key, sessions_key = keys
+        user, last, _ttl, session_id, *pairs = args
+        answers = dict(zip(pairs[::2], pairs[1::2]))
+        meta = self.data.get(meta_key)
+        if meta is None:
+            return ["miss"]
+        if meta["user"] != user:
+            return ["forbidden"]
+        if meta["submitted"] != "0":
+            return ["submitted"]
+        if any(f"item:{item_id}" not in meta for item_id in answers):
+            return ["item_not_found"]
+        self.data.setdefault(answers_key, {}).update(answers)
+        self.data.setdefault(dirty_key, set()).update(answers)
+        self.data.setdefault(sessions_key, set()).add(session_id)
+        if last != "":
+            meta["last"] = last
+        return ["ok", str(len(self.data[answers_key])), meta["total"], meta["last"]]
+
+    async def _take(self, keys):
+        dirty_key, answers_key = keys
+        ids = self.data.pop(dirty_key, set())
+        answers = self.data.get(answers_key, {})
+        out = []
+        for item_id in ids:
+            out += [item_id, answers.get(item_id, "")]
+        return out
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def expire(self, key, ttl):
+        return True
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        target = self.data.setdefault(key, {})
+        if mapping:
+            target.update(mapping)
+        if field is not None:
+            target[field] = value
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def hmget(self, key, *fields):
+        target = self.data.get(key, {})
+        return [target.get(f) for f in fields]
+
+    async def hlen(self, key):
+        return len(self.data.get(key, {}))
+
+    async def hkeys(self, key):
+        return list(self.data.get(key, {}))
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    async def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(members)
+
+    async def spop(self, key, count):
+        members = self.data.get(key, set())
+        return [members.pop() for _ in range(min(count, len(members)))]
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append(getattr(self.redis, name)(*args, **kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        return [await call for call in self.calls]
+
+
+class AnswerDraftStoreTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(AssessmentResponse.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        self.redis = FakeRedis()
+        self.store = AnswerDraftStore(ttl_seconds=60)
+        self.store.bind_redis(self.redis)
+        self.session_id, self.user_id = uuid.uuid4(), uuid.uuid4()
+        self.single, self.multi = uuid.uuid4(), uuid.uuid4()
+        await self.store.prime(
+            self.session_id,
+            user_id=self.user_id,
+            items=[(self.single, "single"), (self.multi, "multi")],
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.engine.dispose()
+
+    async def _save(self, item_id, answer, **kwargs):
+        return await self.store.save(
+            self.session_id, user_id=kwargs.pop("user_id", self.user_id),
+            answers={item_id: answer}, **kwargs
+        )
+
+    async def test_save_tracks_progress_and_rejects(self) -> None:
+        progress = await self._save(self.single, "b", last_question_index=1)
+        self.assertEqual((progress.answered, progress.total, progress.last_question_index), (1, 2, 1))
+        progress = await self._save(self.single, "c")
+        self.assertEqual((progress.answered, progress.last_question_index), (1, 1))
+
+        with self.assertRaises(DraftSaveRejected) as ctx:
+            await self._save(self.single, "a", user_id=uuid.uuid4())
+        self.assertEqual(ctx.exception.reason, "forbidden")
+        with self.assertRaises(DraftSaveRejected) as ctx:
+            await self.store.save(
+                self.session_id, user_id=self.user_id, answers={self.multi: "a", uuid.uuid4(): "a"}
+            )
+        self.assertEqual(ctx.exception.reason, "item_not_found")
+        self.assertNotIn(str(self.multi), self.redis.data[f"assess:{self.session_id}:answers"])
+
+        await self.store.set_submitted(self.session_id, True)
+        with self.assertRaises(DraftSaveRejected) as ctx:
+            await self._save(self.single, "a")
+        self.assertEqual(ctx.exception.reason, "submitted")
+
+        self.assertIsNone(
+            await self.store.save(uuid.uuid4(), user_id=self.user_id, answers={self.single: "a"})
+        )
+
+    async def test_flush_writes_changed_drafts_in_one_upsert(self) -> None:
+        await self.store.save(
+            self.session_id, user_id=self.user_id, answers={self.single: "b", self.multi: "c, a"}
+        )
+
+        with mock.patch.object(drafts_module.sessions_repo, "update_last_question_index", mock.AsyncMock()):
+            async with self.Session() as db:
+                self.assertEqual(await self.store.flush(db, self.session_id), 2)
+                await db.commit()
+            # 无新改动时不再写库
+            async with self.Session() as db:
+                self.assertEqual(await self.store.flush(db, self.session_id), 0)
+
+            await self._save(self.single, "a")
+            async with self.Session() as db:
+                self.assertEqual(await self.store.flush(db, self.session_id), 1)
+                await db.commit()
+
+        async with self.Session() as db:
+            rows = (await db.execute(select(AssessmentResponse.item_id, AssessmentResponse.answer))).all()
+        self.assertEqual(dict(rows), {self.single: "A", self.multi: "A,C"})
+
+    async def test_submit_flush_writes_drafts_taken_by_inflight_flush(self) -> None:
+        await self._save(self.single, "b")
+        # 后台 flusher 已取走 dirty 集合但尚未提交
+        await self.redis._take([f"assess:{self.session_id}:dirty", f"assess:{self.session_id}:answers"])
+        await self._save(self.multi, "a")
+
+        lock = mock.AsyncMock(return_value=1)
+        with mock.patch.object(drafts_module.sessions_repo, "update_last_question_index", lock):
+            async with self.Session() as db:
+                self.assertEqual(await self.store.flush(db, self.session_id, full=True), 2)
+                await db.commit()
+        self.assertTrue(lock.await_args.kwargs["open_only"])
+        self.assertNotIn(f"assess:{self.session_id}:dirty", self.redis.data)
+
+        # 输掉行锁竞争的 flush（会话已提交）不再写库
+        await self._save(self.single, "c")
+        with mock.patch.object(
+            drafts_module.sessions_repo, "update_last_question_index", mock.AsyncMock(return_value=0)
+        ):
+            async with self.Session() as db:
+                self.assertEqual(await self.store.flush(db, self.session_id), 0)
+                await db.commit()
+
+        async with self.Session() as db:
+            rows = (await db.execute(select(AssessmentResponse.item_id, AssessmentResponse.answer))).all()
+        self.assertEqual(dict(rows), {self.single: "B", self.multi: "A"})
+
+    async def test_flusher_requeues_drafts_when_commit_fails(self) -> None:
+        await self._save(self.single, "b")
+
+        class _FailingSession:
+            def __init__(self, real) -> None:
+                self.real = real
+
+            async def __aenter__(self):
+                self.db = await self.real.__aenter__()
+                self.db.commit = mock.AsyncMock(side_effect=RuntimeError("commit failed"))
+                return self.db
+
+            async def __aexit__(self, *exc):
+                return await self.real.__aexit__(*exc)
+
+        with mock.patch.object(
+            drafts_module.sessions_repo, "update_last_question_index", mock.AsyncMock(return_value=1)
+        ), mock.patch.object(
+            drafts_module.db_module, "AsyncSessionLocal", lambda: _FailingSession(self.Session())
+        ):
+            self.assertEqual(await self.store.flush_pending(), 0)
+
+        self.assertEqual(self.redis.data[f"assess:{self.session_id}:dirty"], {str(self.single)})
+        self.assertIn(str(self.session_id), self.redis.data[DIRTY_SESSIONS_KEY])
+
+    async def test_reopen_marks_drafts_dirty_again(self) -> None:
+        await self._save(self.single, "b")
+        await self.store.set_submitted(self.session_id, True)
+        await self.redis._take([f"assess:{self.session_id}:dirty", f"assess:{self.session_id}:answers"])
+
+        await self.store.reopen(self.session_id)
+
+        self.assertIn(str(self.session_id), self.redis.data[DIRTY_SESSIONS_KEY])
+        self.assertEqual(self.redis.data[f"assess:{self.session_id}:dirty"], {str(self.single)})
+        self.assertIsNotNone(await self._save(self.multi, "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
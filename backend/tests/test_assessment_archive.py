@@ -0,0 +1,132 @@
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.config.config import ASSESSMENT_ARCHIVE_RETENTION_DAYS  # noqa: E402
+from app.models.archive import AssessmentArchive  # noqa: E402
+from app.models.assessment import AssessmentSession  # noqa: E402
+from app.repositories import assessment_archive as archive_repo  # noqa: E402
+from app.schemas.assessment import AssessmentDetailOut  # noqa: E402
+from app.services.old.assessment_service import AssessmentService  # noqa: E402
+
+
+class AssessmentArchiveTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            for model in (AssessmentArchive, AssessmentSession):
+                await conn.run_sync(model.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.user_id = uuid.uuid4()
+        self.base = datetime(2025, 1, 1)
+
+    async def asyncTearDown(self) -> None:
+        await self.engine.dispose()
+
+    def _detail(self, session_id, started_at) -> dict:
+        return AssessmentDetailOut.model_validate(
+            {
+                "session": {
+                    "session_id": str(session_id),
+                    "kind": "global",
+                    "started_at": started_at.isoformat(),
+                    "submitted_at": started_at.isoformat(),
+                    "total_score": 50.0,
+                    "ai_summary": "总结",
+                    "ai_status": "ready",
+                },
+                "items": [
+                    {
+                        "order_no": 1,
+                        "snapshot": {"qtype": "single", "stem": "Q1", "choices": ["a", "b"]},
+                        "response": None,
+                    }
+                ],
+            }
+        ).model_dump(mode="json")
+
+    def _row(self, started_at) -> dict:
+        session = SimpleNamespace(
+            id=uuid.uuid4(),
+            user_id=self.user_id,
+            kind="global",
+            topic_id=None,
+            started_at=started_at,
+            submitted_at=started_at,
+            total_score=50.0,
+            question_count=1,
+        )
+        return archive_repo.archive_row(session, self._detail(session.id, started_at))
+
+    async def test_payload_round_trips_through_the_archive(self) -> None:
+        rows = [self._row(self.base + timedelta(days=day)) for day in range(3)]
+        async with self.Session() as db:
+            await archive_repo.insert_archived(db, rows)
+            await archive_repo.insert_archived(db, rows[:1])  # 重复执行幂等
+            await db.commit()
+
+        async with self.Session() as db:
+            archived = await archive_repo.get_archived(db, rows[0]["session_id"])
+            detail = AssessmentDetailOut.model_validate(
+                archive_repo.unpack(archived.payload, archived.format)
+            )
+        self.assertEqual(detail.session.session_id, rows[0]["session_id"])
+        self.assertEqual(detail.session.ai_summary, "总结")
+        self.assertEqual(detail.items[0].snapshot.stem, "Q1")
+
+    async def test_history_merges_hot_and_archived_rows(self) -> None:
+        archived = [self._row(self.base + timedelta(days=day)) for day in (0, 2, 4)]
+        hot = [
+            AssessmentSession(
+                user_id=self.user_id,
+                kind="global",
+                started_at=self.base + timedelta(days=day),
+                submitted_at=self.base + timedelta(days=day),
+                question_count=1,
+            )
+            for day in (1, 3)
+        ]
+        async with self.Session() as db:
+            await archive_repo.insert_archived(db, archived)
+            db.add_all(hot)
+            # 未提交的会话不计入历史
+            db.add(AssessmentSession(user_id=self.user_id, kind="global", started_at=self.base))
+            await db.commit()
+
+        newest_first = [
+            archived[2]["session_id"], hot[1].id, archived[1]["session_id"], hot[0].id,
+            archived[0]["session_id"],
+        ]
+        async with self.Session() as db:
+            totals = await archive_repo.count_user_history(db, self.user_id)
+            first = await archive_repo.get_merged_history(db, self.user_id, limit=2)
+            last = first[-1]
+            rest = await archive_repo.get_merged_history(
+                db, self.user_id, limit=10, after=(last.started_at, last.id)
+            )
+            page_two = await archive_repo.get_merged_history(db, self.user_id, limit=2, offset=2)
+            other = await archive_repo.count_user_history(db, uuid.uuid4())
+
+        self.assertEqual(totals, (2, 3))
+        self.assertEqual([r.id for r in first + rest], newest_first)
+        self.assertEqual([r.id for r in page_two], newest_first[2:4])
+        self.assertEqual(other, (0, 0))
+
+    def test_recent_full_page_skips_the_archive(self) -> None:
+        recent = datetime.now(timezone.utc) - timedelta(days=1)
+        old = datetime.now(timezone.utc) - timedelta(days=ASSESSMENT_ARCHIVE_RETENTION_DAYS + 1)
+        page = lambda *started: [SimpleNamespace(started_at=value) for value in started]  # noqa: E731
+
+        self.assertTrue(AssessmentService._page_before_archive(page(recent, recent, recent), 2))
+        self.assertFalse(AssessmentService._page_before_archive(page(recent, recent), 2))
+        self.assertFalse(AssessmentService._page_before_archive(page(recent, recent, old), 2))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import unittest
+import uuid
+from types import SimpleNamespace
+
+from app.repositories.question_pool import QuestionIdPool, QuestionTopicMap
+from app.services.old.assessment_service import AssessmentService
+
+
+class _CountingTopicMap(QuestionTopicMap):
+    def __init__(self, topics, **kwargs) -> None:
+        super().__init__(QuestionIdPool(), **kwargs)
+        self.topics = topics
+        self.loaded: list[list] = []
+
+    async def _load(self, db, question_ids):
+        self.loaded.append(list(question_ids))
+        return {qid: tuple(self.topics.get(qid, ())) for qid in question_ids}
+
+
+class AssessmentBreakdownTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.service = AssessmentService(db=None)
+        self.governance, self.risk = (uuid.uuid4(), "Governance"), (uuid.uuid4(), "Risk")
+        self.questions = [uuid.uuid4() for _ in range(3)]
+        self.items = [
+            SimpleNamespace(id=uuid.uuid4(), question_snapshot={"question_id": str(qid)})
+            for qid in self.questions
+        ]
+        self.topic_map = {
+            self.questions[0]: (self.governance,),
+            self.questions[1]: (self.governance, self.risk),
+            self.questions[2]: (self.risk,),
+        }
+
+    async def test_breakdown_is_computed_in_memory(self) -> None:
+        first, second, third = self.items
+        breakdown = await self.service._calculate_breakdown(
+            items=self.items,
+            scores={first.id: (True, 1.0), second.id: (False, 0.0)},  # third unanswered
+            topic_map=self.topic_map,
+        )
+        self.assertEqual(
+            [(b.topic_name, b.correct, b.total, b.score) for b in breakdown],
+            [("Governance", 1, 2, 50.0), ("Risk", 0, 2, 0.0)],
+        )
+
+        _, recommendation = self.service._build_ai_content(total_score=25.0, breakdown=breakdown)
+        self.assertEqual(
+            recommendation["focus_topics"], [str(self.governance[0]), str(self.risk[0])]
+        )
+        json.dumps(recommendation)  # stored in a JSONB column
+
+    async def test_topic_map_caches_until_invalidated(self) -> None:
+        topic_map = _CountingTopicMap(self.topic_map)
+        first = await topic_map.get(None, self.questions[:2])
+        await topic_map.get(None, self.questions)
+        self.assertEqual(first[self.questions[1]], (self.governance, self.risk))
+        self.assertEqual(topic_map.loaded, [self.questions[:2], self.questions[2:]])
+
+        await topic_map.pool.invalidate()
+        await topic_map.get(None, self.questions[:1])
+        self.assertEqual(topic_map.loaded[-1], self.questions[:1])
+
+
+if __name__ == "__main__":
+    unittest.main()
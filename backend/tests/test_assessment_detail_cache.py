@@ -0,0 +1,125 @@
+import json
+import unittest
+import uuid
+
+from app.schemas.core.api_response import ok_raw
+from app.services.assessment_detail_cache import (
+    IMMUTABLE,
+    REVALIDATE,
+    AssessmentDetailCache,
+    CachedDetail,
+)
+
+
+class FakePipeline:
+    def __init__(self, redis) -> None:
+        self.redis = redis
+        self.ops = []
+
+    def hset(self, key, mapping):
+        self.ops.append(lambda: self.redis.hashes.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, seconds):
+        self.ops.append(lambda: self.redis.ttls.__setitem__(key, seconds))
+
+    async def execute(self):
+        for op in self.ops:
+            op()
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict] = {}
+        self.ttls: dict[str, int] = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def hgetall(self, key):
+        return {k.encode(): str(v).encode() for k, v in self.hashes.get(key, {}).items()}
+
+    async def delete(self, key):
+        self.hashes.pop(key, None)
+
+
+class _Session:
+    def __init__(self, ai_status):
+        self.ai_status = ai_status
+
+
+class _Detail:
+    """Stand-in for AssessmentDetailOut (only model_dump_json / session are used)."""
+
+    def __init__(self, ai_status, summary):
+        self.session = _Session(ai_status)
+        self.summary = summary
+
+    def model_dump_json(self):
+        return json.dumps({"ai_status": self.session.ai_status, "summary": self.summary})
+
+
+class AssessmentDetailCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.user_id, self.session_id = uuid.uuid4(), uuid.uuid4()
+        self.redis = FakeRedis()
+        self.cache = AssessmentDetailCache(ttl_seconds=600, pending_ttl_seconds=30)
+        self.cache.bind_redis(self.redis)
+
+    def test_etag_and_cache_control_follow_payload(self) -> None:
+        pending = CachedDetail.build(user_id=self.user_id, detail=_Detail("pending", "fallback"))
+        ready = CachedDetail.build(user_id=self.user_id, detail=_Detail("ready", "ai"))
+
+        self.assertEqual(pending.cache_control, REVALIDATE)
+        self.assertEqual(ready.cache_control, IMMUTABLE)
+        self.assertNotEqual(pending.etag, ready.etag)
+        self.assertEqual(
+            pending.etag,
+            CachedDetail.build(user_id=self.user_id, detail=_Detail("pending", "fallback")).etag,
+        )
+        self.assertTrue(ready.matches(f'"other", {ready.etag}'))
+        self.assertTrue(ready.matches("*"))
+        self.assertFalse(ready.matches(pending.etag))
+        self.assertFalse(ready.matches(None))
+
+    async def test_round_trip_and_invalidate(self) -> None:
+        pending = CachedDetail.build(user_id=self.user_id, detail=_Detail("pending", "fallback"))
+        await self.cache.put(self.session_id, pending)
+        self.assertEqual(await self.cache.get(self.session_id), pending)
+        self.assertEqual(self.redis.ttls[f"assess:detail:{self.session_id}"], 30)
+
+        await self.cache.invalidate(self.session_id)
+        self.assertIsNone(await self.cache.get(self.session_id))
+
+        ready = CachedDetail.build(user_id=self.user_id, detail=_Detail("ready", "ai"))
+        await self.cache.put(self.session_id, ready)
+        self.assertTrue((await self.cache.get(self.session_id)).final)
+        self.assertEqual(self.redis.ttls[f"assess:detail:{self.session_id}"], 600)
+
+    def test_raw_envelope_embeds_cached_body(self) -> None:
+        cached = CachedDetail.build(user_id=self.user_id, detail=_Detail("ready", "ai"))
+        response = ok_raw(cached.body, request_id="rid-1", headers=cached.headers)
+
+        self.assertEqual(
+            json.loads(response.body),
+            {
+                "code": 0,
+                "message": "ok",
+                "data": {"ai_status": "ready", "summary": "ai"},
+                "request_id": "rid-1",
+            },
+        )
+        self.assertEqual(response.headers["etag"], cached.etag)
+
+    def test_cached_response_bytes_do_not_vary_per_request(self) -> None:
+        cached = CachedDetail.build(user_id=self.user_id, detail=_Detail("ready", "ai"))
+        first, second = cached.response(), cached.response()
+
+        # 强 ETag + immutable：同一 ETag 的响应体必须逐字节相同
+        self.assertEqual(first.body, second.body)
+        self.assertIsNone(json.loads(first.body)["request_id"])
+        self.assertEqual(
+            (first.headers["etag"], first.headers["cache-control"]), (cached.etag, IMMUTABLE)
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import asyncio
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from sqlalchemy import update  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models.assessment import AssessmentSession  # noqa: E402
+from app.repositories import assessment_sessions as sessions_repo  # noqa: E402
+from app.services import assessment_feedback as feedback_module  # noqa: E402
+from app.services.assessment_feedback import AssessmentFeedbackWorker  # noqa: E402
+from app.services.llm import LLMTimeoutError  # noqa: E402
+from app.services.old.assessment_service import AssessmentService  # noqa: E402
+
+
+class _RecordingWorker(AssessmentFeedbackWorker):
+    def __init__(self) -> None:
+        super().__init__(concurrency=1, sweep_interval=3600)
+        self.processed: list[uuid.UUID] = []
+        self.release = asyncio.Event()
+
+    async def sweep(self) -> int:
+        return 0
+
+    async def process(self, session_id):
+        await self.release.wait()
+        self.processed.append(session_id)
+        self._notify(session_id)
+        return "ready"
+
+
+class AssessmentFeedbackWorkerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_enqueue_is_noop_when_not_started(self) -> None:
+        worker = _RecordingWorker()
+        worker.enqueue(uuid.uuid4())
+        self.assertFalse(worker.running)
+        self.assertEqual(worker.processed, [])
+
+    async def test_duplicate_enqueue_runs_once_and_wakes_waiters(self) -> None:
+        worker = _RecordingWorker()
+        await worker.start()
+        try:
+            session_id = uuid.uuid4()
+            worker.enqueue(session_id)
+            worker.enqueue(session_id)
+
+            waiter = asyncio.create_task(worker.wait_for(session_id, timeout=2))
+            await asyncio.sleep(0)
+            worker.release.set()
+
+            self.assertTrue(await waiter)
+            self.assertEqual(worker.processed, [session_id])
+        finally:
+            await worker.stop()
+
+    async def test_wait_for_times_out_while_pending(self) -> None:
+        worker = _RecordingWorker()
+        self.assertFalse(await worker.wait_for(uuid.uuid4(), timeout=0.01))
+
+
+    async def test_notify_between_watch_and_wait_is_not_lost(self) -> None:
+        worker = _RecordingWorker()
+        session_id = uuid.uuid4()
+        event = worker.watch(session_id)
+        worker._notify(session_id)  # 读取 ai_status 之后、开始等待之前完成
+
+        self.assertTrue(await worker.wait_for(session_id, timeout=0.01, event=event))
+        self.assertEqual(worker._waiters, {})
+
+    async def test_wait_for_polls_for_jobs_finished_elsewhere(self) -> None:
+        worker = _RecordingWorker()
+        worker.poll_interval = 0.01
+        polls = iter([False, True])
+
+        async def settled():
+            return next(polls)
+
+        self.assertTrue(await worker.wait_for(uuid.uuid4(), timeout=2, poll=settled))
+        self.assertEqual(worker._waiters, {})
+
+
+async def _generate_ready(service, *, session_id):
+    return await sessions_repo.update_ai_content(
+        service.db, session_id, ai_summary="ai summary", ai_status="ready"
+    ) > 0
+
+
+class AssessmentFeedbackProcessTest(unittest.IsolatedAsyncioTestCase):
+    """process() / sweep() against a real assessment_sessions table."""
+
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(AssessmentSession.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+        patcher = mock.patch.object(feedback_module.db_module, "AsyncSessionLocal", self.Session)
+        patcher.start()
+        self.addAsyncCleanup(self.engine.dispose)
+        self.addCleanup(patcher.stop)
+        self.worker = AssessmentFeedbackWorker(max_attempts=3, lease_seconds=60)
+
+    async def _pending_session(self, *, attempts=0, updated_at=None) -> uuid.UUID:
+        session = AssessmentSession(
+            user_id=uuid.uuid4(),
+            kind="global",
+            submitted_at=datetime.now(timezone.utc),
+            total_score=80,
+            ai_status="pending",
+            ai_attempts=attempts,
+            ai_updated_at=updated_at,
+        )
+        async with self.Session() as db:
+            db.add(session)
+            await db.commit()
+        return session.id
+
+    async def _row(self, session_id) -> AssessmentSession:
+        async with self.Session() as db:
+            return await db.get(AssessmentSession, session_id)
+
+    def _generate(self, side_effect):
+        return mock.patch.object(
+            AssessmentService, "generate_session_feedback", autospec=True, side_effect=side_effect
+        )
+
+    async def test_success_marks_ready_and_wakes_waiters(self) -> None:
+        session_id = await self._pending_session()
+        waiter = asyncio.create_task(self.worker.wait_for(session_id, timeout=2))
+        await asyncio.sleep(0)
+
+        with self._generate(_generate_ready):
+            self.assertEqual(await self.worker.process(session_id), "ready")
+
+        self.assertTrue(await waiter)
+        row = await self._row(session_id)
+        self.assertEqual((row.ai_status, row.ai_attempts, row.ai_summary), ("ready", 1, "ai summary"))
+
+    async def test_failures_retry_until_max_attempts_then_fail(self) -> None:
+        session_id = await self._pending_session()
+
+        with self._generate(LLMTimeoutError("upstream timeout")) as generate:
+            outcomes = [await self.worker.process(session_id) for _ in range(4)]
+
+        self.assertEqual(outcomes, ["pending", "pending", "failed", "failed"])
+        self.assertEqual(generate.call_count, 3)
+        row = await self._row(session_id)
+        self.assertEqual((row.ai_status, row.ai_attempts), ("failed", 3))
+
+    async def test_claim_cas_skips_job_taken_by_another_worker(self) -> None:
+        session_id = await self._pending_session()
+        read = sessions_repo.get_session_by_id
+
+        async def read_then_lose_claim(db, sid):
+            session = await read(db, sid)
+            # 另一个 worker 在本次读取之后抢先认领
+            await db.execute(
+                update(AssessmentSession)
+                .where(AssessmentSession.id == sid)
+                .values(ai_attempts=AssessmentSession.ai_attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+            return session
+
+        with self._generate(_generate_ready) as generate, mock.patch.object(
+            feedback_module.sessions_repo, "get_session_by_id", read_then_lose_claim
+        ):
+            self.assertIsNone(await self.worker.process(session_id))
+
+        generate.assert_not_called()
+        self.assertEqual((await self._row(session_id)).ai_status, "pending")
+
+    async def test_sweep_reenqueues_only_expired_leases(self) -> None:
+        now = datetime.now(timezone.utc)
+        expired = await self._pending_session(attempts=1, updated_at=now - timedelta(seconds=120))
+        await self._pending_session(attempts=1, updated_at=now)
+
+        with mock.patch.object(self.worker, "enqueue") as enqueue:
+            self.assertEqual(await self.worker.sweep(), 1)
+        enqueue.assert_called_once_with(expired)
+
+        with self._generate(_generate_ready):
+            self.assertEqual(await self.worker.process(expired), "ready")
+        self.assertEqual((await self._row(expired)).ai_attempts, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+import uuid
+from datetime import datetime, timezone
+
+from app.schemas.assessment import decode_history_cursor, encode_history_cursor
+
+
+class HistoryCursorTest(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        started_at = datetime(2025, 10, 18, 6, 55, 12, 345678, tzinfo=timezone.utc)
+        session_id = uuid.uuid4()
+
+        cursor = encode_history_cursor(started_at, session_id)
+
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_history_cursor(cursor), (started_at, session_id))
+
+    def test_invalid_cursor_raises_value_error(self) -> None:
+        for cursor in ("not-a-cursor", "", "@@@", encode_history_cursor(datetime.now(), uuid.uuid4())[:-4]):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    decode_history_cursor(cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
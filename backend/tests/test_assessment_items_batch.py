@@ -0,0 +1,103 @@
+import os
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models.assessment import (  # noqa: E402
+    AssessmentItem,
+    AssessmentSession,
+    QuestionSnapshotRecord,
+)
+from app.repositories import assessment_items as items_repo  # noqa: E402
+from app.schemas.assessment import QuestionDTO  # noqa: E402
+from app.services import topic_quiz as topic_quiz_module  # noqa: E402
+from app.services.topic_quiz import TopicQuizService  # noqa: E402
+
+N = 12
+
+
+class ItemBatchInsertTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            for model in (QuestionSnapshotRecord, AssessmentSession, AssessmentItem):
+                await conn.run_sync(model.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.addAsyncCleanup(self.engine.dispose)
+
+        self.statements: list[str] = []
+        event.listen(
+            self.engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(" ".join(statement.split())),
+        )
+        self.questions = [
+            QuestionDTO(
+                id=uuid.uuid4(),
+                qtype="single",
+                stem=f"Q{i}?",
+                choices={"A": "yes", "B": "no"},
+                answer_key={"correct": ["A"]},
+            )
+            for i in range(N)
+        ]
+
+    def _item_inserts(self) -> int:
+        return sum(s.startswith("INSERT INTO assessment_items") for s in self.statements)
+
+    async def test_create_items_batch_is_one_insert(self) -> None:
+        async with self.Session() as db:
+            items = await items_repo.create_items_batch(
+                db, session_id=uuid.uuid4(), questions=self.questions
+            )
+            await db.commit()
+
+        self.assertEqual([item.order_no for item in items], list(range(1, N + 1)))
+        self.assertEqual(self._item_inserts(), 1)
+
+    async def test_create_items_from_snapshots_is_one_insert(self) -> None:
+        snapshots = [
+            {"order_no": i, "snapshot": {"stem": f"Q{i}?", "qtype": "single"}}
+            for i in range(1, N + 1)
+        ]
+        async with self.Session() as db:
+            items = await items_repo.create_items_from_snapshots(
+                db, session_id=uuid.uuid4(), snapshots=snapshots
+            )
+            await db.commit()
+
+        self.assertEqual(len(items), N)
+        self.assertEqual(self._item_inserts(), 1)
+
+    async def test_start_new_writes_session_and_items_in_one_insert_each(self) -> None:
+        service = TopicQuizService()
+        topic = SimpleNamespace(id=uuid.uuid4())
+        progress = SimpleNamespace(user_id=uuid.uuid4(), quiz_version=0)
+        with mock.patch.object(
+            topic_quiz_module.quiz_pool, "take", mock.AsyncMock(return_value=None)
+        ), mock.patch.object(
+            service, "_select_questions", mock.AsyncMock(return_value=self.questions)
+        ), mock.patch.object(
+            topic_quiz_module.progress_repo, "compare_and_set_quiz", mock.AsyncMock(return_value=True)
+        ):
+            async with self.Session() as db:
+                assessment_session, questions = await service._start_new(db, progress, topic, N)
+                await db.commit()
+
+        self.assertEqual(len(questions), N)
+        self.assertEqual(progress.last_quiz_session_id, assessment_session.id)
+        self.assertEqual(
+            sum(s.startswith("INSERT INTO assessment_sessions") for s in self.statements), 1
+        )
+        self.assertEqual(self._item_inserts(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import unittest
+import uuid
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from sqlalchemy import event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models.assessment import AssessmentResponse  # noqa: E402
+from app.repositories import assessment_responses as responses_repo  # noqa: E402
+
+
+class BulkScoreUpdateTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(AssessmentResponse.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        self.session_id = uuid.uuid4()
+        self.items = [uuid.uuid4() for _ in range(4)]
+        async with self.Session() as db:
+            db.add_all(
+                AssessmentResponse(id=uuid.uuid4(), session_id=self.session_id, item_id=item_id, answer="A")
+                for item_id in self.items
+            )
+            # 另一会话的同题不应被改动
+            db.add(AssessmentResponse(id=uuid.uuid4(), session_id=uuid.uuid4(), item_id=uuid.uuid4(), answer="A"))
+            await db.commit()
+
+    async def asyncTearDown(self) -> None:
+        await self.engine.dispose()
+
+    async def test_scores_written_in_one_update_with_totals(self) -> None:
+        statements: list[str] = []
+        event.listen(
+            self.engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement.split()[0]),
+        )
+        scores = {
+            self.items[0]: {"is_correct": True, "score": 1.0},
+            self.items[1]: {"is_correct": False, "score": 0.0},
+            self.items[2]: {"is_correct": True, "score": 1.0},
+        }
+        async with self.Session() as db:
+            totals = await responses_repo.apply_scores_and_totals(
+                db, session_id=self.session_id, item_scores=scores
+            )
+            await db.commit()
+
+        self.assertEqual(totals, responses_repo.SessionScoreTotals(3, 2.0, 2))
+        self.assertEqual(statements.count("UPDATE"), 1)
+
+        async with self.Session() as db:
+            rows = {
+                r.item_id: (r.is_correct, r.score)
+                for r in (await db.execute(select(AssessmentResponse))).scalars()
+            }
+        self.assertEqual(rows[self.items[0]], (True, 1))
+        self.assertEqual(rows[self.items[1]], (False, 0))
+        self.assertEqual(rows[self.items[3]], (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from fastapi import FastAPI  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.api.old_routes import chat as chat_routes  # noqa: E402
+from app.core.db.db import get_db  # noqa: E402
+from app.models.explanations import TopicExplanation  # noqa: E402
+from app.repositories import explanations as explanations_repo  # noqa: E402
+from app.repositories.explanations import explanation_key  # noqa: E402
+
+STORED = {"outline": ["Quorum"], "explanation": "stored", "checklist": ["count members"]}
+GENERATED = {"outline": ["Proxy"], "explanation": "generated", "checklist": []}
+
+
+class ExplanationKeyTest(unittest.TestCase):
+    def test_equivalent_inputs_share_a_key(self) -> None:
+        a = explanation_key("Mod-1", "Board  Roles ", "Beginner", ["Quorum", "proxy"])
+        b = explanation_key("mod-1", "board roles", "beginner", ["proxy", " quorum", "PROXY"])
+        self.assertEqual(a, b)
+
+    def test_known_points_change_the_key(self) -> None:
+        plain = explanation_key("m", "s", "beginner")
+        self.assertEqual(plain.known_points_hash, "")
+        self.assertNotEqual(plain, explanation_key("m", "s", "beginner", ["quorum"]))
+
+
+class ExplainEndpointTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(TopicExplanation.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.addAsyncCleanup(self.engine.dispose)
+
+        async with self.Session() as db:
+            await explanations_repo.upsert_explanation(
+                db,
+                key=explanation_key("governance", "Board Roles", "beginner"),
+                payload=STORED,
+                model="m",
+            )
+            await db.commit()
+
+        async def override_get_db():
+            async with self.Session() as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(chat_routes.router, prefix="/ai")
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver")
+        self.addAsyncCleanup(self.client.aclose)
+
+        patcher = mock.patch.object(
+            chat_routes, "explain_topic", mock.AsyncMock(return_value=GENERATED)
+        )
+        self.explain_topic = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_stored_explanation_is_served_without_the_model(self) -> None:
+        # 归一化后与预生成的键相同
+        resp = await self.client.post(
+            "/ai/explain", json={"module_id": "Governance", "subtopic": "board  roles"}
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), STORED)
+        self.explain_topic.assert_not_awaited()
+
+    async def test_miss_falls_back_to_the_model(self) -> None:
+        resp = await self.client.post(
+            "/ai/explain",
+            json={"module_id": "governance", "subtopic": "board roles", "known_points": ["quorum"]},
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), GENERATED)
+        self.explain_topic.assert_awaited_once()
+        self.assertEqual(self.explain_topic.await_args.kwargs["known_points"], ["quorum"])
+
+
+if __name__ == "__main__":
+    unittest.main()
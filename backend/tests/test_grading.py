@@ -0,0 +1,75 @@
+import unittest
+import uuid
+
+from app.services import grading
+
+
+class GradingEngineTest(unittest.TestCase):
+    def test_compile_normalizes_objective_keys(self) -> None:
+        single = grading.compile_answer_key("single", {"correct_options": [" b "]})
+        multi = grading.compile_answer_key("multi", {"correct": "c, a"})
+
+        self.assertEqual(single.to_snapshot(), {"q": "single", "a": "B"})
+        self.assertEqual(multi.to_snapshot(), {"q": "multi", "a": "A,C"})
+        self.assertEqual(grading.CompiledKey.from_snapshot(multi.to_snapshot()), multi)
+
+    def test_grade_objective_answers(self) -> None:
+        multi = grading.compile_answer_key("multi", {"correct_options": ["A", "C"]})
+
+        self.assertTrue(grading.grade(multi, "c,A").is_correct)
+        self.assertTrue(grading.grade(multi, ["C", "a"]).is_correct)
+        self.assertFalse(grading.grade(multi, "A").is_correct)
+        self.assertFalse(grading.grade(multi, "").is_correct)
+
+    def test_short_answers_use_fuzzy_match(self) -> None:
+        key = grading.compile_answer_key("short", {"reference": "The Board of Directors"})
+
+        self.assertEqual(key.references, ("the board of directors",))
+        self.assertTrue(grading.grade(key, "the board of directors.").is_correct)
+        self.assertTrue(grading.grade(key, "It is the board of directors").is_correct)
+        self.assertTrue(grading.grade(key, "the bord of directers").is_correct)
+        self.assertFalse(grading.grade(key, "the shareholders").is_correct)
+        # 罗列大量术语不再因“包含全部参考词”而判对
+        self.assertFalse(
+            grading.grade(
+                key, "the board of directors shareholders auditors management committee"
+            ).is_correct
+        )
+
+    def test_fuzzy_match_needs_similar_words_and_length(self) -> None:
+        self.assertFalse(grading.fuzzy_match("not", "no"))  # 短词必须完全一致
+        self.assertFalse(grading.fuzzy_match("a quorum is needed", "quorum"))
+        self.assertTrue(grading.fuzzy_match("quorom", "quorum"))
+        self.assertTrue(grading.fuzzy_match("directors board the", "the board of directors"))
+
+    def test_short_answers_can_be_left_ungraded(self) -> None:
+        key = grading.compile_answer_key("short", {"reference": "quorum"})
+        self.assertIsNone(grading.grade(key, "quorum", grade_short=False).is_correct)
+        session = grading.grade_session([("i1", key, "quorum")], grade_short=False)
+        self.assertEqual((session.correct_count, session.results["i1"].is_correct), (0, None))
+
+    def test_short_without_reference_is_not_graded(self) -> None:
+        key = grading.compile_answer_key("short", {})
+        self.assertIsNone(grading.grade(key, "anything").is_correct)
+
+    def test_key_from_snapshot_falls_back_to_answer_key(self) -> None:
+        compiled = {"qtype": "single", grading.GRADING_KEY: {"q": "single", "a": "A"}}
+        legacy = {"qtype": "single", "answer_key": {"correct_options": ["B"]}}
+
+        self.assertEqual(grading.key_from_snapshot(compiled).answer, "A")
+        self.assertEqual(grading.key_from_snapshot(legacy).answer, "B")
+        self.assertIsNone(grading.key_from_snapshot({"qtype": "single"}))
+
+    def test_grade_session_totals(self) -> None:
+        key = grading.compile_answer_key("single", {"correct": "A"})
+        ids = [uuid.uuid4() for _ in range(3)]
+
+        graded = grading.grade_session([(ids[0], key, "a"), (ids[1], key, "B"), (ids[2], key, None)])
+
+        self.assertEqual(graded.correct_count, 1)
+        self.assertEqual(graded.total_score, 1.0)
+        self.assertIsNone(graded.results[ids[2]].is_correct)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import unittest
+import uuid
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models.assessment import QuestionTopic  # noqa: E402
+from app.models.stats import QuestionChoiceStat, QuestionStat, TopicStat  # noqa: E402
+from app.repositories import item_stats as stats_repo  # noqa: E402
+
+
+class ItemStatsTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            for model in (QuestionTopic, QuestionStat, QuestionChoiceStat, TopicStat):
+                await conn.run_sync(model.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        self.topic_id = uuid.uuid4()
+        self.easy, self.hard = uuid.uuid4(), uuid.uuid4()
+        async with self.Session() as db:
+            db.add_all(
+                [
+                    QuestionTopic(question_id=self.easy, topic_id=self.topic_id),
+                    QuestionTopic(question_id=self.hard, topic_id=self.topic_id),
+                ]
+            )
+            await db.commit()
+
+    async def asyncTearDown(self) -> None:
+        await self.engine.dispose()
+
+    def _graded(self, question_id, answer, is_correct):
+        snapshot = {"question_id": str(question_id), "qtype": "multi"}
+        return stats_repo.graded_answer(snapshot, answer, is_correct, 1.0 if is_correct else 0.0)
+
+    async def test_counters_accumulate_across_submissions(self) -> None:
+        submissions = [
+            [self._graded(self.easy, "A", True), self._graded(self.hard, "B,C", False)],
+            [self._graded(self.easy, "A", True), self._graded(self.hard, "A,C", True)],
+            # 未判分 / 缺题目 id 的作答不计入
+            [self._graded(self.easy, "A", None), stats_repo.graded_answer({}, "A", True, 1.0)],
+        ]
+        for graded in submissions:
+            async with self.Session() as db:
+                await stats_repo.record_graded(db, graded)
+                await db.commit()
+
+        async with self.Session() as db:
+            topic = await stats_repo.get_topic_stat(db, self.topic_id)
+            questions = await stats_repo.list_topic_question_stats(db, self.topic_id)
+
+        self.assertEqual((topic.attempts, topic.correct), (4, 3))
+        self.assertAlmostEqual(topic.mean_score, 0.75)
+        self.assertEqual([q["question_id"] for q in questions], [str(self.hard), str(self.easy)])
+        self.assertEqual(questions[0]["correct_rate"], 0.5)
+        self.assertEqual(questions[0]["choices"], {"A": 1, "B": 1, "C": 2})
+
+    async def test_upsert_rows_are_written_in_key_order(self) -> None:
+        statements: list[tuple[str, tuple]] = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("INSERT"):
+                statements.append((statement, parameters))
+
+        event.listen(self.engine.sync_engine, "before_cursor_execute", capture)
+        questions = sorted(uuid.uuid4() for _ in range(4))
+        graded = [self._graded(q, "B,A", False) for q in reversed(questions)]
+        async with self.Session() as db:
+            await stats_repo.record_graded(
+                db, graded, question_topics={q: [self.topic_id] for q in questions}
+            )
+            await db.commit()
+
+        question_insert = next(p for sql, p in statements if "question_stats" in sql)
+        choice_insert = next(p for sql, p in statements if "question_choice_stats" in sql)
+        # 每行 4 个参数（question_id, attempts, correct, score_sum）
+        self.assertEqual(list(question_insert[::4]), [q.hex for q in questions])
+        # 每行 3 个参数（question_id, choice, selections）
+        self.assertEqual(
+            list(zip(choice_insert[::3], choice_insert[1::3])),
+            [(q.hex, c) for q in questions for c in ("A", "B")],
+        )
+
+    def test_selected_choices_only_for_objective_questions(self) -> None:
+        self.assertEqual(stats_repo.selected_choices("multi", "c, a,A"), ["A", "C"])
+        self.assertEqual(stats_repo.selected_choices("short", "A, B"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from app.services.llm.breaker import CircuitBreaker, CircuitOpenError
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _ClientError(Exception):
+    status_code = 400
+
+
+def _boom():
+    raise TimeoutError("upstream timed out")
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = _Clock()
+        self.breaker = CircuitBreaker(
+            "test", failure_threshold=2, reset_timeout=10, clock=self.clock
+        )
+
+    def _trip(self) -> None:
+        for _ in range(2):
+            with self.assertRaises(TimeoutError):
+                self.breaker.call(_boom)
+
+    def test_opens_after_threshold_and_fails_fast(self) -> None:
+        self._trip()
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allows_request())
+
+        calls = []
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(calls.append, 1)
+        self.assertEqual(calls, [])
+
+    def test_half_open_probe_closes_on_success(self) -> None:
+        self._trip()
+        self.clock.now = 10
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_half_open_probe_failure_reopens(self) -> None:
+        self._trip()
+        self.clock.now = 10
+        with self.assertRaises(TimeoutError):
+            self.breaker.call(_boom)
+        self.assertEqual(self.breaker.state, "open")
+        self.assertAlmostEqual(self.breaker.retry_after(), 10)
+
+    def test_client_errors_do_not_trip(self) -> None:
+        def bad_request():
+            raise _ClientError()
+
+        for _ in range(3):
+            with self.assertRaises(_ClientError):
+                self.breaker.call(bad_request)
+        self.assertEqual(self.breaker.state, "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.llm.providers import ProviderRegistry
+from app.services.llm.routing import ModelRouter, RoutingPolicy
+from app.services.old import gpt_call
+
+LONG_QUESTION = "How should a board handle a conflict of interest? " * 10
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _policy(**overrides) -> RoutingPolicy:
+    raw = {
+        "tiers": [
+            {"name": "fast", "model": "small", "max_question_chars": 100, "levels": ["beginner"]},
+            {"name": "primary", "model": "large", "fallback": "fast", "p95_threshold_ms": 1000},
+        ],
+        "window_seconds": 60,
+        "min_samples": 3,
+    }
+    raw.update(overrides)
+    return RoutingPolicy.from_dict(raw)
+
+
+class ModelRouterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.router = ModelRouter(_policy(), registry=ProviderRegistry(), clock=self.clock)
+
+    def test_rules_pick_tier_by_length_and_level(self) -> None:
+        self.assertEqual(self.router.choose("What is quorum?", "Beginner").tier.name, "fast")
+        self.assertEqual(self.router.choose("What is quorum?", "advanced").tier.name, "primary")
+        self.assertEqual(self.router.choose(LONG_QUESTION, "beginner").tier.name, "primary")
+
+    def test_slow_primary_falls_back_until_samples_expire(self) -> None:
+        for _ in range(3):
+            self.router.observe("primary", 2.5)
+        decision = self.router.choose(LONG_QUESTION, "advanced")
+        self.assertEqual((decision.tier.name, decision.reason), ("fast", "latency_fallback"))
+        self.assertEqual(decision.preferred, "primary")
+
+        self.clock.now += 61
+        self.assertEqual(self.router.choose(LONG_QUESTION, "advanced").tier.name, "primary")
+
+    def test_no_fallback_to_a_slower_tier(self) -> None:
+        for _ in range(3):
+            self.router.observe("primary", 2.0)
+            self.router.observe("fast", 3.0)
+        self.assertEqual(self.router.choose(LONG_QUESTION, "advanced").tier.name, "primary")
+
+    def test_unknown_fallback_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            RoutingPolicy.from_dict({"tiers": [{"name": "a", "model": "m", "fallback": "b"}]})
+
+
+def _fake_endpoint(delay: float, hits: list[str]) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            hits.append(body["model"])
+            time.sleep(delay)
+            payload = json.dumps({
+                "id": "cmpl", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": body["model"]}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class RoutingAgainstFakeEndpointsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_ask_moves_to_fast_endpoint_when_primary_is_slow(self) -> None:
+        fast_hits: list[str] = []
+        slow_hits: list[str] = []
+        fast = _fake_endpoint(0.0, fast_hits)
+        slow = _fake_endpoint(0.3, slow_hits)
+        self.addCleanup(fast.shutdown)
+        self.addCleanup(slow.shutdown)
+
+        policy = RoutingPolicy.from_dict({
+            "tiers": [
+                {"name": "fast", "model": "small", "api_key": "k",
+                 "base_url": f"http://127.0.0.1:{fast.server_port}/v1", "max_question_chars": 0},
+                {"name": "primary", "model": "large", "api_key": "k", "fallback": "fast",
+                 "p95_threshold_ms": 100, "base_url": f"http://127.0.0.1:{slow.server_port}/v1"},
+            ],
+            "min_samples": 2,
+        })
+        original = gpt_call.llm_router
+        gpt_call.llm_router = ModelRouter(policy)
+        self.addCleanup(setattr, gpt_call, "llm_router", original)
+
+        answers = [await gpt_call.ask_question(LONG_QUESTION, "advanced") for _ in range(4)]
+
+        self.assertEqual(answers, ["large", "large", "small", "small"])
+        self.assertEqual((len(slow_hits), len(fast_hits)), (2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import unittest
+
+from app.core.exceptions.exceptions import BizError
+from app.services.llm.scheduler import LLMScheduler, Priority
+
+
+class LLMSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    async def _fill(self, scheduler: LLMScheduler, gate: threading.Event) -> asyncio.Task:
+        task = asyncio.create_task(scheduler.run(gate.wait, priority=Priority.BACKGROUND))
+        await asyncio.sleep(0.01)
+        return task
+
+    async def test_interactive_jumps_background_and_keys_round_robin(self) -> None:
+        scheduler = LLMScheduler(max_concurrency=1)
+        gate = threading.Event()
+        blocker = await self._fill(scheduler, gate)
+
+        self.addCleanup(gate.set)
+        order: list[str] = []
+        tasks = [
+            asyncio.create_task(
+                scheduler.run(order.append, name, priority=priority, key=key)
+            )
+            for name, priority, key in [
+                ("bg", Priority.BACKGROUND, "u1"),
+                ("a1", Priority.INTERACTIVE, "a"),
+                ("a2", Priority.INTERACTIVE, "a"),
+                ("b1", Priority.INTERACTIVE, "b"),
+            ]
+        ]
+        await asyncio.sleep(0.01)
+        self.assertEqual(scheduler.snapshot()["queued"], {"interactive": 3, "background": 1})
+
+        gate.set()
+        await asyncio.gather(blocker, *tasks)
+        self.assertEqual(order, ["a1", "b1", "a2", "bg"])
+        self.assertEqual(scheduler.snapshot()["active"], 0)
+
+    async def test_sheds_interactive_when_wait_exceeds_budget(self) -> None:
+        scheduler = LLMScheduler(
+            max_concurrency=1,
+            wait_budgets={Priority.INTERACTIVE: 5},
+            initial_service_time=4,
+        )
+        gate = threading.Event()
+        blocker = await self._fill(scheduler, gate)
+
+        try:
+            waiting = asyncio.create_task(scheduler.run(lambda: "ok"))
+            await asyncio.sleep(0.01)
+
+            # one queued + this call, 4s each through a single slot
+            with self.assertRaises(BizError) as ctx:
+                await scheduler.run(lambda: "shed")
+            self.assertEqual(ctx.exception.http_status, 503)
+            self.assertEqual(ctx.exception.headers, {"Retry-After": "8"})
+        finally:
+            gate.set()
+        self.assertEqual(await waiting, "ok")
+        await blocker
+
+    async def test_cancelled_waiter_leaves_queue(self) -> None:
+        scheduler = LLMScheduler(max_concurrency=1)
+        gate = threading.Event()
+        blocker = await self._fill(scheduler, gate)
+
+        self.addCleanup(gate.set)
+        waiting = asyncio.create_task(scheduler.run(lambda: None))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        self.assertEqual(scheduler.snapshot()["queued"]["interactive"], 0)
+
+        gate.set()
+        await blocker
+        self.assertEqual(scheduler.snapshot()["active"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import unittest
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.db import db as db_module  # noqa: E402
+from app.middleware.request_id import request_id_ctx  # noqa: E402
+from app.models.telemetry import LLMCall  # noqa: E402
+from app.services.llm.telemetry import LLMCallRecord, LLMTelemetry  # noqa: E402
+
+
+class LLMTelemetryTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(LLMCall.__table__.create)
+        self._orig_sessionmaker = db_module.AsyncSessionLocal
+        db_module.AsyncSessionLocal = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def asyncTearDown(self) -> None:
+        db_module.AsyncSessionLocal = self._orig_sessionmaker
+        await self.engine.dispose()
+
+    async def test_flush_writes_batches_tagged_with_request_id(self) -> None:
+        telemetry = LLMTelemetry(batch_size=2)
+        token = request_id_ctx.set("req-1")
+        try:
+            telemetry.record("ask", model="m", prompt_tokens=10, completion_tokens=5, latency_ms=120, retries=1)
+            telemetry.record("explain", model="m", cache_hit=True)
+        finally:
+            request_id_ctx.reset(token)
+        telemetry.record("chat_summary", status="timeout", latency_ms=20000)
+
+        self.assertEqual(await telemetry.flush(), 3)
+        self.assertEqual(len(telemetry), 0)
+
+        async with db_module.AsyncSessionLocal() as db:
+            rows = (await db.execute(select(LLMCall).order_by(LLMCall.id))).scalars().all()
+        self.assertEqual([r.operation for r in rows], ["ask", "explain", "chat_summary"])
+        self.assertEqual([r.request_id for r in rows], ["req-1", "req-1", None])
+        self.assertEqual((rows[0].prompt_tokens, rows[0].completion_tokens, rows[0].retries), (10, 5, 1))
+        self.assertTrue(rows[1].cache_hit)
+        self.assertEqual(rows[2].status, "timeout")
+
+    async def test_failed_flush_keeps_rows_and_buffer_is_bounded(self) -> None:
+        telemetry = LLMTelemetry(max_buffer=2)
+        for op in ("a", "b", "c"):
+            telemetry.record(op)
+        self.assertEqual(len(telemetry), 2)  # oldest dropped
+
+        # a fresh in-memory connection has no llm_calls table
+        await self.engine.dispose()
+        self.assertEqual(await telemetry.flush(), 0)
+        self.assertEqual(len(telemetry), 2)
+
+    async def test_oversized_request_id_is_clipped_to_column(self) -> None:
+        telemetry = LLMTelemetry()
+        token = request_id_ctx.set("x" * 100)
+        try:
+            rec = telemetry.record("ask")
+        finally:
+            request_id_ctx.reset(token)
+
+        self.assertEqual(rec.request_id, "x" * 64)
+        self.assertEqual(await telemetry.flush(), 1)
+        async with db_module.AsyncSessionLocal() as db:
+            row = (await db.execute(select(LLMCall))).scalar_one()
+        self.assertEqual(row.request_id, "x" * 64)
+
+    async def test_rejected_row_is_dropped_without_blocking_the_batch(self) -> None:
+        telemetry = LLMTelemetry()
+        telemetry.record("a")
+        # operation 为 NOT NULL，这一行会让整批 INSERT 失败
+        telemetry._buffer.append(LLMCallRecord(operation=None, status="ok"))
+        telemetry.record("c")
+
+        self.assertEqual(await telemetry.flush(), 2)
+        self.assertEqual(len(telemetry), 0)
+        async with db_module.AsyncSessionLocal() as db:
+            rows = (await db.execute(select(LLMCall).order_by(LLMCall.id))).scalars().all()
+        self.assertEqual([r.operation for r in rows], ["a", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import uuid
+
+from app.repositories.question_pool import BankCounts, QuestionBankStats, QuestionIdPool
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def get(self, key):
+        value = self.values.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+
+
+class _CountingStats(QuestionBankStats):
+    def __init__(self, pool, counts) -> None:
+        super().__init__(pool)
+        self.counts = counts
+        self.loads = 0
+
+    async def _load(self, db):
+        self.loads += 1
+        return self.counts
+
+
+class QuestionBankStatsTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.topic_id = uuid.uuid4()
+        self.counts = BankCounts(
+            by_qtype={"single": 5, "short": 2},
+            by_topic={self.topic_id: {"single": 3, "short": 1}},
+        )
+
+    async def test_lookups_from_snapshot(self) -> None:
+        stats = _CountingStats(QuestionIdPool(), self.counts)
+        counts = await stats.get(None)
+        await stats.get(None)
+
+        self.assertEqual(stats.loads, 1)
+        self.assertEqual((counts.total(), counts.total("single")), (7, 5))
+        self.assertEqual(counts.topic_total(self.topic_id), 4)
+        self.assertEqual(counts.topic_total(self.topic_id, "multi"), 0)
+        self.assertEqual(counts.topic_total(uuid.uuid4()), 0)
+
+    async def test_processes_share_counts_through_redis_until_invalidated(self) -> None:
+        redis = FakeRedis()
+        first_pool, second_pool = QuestionIdPool(), QuestionIdPool()
+        first_pool.bind_redis(redis)
+        second_pool.bind_redis(redis)
+        first = _CountingStats(first_pool, self.counts)
+        second = _CountingStats(second_pool, self.counts)
+
+        await first.get(None)
+        shared = await second.get(None)
+        self.assertEqual((first.loads, second.loads), (1, 0))
+        self.assertEqual(shared, self.counts)
+
+        await first_pool.invalidate()  # e.g. admin added a question
+        await second.get(None)
+        self.assertEqual(second.loads, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import uuid
+
+from app.repositories.question_pool import VERSION_KEY, QuestionIdPool
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, int] = {}
+
+    async def get(self, key):
+        value = self.values.get(key)
+        return None if value is None else str(value).encode()
+
+    async def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+class _CountingPool(QuestionIdPool):
+    def __init__(self, ids, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.source = list(ids)
+        self.loads = 0
+
+    async def _load(self, db, topic_id, qtype):
+        self.loads += 1
+        return tuple(self.source)
+
+
+class QuestionIdPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def test_sample_is_distinct_and_cached(self) -> None:
+        ids = [uuid.uuid4() for _ in range(50)]
+        pool = _CountingPool(ids)
+
+        picked = await pool.sample(None, count=10, topic_id=uuid.uuid4())
+        self.assertEqual(len(set(picked)), 10)
+        self.assertTrue(set(picked) <= set(ids))
+
+        topic_id = uuid.uuid4()
+        await pool.sample(None, count=5, topic_id=topic_id)
+        await pool.sample(None, count=5, topic_id=topic_id)
+        self.assertEqual(pool.loads, 2)  # one load per (topic, qtype) key
+
+    async def test_short_pool_returns_everything_and_respects_exclude(self) -> None:
+        ids = [uuid.uuid4() for _ in range(3)]
+        pool = _CountingPool(ids)
+        self.assertEqual(sorted(await pool.sample(None, count=10)), sorted(ids))
+        self.assertEqual(await pool.sample(None, count=2, exclude=set(ids)), [])
+
+    async def test_invalidation_through_shared_redis_version(self) -> None:
+        redis = _FakeRedis()
+        worker_a = _CountingPool([uuid.uuid4()])
+        worker_b = _CountingPool([uuid.uuid4()])
+        worker_a.bind_redis(redis)
+        worker_b.bind_redis(redis)
+
+        await worker_b.ids(None)
+        await worker_b.ids(None)
+        self.assertEqual(worker_b.loads, 1)
+
+        await worker_a.invalidate()  # e.g. admin added a question on worker A
+        self.assertEqual(redis.values[VERSION_KEY], 1)
+        await worker_b.ids(None)
+        self.assertEqual(worker_b.loads, 2)
+
+    async def test_ttl_expiry_without_redis(self) -> None:
+        now = [0.0]
+        pool = _CountingPool([uuid.uuid4()], ttl_seconds=10, clock=lambda: now[0])
+        await pool.ids(None)
+        now[0] = 11
+        await pool.ids(None)
+        self.assertEqual(pool.loads, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
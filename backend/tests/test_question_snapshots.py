@@ -0,0 +1,60 @@
+import os
+import unittest
+import uuid
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models.assessment import AssessmentItem, QuestionSnapshotRecord  # noqa: E402
+from app.repositories import assessment_items as items_repo  # noqa: E402
+from app.repositories import question_snapshots as snapshots_repo  # noqa: E402
+from app.schemas.assessment import QuestionDTO  # noqa: E402
+
+
+class QuestionSnapshotTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(QuestionSnapshotRecord.__table__.create)
+            await conn.run_sync(AssessmentItem.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.questions = [
+            QuestionDTO(id=uuid.uuid4(), qtype="single", stem=f"Q{i}?", choices=["A. yes", "B. no"])
+            for i in range(3)
+        ]
+
+    async def asyncTearDown(self) -> None:
+        await self.engine.dispose()
+
+    def test_hash_ignores_key_order(self) -> None:
+        a = {"stem": "Q", "qtype": "single", "choices": {"A": "x"}}
+        b = {"choices": {"A": "x"}, "qtype": "single", "stem": "Q"}
+        self.assertEqual(snapshots_repo.snapshot_hash(a), snapshots_repo.snapshot_hash(b))
+        self.assertEqual(len(snapshots_repo.snapshot_hash(a)), 64)
+
+    async def test_sessions_share_snapshot_rows(self) -> None:
+        sessions = [uuid.uuid4() for _ in range(5)]
+        async with self.Session() as db:
+            for session_id in sessions:
+                items = await items_repo.create_items_batch(
+                    db, session_id=session_id, questions=self.questions
+                )
+                self.assertEqual(items[0].question_snapshot["stem"], "Q0?")
+            await db.commit()
+
+        async with self.Session() as db:
+            stored = await db.scalar(select(func.count()).select_from(QuestionSnapshotRecord))
+            self.assertEqual(stored, len(self.questions))
+
+            items = await items_repo.get_session_items(db, sessions[-1])
+            self.assertEqual([item.question_snapshot["stem"] for item in items], ["Q0?", "Q1?", "Q2?"])
+
+            payloads = await snapshots_repo.get_snapshots(db, [items[1].snapshot_hash, "missing"])
+            self.assertEqual(list(payloads), [items[1].snapshot_hash])
+
+
+if __name__ == "__main__":
+    unittest.main()
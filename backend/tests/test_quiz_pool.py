@@ -0,0 +1,138 @@
+import os
+import unittest
+import uuid
+from unittest import mock
+
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models.assessment import QuestionSnapshotRecord  # noqa: E402
+from app.schemas.assessment import QuestionDTO  # noqa: E402
+from app.services import quiz_pool as pool_module  # noqa: E402
+from app.services.quiz_pool import QuizSetPool  # noqa: E402
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    def register_script(self, source):
+        async def push(keys, args):
+            gen_key, list_key, index_key = keys
+            if str(self.data.get(gen_key, "0")) != args[0]:
+                return -1
+            self.data.setdefault(list_key, []).extend(args[2:])
+            self.data.setdefault(index_key, set()).add(list_key)
+            return len(self.data[list_key])
+
+        return push
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class _Pipe:
+            calls = []
+
+            def incr(self, key):
+                self.calls.append(redis.incr(key))
+
+            def delete(self, *keys):
+                self.calls.append(redis.delete(*keys))
+
+            async def execute(self):
+                return [await call for call in self.calls]
+
+        return _Pipe()
+
+    async def get(self, key):
+        value = self.data.get(key)
+        return None if value is None else str(value)
+
+    async def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def llen(self, key):
+        return len(self.data.get(key, []))
+
+    async def lpop(self, key):
+        items = self.data.get(key)
+        return items.pop(0) if items else None
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+
+class QuizSetPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(QuestionSnapshotRecord.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        self.topic_id = uuid.uuid4()
+        self.bank = [
+            QuestionDTO(id=uuid.uuid4(), qtype="single", stem=f"Q{i}?", choices=["A. x", "B. y"])
+            for i in range(6)
+        ]
+        self.pool = QuizSetPool(size=2)
+        self.pool.register("test", lambda q: {"question_id": str(q.id), "stem": q.stem})
+        self.pool.bind_redis(_FakeRedis())
+
+        async def sample(db, topic_id, count):
+            return self.bank[:count]
+
+        self.patches = [
+            mock.patch.object(pool_module.db_module, "AsyncSessionLocal", self.Session),
+            mock.patch.object(pool_module.questions_repo, "get_random_questions_by_topic", sample),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    async def asyncTearDown(self) -> None:
+        for patch in self.patches:
+            patch.stop()
+        await self.engine.dispose()
+
+    async def test_refill_then_take_returns_stored_snapshots(self) -> None:
+        self.assertIsNone(await self.pool.take("test", self.topic_id, 3))
+
+        self.assertEqual(await self.pool.refill("test", self.topic_id, 3), 2)
+        self.assertEqual(await self.pool.refill("test", self.topic_id, 3), 0)  # already full
+
+        records = await self.pool.take("test", self.topic_id, 3)
+        self.assertEqual([r.payload["stem"] for r in records], ["Q0?", "Q1?", "Q2?"])
+        async with self.Session() as db:
+            stored = await db.scalar(select(func.count()).select_from(QuestionSnapshotRecord))
+        self.assertEqual(stored, 3)  # identical sets share snapshot rows
+
+    async def test_insufficient_bank_is_not_pooled(self) -> None:
+        self.assertEqual(await self.pool.refill("test", self.topic_id, 10), 0)
+        self.assertIsNone(await self.pool.take("test", self.topic_id, 10))
+
+    async def test_invalidation_drops_sets_and_stale_generation(self) -> None:
+        await self.pool.refill("test", self.topic_id, 3)
+        await self.pool.invalidate_topic(self.topic_id)
+        self.assertIsNone(await self.pool.take("test", self.topic_id, 3))
+
+        # A refill that read the old generation must not push into the new one.
+        redis = self.pool._redis
+        real_get = redis.get
+
+        async def stale_get(key):
+            return "0" if key.startswith("quizpool:gen:") else await real_get(key)
+
+        with mock.patch.object(redis, "get", stale_get):
+            self.assertEqual(await self.pool.refill("test", self.topic_id, 3), 0)
+        self.assertEqual(await self.pool.refill("test", self.topic_id, 3), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.services.session_sweeper import AbandonedSessionSweeper
+
+
+class _ListSweeper(AbandonedSessionSweeper):
+    """Sweeper over an in-memory list of (session_id, kind, started_at) rows."""
+
+    def __init__(self, rows, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.rows = rows
+        self.cutoffs: list[datetime] = []
+
+    async def _delete_batch(self, cutoff):
+        self.cutoffs.append(cutoff)
+        stale = sorted((r for r in self.rows if r[2] < cutoff), key=lambda r: r[2])
+        batch = stale[: self.batch_size]
+        self.rows = [r for r in self.rows if r not in batch]
+        return {session_id: kind for session_id, kind, _ in batch}
+
+
+class AbandonedSessionSweeperTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.now = datetime(2025, 11, 18, tzinfo=timezone.utc)
+        old, fresh = self.now - timedelta(days=8), self.now - timedelta(hours=1)
+        self.rows = [(uuid.uuid4(), "global", old) for _ in range(4)]
+        self.rows += [(uuid.uuid4(), "topic_quiz", old), (uuid.uuid4(), "global", fresh)]
+
+    async def test_deletes_old_sessions_in_batches(self) -> None:
+        sweeper = _ListSweeper(self.rows, ttl_seconds=7 * 86400, batch_size=2, max_batches=10)
+        report = await sweeper.sweep(now=self.now)
+
+        self.assertEqual((report.deleted, report.batches), (5, 3))
+        self.assertEqual(dict(report.by_kind), {"global": 4, "topic_quiz": 1})
+        self.assertFalse(report.truncated)
+        self.assertEqual([kind for _, kind, _ in sweeper.rows], ["global"])
+        self.assertEqual(set(sweeper.cutoffs), {self.now - timedelta(days=7)})
+
+    async def test_stops_after_max_batches(self) -> None:
+        sweeper = _ListSweeper(self.rows, ttl_seconds=7 * 86400, batch_size=2, max_batches=2)
+        report = await sweeper.sweep(now=self.now)
+
+        self.assertEqual((report.deleted, report.batches, report.truncated), (4, 2, True))
+        self.assertEqual(len(sweeper.rows), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
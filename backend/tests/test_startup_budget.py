@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 冷启动预算（秒）；CI 机器较慢时可通过环境变量放宽
+IMPORT_BUDGET_SECONDS = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", "5"))
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "openai_loaded": "openai" in sys.modules}))
+"""
+
+
+class StartupBudgetTest(unittest.TestCase):
+    def test_app_imports_without_key_and_within_budget(self) -> None:
+        env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+        env["PYTHONPATH"] = str(BACKEND_DIR)
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr[-2000:])
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+        # SDK 只应在第一次真正调用模型时加载
+        self.assertFalse(result["openai_loaded"])
+        self.assertLess(result["elapsed"], IMPORT_BUDGET_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import os
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("DATABASE_URL_ASYNC", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL_SYNC", "sqlite:///:memory:")
+
+from pydantic import ValidationError  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.api.routes.topic_chat import TopicChatMessageIn  # noqa: E402
+from app.core.exceptions.codes import BizCode  # noqa: E402
+from app.core.exceptions.exceptions import BizError  # noqa: E402
+from app.models import ChatSession  # noqa: E402
+from app.repositories import chat as chat_repo  # noqa: E402
+from app.services import topic_chat as topic_chat_module  # noqa: E402
+from app.services.topic_chat import TopicChatService, build_prompt, estimate_tokens  # noqa: E402
+
+
+class TopicChatPromptTest(unittest.TestCase):
+    def test_prompt_contains_summary_and_recent_turns_only(self) -> None:
+        messages = build_prompt(
+            system_prompt="You are a tutor.",
+            topic_context="Topic: Board roles.",
+            summary="Learner asked about quorum.",
+            recent=[("user", "What is a proxy?"), ("ai", "A proxy is...")],
+            user_content="Can a proxy vote twice?",
+        )
+        self.assertEqual(
+            [m["role"] for m in messages],
+            ["system", "system", "user", "assistant", "user"],
+        )
+        self.assertIn("Topic: Board roles.", messages[0]["content"])
+        self.assertIn("quorum", messages[1]["content"])
+        self.assertEqual(messages[-1]["content"], "Can a proxy vote twice?")
+
+    def test_estimate_tokens(self) -> None:
+        self.assertEqual(estimate_tokens(""), 1)
+        self.assertEqual(estimate_tokens("a" * 40), 10)
+
+
+class TopicChatInputTest(unittest.IsolatedAsyncioTestCase):
+    def test_message_is_stripped_and_blank_rejected(self) -> None:
+        self.assertEqual(TopicChatMessageIn(content="  hi \n").content, "hi")
+        with self.assertRaises(ValidationError):
+            TopicChatMessageIn(content=" \n\t ")
+
+    async def test_service_rejects_blank_message_with_422(self) -> None:
+        with self.assertRaises(BizError) as ctx:
+            await TopicChatService().send_message(
+                None, user=None, topic_id=uuid.uuid4(), content="   "
+            )
+        self.assertEqual((ctx.exception.http_status, ctx.exception.message), (422, "empty_message"))
+
+
+class TopicChatSendMessageTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.db = mock.AsyncMock()
+        self.chat = SimpleNamespace(id=uuid.uuid4(), summary=None, token_count=0)
+        self.add_message = mock.AsyncMock(
+            side_effect=lambda db, **kw: SimpleNamespace(
+                id=uuid.uuid4(), role=kw["role"], content=kw["content"], created_at=None
+            )
+        )
+        service = TopicChatService()
+        topic = SimpleNamespace(id=uuid.uuid4(), name="t")
+        patchers = [
+            mock.patch.object(service, "_ensure_topic", mock.AsyncMock(return_value=topic)),
+            mock.patch.object(service, "_topic_context", mock.AsyncMock(return_value="")),
+            mock.patch.object(topic_chat_module, "load_prompt_template", return_value={}),
+            mock.patch.object(
+                chat_repo, "get_or_create_topic_session", mock.AsyncMock(return_value=self.chat)
+            ),
+            mock.patch.object(
+                chat_repo, "get_recent_unsummarized", mock.AsyncMock(return_value=[])
+            ),
+            mock.patch.object(chat_repo, "add_message", self.add_message),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.service = service
+
+    async def _send(self):
+        return await self.service.send_message(
+            self.db, user=SimpleNamespace(id=uuid.uuid4()), topic_id=uuid.uuid4(), content="why?"
+        )
+
+    async def test_failed_reply_stores_no_user_turn(self) -> None:
+        with mock.patch.object(
+            topic_chat_module.gpt_call,
+            "chat_reply",
+            mock.AsyncMock(side_effect=BizError(503, BizCode.SERVICE_UNAVAILABLE, "llm_busy")),
+        ):
+            with self.assertRaises(BizError):
+                await self._send()
+
+        self.add_message.assert_not_awaited()
+
+    async def test_question_and_answer_are_written_together(self) -> None:
+        with mock.patch.object(
+            topic_chat_module.gpt_call, "chat_reply", mock.AsyncMock(return_value="because")
+        ):
+            _, user_msg, ai_msg = await self._send()
+
+        self.assertEqual(
+            [c.kwargs["role"] for c in self.add_message.await_args_list], ["user", "ai"]
+        )
+        self.assertIsNotNone(self.add_message.await_args_list[0].kwargs["created_at"])
+        self.assertEqual((user_msg.content, ai_msg.content), ("why?", "because"))
+
+
+class TopicChatCompactionRaceTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(ChatSession.__table__.create)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.addAsyncCleanup(self.engine.dispose)
+
+        self.chat_id = uuid.uuid4()
+        async with self.Session() as db:
+            db.add(
+                ChatSession(
+                    id=self.chat_id, user_id=uuid.uuid4(), scope="topic", token_count=1000
+                )
+            )
+            await db.commit()
+        # 6 条未归纳消息，保留最近 2 条：前 4 条待折叠
+        self.messages = [
+            SimpleNamespace(id=uuid.uuid4(), role="user", content=f"m{i}", token_count=100)
+            for i in range(6)
+        ]
+        patchers = [
+            mock.patch.object(topic_chat_module.db_module, "AsyncSessionLocal", self.Session),
+            mock.patch.object(
+                topic_chat_module.chat_repo,
+                "get_unsummarized",
+                mock.AsyncMock(return_value=self.messages),
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _chat(self) -> ChatSession:
+        async with self.Session() as db:
+            return await db.get(ChatSession, self.chat_id)
+
+    async def test_concurrent_summary_write_wins_the_cas(self) -> None:
+        concurrent_cutoff = self.messages[1].id
+
+        async def summarize_while_another_compaction_commits(previous, transcript, **kwargs):
+            # 模型调用期间另一次压缩先写入了摘要
+            async with self.Session() as db:
+                self.assertTrue(
+                    await chat_repo.apply_summary(
+                        db,
+                        session_id=self.chat_id,
+                        expected_cutoff=None,
+                        summary="concurrent",
+                        new_cutoff=concurrent_cutoff,
+                        summarized_tokens=200,
+                    )
+                )
+                await db.commit()
+            return "stale"
+
+        with mock.patch.object(
+            topic_chat_module.gpt_call,
+            "summarize_conversation",
+            side_effect=summarize_while_another_compaction_commits,
+        ):
+            self.assertFalse(await TopicChatService(recent_messages=2).compact(self.chat_id))
+
+        chat = await self._chat()
+        self.assertEqual(
+            (chat.summary, chat.summarized_upto_message_id, chat.token_count),
+            ("concurrent", concurrent_cutoff, 800),
+        )
+
+    async def test_compaction_applies_when_uncontended(self) -> None:
+        with mock.patch.object(
+            topic_chat_module.gpt_call, "summarize_conversation", mock.AsyncMock(return_value="merged")
+        ) as summarize:
+            self.assertTrue(await TopicChatService(recent_messages=2).compact(self.chat_id))
+
+        self.assertEqual(len(summarize.await_args.args[1]), 4)
+        chat = await self._chat()
+        self.assertEqual(
+            (chat.summary, chat.summarized_upto_message_id, chat.token_count),
+            ("merged", self.messages[3].id, 600),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
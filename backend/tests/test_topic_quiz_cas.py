@@ -0,0 +1,92 @@
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+from app.core.exceptions.exceptions import BizError
+from app.services import topic_quiz as topic_quiz_module
+from app.services.topic_quiz import TopicQuizService
+
+
+class _Session:
+    """Only ``refresh`` is used: it applies the row the concurrent request wrote."""
+
+    def __init__(self, concurrent_state: dict) -> None:
+        self.concurrent_state = concurrent_state
+        self.refreshes = 0
+
+    async def refresh(self, progress) -> None:
+        self.refreshes += 1
+        for key, value in self.concurrent_state.items():
+            setattr(progress, key, value)
+
+
+class _RacingQuizService(TopicQuizService):
+    """start_quiz with the database steps replaced; every CAS attempt loses."""
+
+    def __init__(self, progress, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.progress = progress
+        self.started = 0
+        self.resumed: list[dict] = []
+
+    async def _ensure_topic(self, session, topic_id):
+        return SimpleNamespace(id=topic_id)
+
+    async def _ensure_progress(self, session, user, topic):
+        return self.progress
+
+    async def _resume(self, session, pending_quiz):
+        self.resumed.append(pending_quiz)
+        return ("winner-session", []) if pending_quiz.get("session_id") else None
+
+    async def _start_new(self, session, progress, topic, question_limit):
+        self.started += 1
+        return None
+
+
+class TopicQuizCasTest(unittest.IsolatedAsyncioTestCase):
+    async def test_losing_start_resumes_the_winning_quiz(self) -> None:
+        progress = SimpleNamespace(quiz_state="none", pending_quiz=None, quiz_version=0)
+        winner = {"session_id": str(uuid.uuid4()), "item_ids": [str(uuid.uuid4())]}
+        session = _Session({"quiz_state": "pending", "pending_quiz": winner, "quiz_version": 1})
+        service = _RacingQuizService(progress)
+
+        result = await service.start_quiz(session, user=None, topic_id=uuid.uuid4())
+
+        self.assertEqual(result, ("winner-session", []))
+        self.assertEqual((service.started, session.refreshes), (1, 1))
+        self.assertEqual(service.resumed, [winner])
+
+    async def test_gives_up_after_bounded_attempts(self) -> None:
+        progress = SimpleNamespace(quiz_state="none", pending_quiz=None, quiz_version=0)
+        session = _Session({"quiz_version": 1})
+        service = _RacingQuizService(progress, cas_attempts=2)
+
+        with self.assertRaises(BizError) as ctx:
+            await service.start_quiz(session, user=None, topic_id=uuid.uuid4())
+        self.assertEqual(ctx.exception.message, "quiz_state_conflict")
+        self.assertEqual(service.started, 2)
+
+
+class InlineSelectionTest(unittest.IsolatedAsyncioTestCase):
+    async def test_inline_selection_samples_the_topic_pool(self) -> None:
+        topic = SimpleNamespace(id=uuid.uuid4())
+        sampled = [SimpleNamespace(id=uuid.uuid4()) for _ in range(3)]
+        sample = mock.AsyncMock(side_effect=[sampled, sampled[:1]])
+
+        with mock.patch.object(
+            topic_quiz_module.questions_repo, "get_random_questions_by_topic", sample
+        ):
+            service = TopicQuizService()
+            self.assertEqual(await service._select_questions("db", topic, 3), sampled)
+            with self.assertRaises(BizError) as ctx:
+                await service._select_questions("db", topic, 3)
+
+        sample.assert_awaited_with("db", topic_id=topic.id, count=3)
+        self.assertEqual(ctx.exception.http_status, 409)
+        self.assertEqual(ctx.exception.data, {"required": 3, "available": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()